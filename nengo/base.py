@@ -329,6 +329,13 @@ class Process(FrozenObject):
             The simulation timestep.
         rng : `numpy.random.RandomState`
             A random number generator.
+
+        Notes
+        -----
+        If the returned function keeps state between time steps, it should
+        expose that state in a ``state`` attribute (see
+        `.get_step_state`) so that it is included when saving the state of
+        a simulator with `.Simulator.save_state`.
         """
         raise NotImplementedError("Process must implement `make_step` method.")
 
@@ -1,12 +1,17 @@
 import collections
+import hashlib
 import warnings
 
 import numpy as np
 
+from nengo.base import NengoObject
 from nengo.builder.signal import Signal, SignalDict
 from nengo.builder.operator import TimeUpdate
 from nengo.cache import NoDecoderCache
-from nengo.exceptions import BuildError
+from nengo.connection import LearningRule
+from nengo.exceptions import BuildError, ValidationError
+from nengo.network import Network
+from nengo.utils.compat import iteritems
 
 
 class Model(object):
@@ -20,23 +25,65 @@ class Model(object):
         A name or description to differentiate models.
     decoder_cache : DecoderCache, optional (Default: ``NoDecoderCache()``)
         Interface to a cache for expensive parts of the build process.
+    builder : Builder, optional (Default: None)
+        The `.Builder` used to build objects. If None, a new one is created.
+    dtype : numpy.dtype, optional (Default: ``np.float64``)
+        The floating point type of the signals. With ``np.float32``, the
+        simulation uses half the memory and bandwidth, at the cost of
+        precision. Decoders are still solved in double precision.
+    build_workers : int, optional (Default: 1)
+        Number of workers that solve for decoders while the network is
+        built (see `.DecoderSolverPool`). With 1, decoders are solved one
+        after the other when their connection is built.
+    build_processes : bool, optional (Default: False)
+        Whether the ``build_workers`` are processes instead of threads.
+    build_profiler : BuildProfiler, optional (Default: None)
+        If given, measures the time and memory spent building each object,
+        and the time spent in the optimizer (see `.build_profile`).
+    incremental : bool, optional (Default: False)
+        Whether to record which object built which object, and the
+        parameters of each built object, so that the model can be
+        rebuilt with `.rebuild` after the network changed.
 
     Attributes
     ----------
     config : Config or None
         Build functions can set a config object here to affect sub-builders.
+    build_processes : bool
+        Whether the ``build_workers`` are processes instead of threads.
+    build_profiler : BuildProfiler or None
+        The profiler measuring the build, or None if profiling is disabled.
+    build_workers : int
+        Number of workers that solve for decoders while building.
     decoder_cache : DecoderCache
         Interface to a cache for expensive parts of the build process.
+    decoder_pool : DecoderSolverPool or None
+        The pool solving for decoders while a network with
+        ``build_workers > 1`` is built, and None otherwise.
     dt : float
         The length of each timestep, in seconds.
+    dtype : numpy.dtype
+        The floating point type of the signals created by the builder.
+    incremental : bool
+        Whether the model records what `.rebuild` needs.
     label : str or None
         A name or description to differentiate models.
+    optimized : bool
+        Whether the operators have been merged by `.optimize`.
     operators : list
         List of all operators created in the build process.
         All operators must be added to this list, as it is used by Simulator.
+    origins : dict
+        Mapping from operators to a list of the objects (e.g., ensembles,
+        connections, learning rules) whose build added them. An operator
+        made by merging several operators has the objects of all of them.
     params : dict
         Mapping from objects to namedtuples containing parameters generated
         in the build process.
+    parents : dict
+        If ``incremental``, mapping from the objects in ``origin_types``
+        to the object whose build function built them, which is None for
+        the top-level network.
     probes : list
         List of all probes. Probes must be added to this list in the build
         process, as this list is used by Simulator.
@@ -49,10 +96,19 @@ class Model(object):
         ancestor network of the network in which the object resides.
     seeds : dict
         Mapping from objects to the integer seed assigned to that object.
+    shared_inputs : dict or None
+        While a network is built, mapping from ensembles to the inputs of
+        their neurons at their evaluation points, which the decoded
+        connections from the ensemble share (see `.get_inputs`),
+        and None otherwise.
     sig : dict
         A dictionary of dictionaries that organizes all of the signals
         created in the build process, as build functions often need to
         access signals created by other build functions.
+    snapshots : dict
+        If ``incremental``, mapping from the objects in ``origin_types``
+        to the values of their parameters when they were built
+        (see `.param_snapshot`).
     step : Signal
         The current step (i.e., how many timesteps have occurred thus far).
     time : Signal
@@ -63,11 +119,30 @@ class Model(object):
         or for the network builder to determine if it is the top-level network.
     """
 
-    def __init__(self, dt=0.001, label=None, decoder_cache=None, builder=None):
+    # Types of objects that are recorded in ``origins``
+    origin_types = (NengoObject, LearningRule, Network)
+
+    def __init__(self, dt=0.001, label=None, decoder_cache=None, builder=None,
+                 dtype=np.float64, build_workers=1, build_processes=False,
+                 build_profiler=None, incremental=False):
         self.dt = dt
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != 'f':
+            raise ValidationError("Must be a floating point type (got %s)"
+                                  % self.dtype, attr='dtype', obj=self)
         self.label = label
         self.decoder_cache = (NoDecoderCache() if decoder_cache is None
                               else decoder_cache)
+        if int(build_workers) < 1:
+            raise ValidationError("Must be at least 1 (got %r)"
+                                  % build_workers, attr='build_workers',
+                                  obj=self)
+        self.build_workers = int(build_workers)
+        self.build_processes = bool(build_processes)
+        self.decoder_pool = None
+        self.shared_inputs = None
+        self.build_profiler = build_profiler
+        self.incremental = bool(incremental)
 
         # Will be filled in by the network builder
         self.toplevel = None
@@ -75,10 +150,15 @@ class Model(object):
 
         # Resources used by the build process
         self.operators = []
+        self.origins = {}
         self.params = {}
         self.probes = []
         self.seeds = {}
         self.seeded = {}
+        self.parents = {}
+        self.snapshots = {}
+        self.optimized = False
+        self._building = []
 
         self.sig = collections.defaultdict(dict)
         self.sig['common'][0] = Signal(0., readonly=True, name='ZERO')
@@ -105,6 +185,8 @@ class Model(object):
         the ``operators`` attribute.
         """
         self.operators.append(op)
+        if self.build_profiler is not None:
+            self.build_profiler.add_op(op)
         # Fail fast by trying make_step with a temporary sigdict
         signals = SignalDict()
         op.init_signals(signals)
@@ -120,11 +202,84 @@ class Model(object):
         obj : object
             The object to build into this model.
         """
-        built = self.builder.build(self, obj, *args, **kwargs)
+        n_ops = len(self.operators)
+        recorded = self.incremental and isinstance(obj, self.origin_types)
+        if recorded:
+            self.parents[obj] = self._building[-1] if self._building else None
+            self.snapshots[obj] = param_snapshot(obj)
+            self._building.append(obj)
+        try:
+            built = self.builder.build(self, obj, *args, **kwargs)
+        finally:
+            if recorded:
+                self._building.pop()
+        if isinstance(obj, self.origin_types):
+            # operators not claimed by a nested build belong to this object
+            for op in self.operators[n_ops:]:
+                self.origins.setdefault(op, [obj])
         if self.build_callback is not None:
             self.build_callback(obj)
         return built
 
+    def rebuild(self, network):
+        """Returns a model of ``network`` that reuses this model.
+
+        This model must have been created with ``incremental=True``, have
+        built ``network`` and not have been optimized. It is not modified.
+        Only the objects that changed since they were built (i.e., whose
+        parameters or seeds changed), the objects that were added,
+        and the objects depending on them (e.g., the connections of a
+        changed ensemble) are built again. See `.rebuild_network` for
+        details.
+
+        Since `.Simulator` optimizes the model it is given, keep this model
+        and simulate the rebuilt models, for example::
+
+            model = nengo.builder.Model(incremental=True)
+            model.build(net)
+            with nengo.Simulator(None, model=model.rebuild(net)) as sim:
+                ...
+            net.connections[0].function = lambda x: x ** 2
+            model = model.rebuild(net)
+            with nengo.Simulator(None, model=model.rebuild(net)) as sim:
+                ...
+
+        Parameters
+        ----------
+        network : Network
+            The top-level network of this model, with its changes.
+
+        Returns
+        -------
+        Model
+        """
+        # network.py imports this module
+        from nengo.builder.network import rebuild_network
+        return rebuild_network(self, network)
+
+    def build_profile(self, sort='self_time'):
+        """Report the time and memory spent building each object.
+
+        The model must have been created with a ``build_profiler``.
+
+        Parameters
+        ----------
+        sort : str, optional (Default: 'self_time')
+            The value to sort the objects by, in decreasing order.
+            See `.BuildProfiler.report` for details.
+
+        Returns
+        -------
+        dict
+            See `.BuildProfiler.report` for details.
+        """
+        if self.build_profiler is None:
+            raise BuildError(
+                "Build profiling is disabled. Create the Model with a "
+                "'build_profiler' (or the Simulator with 'profiling=True') "
+                "to enable it.")
+        return self.build_profiler.report(sort=sort)
+
     def has_built(self, obj):
         """Returns true if the object has already been built in this model.
 
@@ -144,6 +299,29 @@ class Model(object):
         return obj in self.params
 
 
+def param_snapshot(obj):
+    """Returns the values of the parameters of ``obj``, to compare them later.
+
+    Arrays are replaced by their shape, type and a hash of their data,
+    lists and tuples by a tuple of their snapshots. Other values are kept,
+    and are compared with ``==`` (i.e., parameters like distributions,
+    synapses and solvers compare equal if their own parameters are equal).
+    """
+    return tuple((name, _snapshot(getattr(obj, name)))
+                 for name in getattr(obj, 'params', ()))
+
+
+def _snapshot(value):
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.shape, value.dtype.str, hashlib.sha1(
+            np.ascontiguousarray(value).view(np.uint8)).hexdigest())
+    elif isinstance(value, (list, tuple)):
+        return tuple(_snapshot(v) for v in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((k, _snapshot(v)) for k, v in iteritems(value)))
+    return value
+
+
 class Builder(object):
     """Manages the build functions known to the Nengo build process.
 
@@ -215,7 +393,15 @@ class Builder(object):
             raise BuildError(
                 "Cannot build object of type %r" % type(obj).__name__)
 
-        return cls.builders[obj_cls](model, obj, *args, **kwargs)
+        build_fn = cls.builders[obj_cls]
+        if model.build_profiler is None:
+            return build_fn(model, obj, *args, **kwargs)
+
+        model.build_profiler.start(model, obj, build_fn)
+        try:
+            return build_fn(model, obj, *args, **kwargs)
+        finally:
+            model.build_profiler.stop(model)
 
     @classmethod
     def register(cls, nengo_class):
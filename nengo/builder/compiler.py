@@ -0,0 +1,183 @@
+"""Compiles the step functions of a simulator into one Python function."""
+
+from collections import OrderedDict
+import hashlib
+import linecache
+import warnings
+
+import numpy as np
+
+from nengo.builder import operator
+from nengo.builder.neurons import SimNeurons
+
+__all__ = ["compile_steps"]
+
+
+def compile_steps(operators, steps, signals, dt, templates=True):
+    """Returns a function that runs all step functions for one time step.
+
+    The returned function has the code of one time step written out as
+    straight-line Python code. The operators for which a template is
+    registered with `.StepCompiler.register` (by default `.TimeUpdate`,
+    `.Reset`, `.Copy`, `.ElementwiseInc`, `.DotInc` and `.SimNeurons`) are
+    inlined, with their arrays bound as globals of the function. All other
+    operators call their step function. This avoids calling one Python
+    closure per operator, and the attribute lookups and branches in them.
+
+    The generated source is available in the ``source`` attribute of
+    the returned function, and is shown in tracebacks. Its code object
+    is cached, so compiling the same model again (e.g., on
+    `.Simulator.reset`) only binds the new arrays.
+
+    Parameters
+    ----------
+    operators : list of Operator
+        The operators, in the order in which they are run.
+    steps : list of callable
+        The step functions of the operators.
+    signals : SignalDict
+        The signals that the step functions use.
+    dt : float
+        Length of each simulation timestep, in seconds.
+    templates : bool, optional (Default: True)
+        Whether to inline the operators with a template. If False, the
+        generated function calls the step function of every operator.
+    """
+    lines = []
+    namespace = {'np': np, 'dot': np.dot, 'dt': dt}
+    for i, (op, step) in enumerate(zip(operators, steps)):
+        lines.append("# %s" % str(op).replace('\n', ' '))
+        template = StepCompiler.templates.get(type(op)) if templates else None
+        inlined = None if template is None else template(op, signals, dt)
+        prefix = "op%d_" % i
+        if inlined is None:
+            lines.append("%sstep()" % prefix)
+            namespace[prefix + 'step'] = step
+        else:
+            bound, code = inlined
+            for name, value in bound.items():
+                namespace[prefix + name] = value
+            lines.extend(code.format(p=prefix).split('\n'))
+
+    source = "def step_compiled():\n%s\n" % "\n".join(
+        "    " + line for line in lines or ["pass"])
+    code = StepCompiler.compile(source)
+    exec(code, namespace)
+    step_compiled = namespace['step_compiled']
+    step_compiled.source = source
+    return step_compiled
+
+
+class StepCompiler(object):
+    """Registry of operator templates and cache of compiled code.
+
+    A template is a function ``template(op, signals, dt)`` returning a dict
+    of the objects that the code uses (e.g., the arrays of the signals of
+    ``op``) and the Python code that runs one step of ``op``, or None if
+    ``op`` has to call its step function. In the code, the names of these
+    objects are prefixed with ``{p}``, which is replaced with a prefix that
+    is unique for each operator. The code must do the same as the step
+    function returned by ``op.make_step``.
+    """
+
+    templates = {}
+
+    # Maximum number of compiled code objects that are kept
+    cache_size = 32
+    _cache = OrderedDict()
+
+    @classmethod
+    def register(cls, optype):
+        def register(template):
+            if optype in cls.templates:
+                warnings.warn(
+                    "Template for operator type {} overwritten.".format(
+                        optype))
+            cls.templates[optype] = template
+            return template
+        return register
+
+    @classmethod
+    def compile(cls, source):
+        """Returns the code object for ``source``, compiling it if needed."""
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        if key in cls._cache:
+            code = cls._cache.pop(key)
+        else:
+            filename = "<nengo compiled step %s>" % key[:12]
+            code = compile(source, filename, 'exec')
+            # make the source available to tracebacks and debuggers
+            linecache.cache[filename] = (
+                len(source), None, source.splitlines(True), filename)
+            while len(cls._cache) >= cls.cache_size:
+                _, old = cls._cache.popitem(last=False)
+                linecache.cache.pop(old.co_filename, None)
+        cls._cache[key] = code
+        return code
+
+
+@StepCompiler.register(operator.TimeUpdate)
+def timeupdate_template(op, signals, dt):
+    return ({'step': signals[op.step], 'time': signals[op.time]},
+            "{p}step[...] += 1\n"
+            "{p}time[...] = {p}step * dt")
+
+
+@StepCompiler.register(operator.Reset)
+def reset_template(op, signals, dt):
+    return ({'dst': signals[op.dst], 'value': op.value},
+            "{p}dst[...] = {p}value")
+
+
+@StepCompiler.register(operator.Copy)
+def copy_template(op, signals, dt):
+    bound = {'src': signals[op.src], 'dst': signals[op.dst]}
+    src = dst = ""
+    if op.src_slice is not None:
+        bound['src_slice'] = op.src_slice
+        src = "[{p}src_slice]"
+    if op.dst_slice is not None:
+        bound['dst_slice'] = op.dst_slice
+        dst = "[{p}dst_slice]"
+    return bound, "{p}dst%s %s= {p}src%s" % (
+        dst or "[...]", "+" if op.inc else "", src)
+
+
+@StepCompiler.register(operator.ElementwiseInc)
+def elementwiseinc_template(op, signals, dt):
+    bound = {'A': signals[op.A], 'X': signals[op.X], 'Y': signals[op.Y]}
+    op._check_shapes(bound['A'].shape, bound['X'].shape, bound['Y'].shape)
+    code = []
+    if op.decay_factor != 1 or op.clip_type != 0:
+        bound['decay_factor'] = op.decay_factor
+        code.append("{p}Y[...] *= {p}decay_factor")
+    code.append("{p}Y[...] += {p}A * {p}X")
+    # clip_type =0:no clipping; =1:clip<0; =2:clip>0
+    if op.clip_type == 1:
+        code.append("np.clip({p}Y, 0, None, out={p}Y)")
+    elif op.clip_type == 2:
+        code.append("np.clip({p}Y, None, 0, out={p}Y)")
+    return bound, "\n".join(code)
+
+
+@StepCompiler.register(operator.DotInc)
+def dotinc_template(op, signals, dt):
+    if op.sparse:
+        return None  # the step function chooses between two products
+    bound = {'A': signals[op.A], 'X': signals[op.X], 'Y': signals[op.Y]}
+    if op.reshape:
+        return bound, ("{p}Y[...] += np.asarray(dot({p}A, {p}X)).reshape("
+                       "{p}Y.shape)")
+    return bound, "{p}Y[...] += dot({p}A, {p}X)"
+
+
+@StepCompiler.register(SimNeurons)
+def simneurons_template(op, signals, dt):
+    bound = {'step_math': op.neurons.step_math,
+             'J': signals[op.J],
+             'output': signals[op.output]}
+    states = []
+    for i, state in enumerate(op.states):
+        bound['state%d' % i] = signals[state]
+        states.append(", {p}state%d" % i)
+    return bound, "{p}step_math(dt, {p}J, {p}output%s)" % "".join(states)
@@ -1,4 +1,8 @@
 import collections
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import threading
+import warnings
 
 import numpy as np
 
@@ -14,6 +18,7 @@ from nengo.neurons import Direct
 from nengo.node import Node
 from nengo.solvers import Solver
 from nengo.utils.compat import is_iterable, itervalues
+from nengo.utils.stdlib import WeakKeyIDDictionary
 
 built_attrs = ['eval_points', 'solver_info', 'weights', 'transform']
 
@@ -74,17 +79,57 @@ def get_targets(conn, eval_points):
     elif isinstance(conn.function, np.ndarray):
         targets = conn.function
     else:
-        targets = np.zeros((len(eval_points), conn.size_mid))
-        for i, ep in enumerate(eval_points[:, conn.pre_slice]):
-            out = conn.function(ep)
-            if out is None:
-                raise BuildError("Building %s: Connection function returned "
-                                 "None. Cannot solve for decoders." % (conn,))
-            targets[i] = out
+        eval_points = eval_points[:, conn.pre_slice]
+        targets = (vectorized_targets(conn, eval_points) if conn.vectorized
+                   else None)
+        if targets is None:
+            targets = np.zeros((len(eval_points), conn.size_mid))
+            for i, ep in enumerate(eval_points):
+                targets[i] = _target(conn, ep)
 
     return targets
 
 
+def _target(conn, x):
+    out = conn.function(x)
+    if out is None:
+        raise BuildError("Building %s: Connection function returned "
+                         "None. Cannot solve for decoders." % (conn,))
+    return out
+
+
+def vectorized_targets(conn, eval_points):
+    """Calls the function of ``conn`` once on all ``eval_points``.
+
+    Returns the ``(n_eval_points, size_mid)`` targets, or None (with a
+    warning) if the call raises an error, returns an array of the wrong
+    shape, or returns a first row that differs from calling the function
+    on the first evaluation point alone. The caller then has to call the
+    function on each evaluation point.
+    """
+    shape = (len(eval_points), conn.size_mid)
+    try:
+        targets = conn.function(eval_points)
+        targets = np.asarray(targets, dtype=np.float64)
+        if targets.shape == shape[:1] and conn.size_mid == 1:
+            targets = targets[:, None]
+        if targets.shape != shape:
+            raise ValueError("returned shape %s instead of %s" % (
+                targets.shape, shape))
+    except Exception as e:
+        warnings.warn("%s: vectorized function failed (%s). Calling it on "
+                      "each evaluation point instead." % (conn, e))
+        return None
+
+    if len(eval_points) > 0 and not np.allclose(
+            targets[0], _target(conn, eval_points[0])):
+        warnings.warn("%s: vectorized function does not match calling it on "
+                      "one evaluation point. Calling it on each evaluation "
+                      "point instead." % (conn,))
+        return None
+    return targets
+
+
 def build_linear_system(model, conn, rng):
     eval_points = get_eval_points(model, conn, rng)
     ens = conn.pre_obj
@@ -100,40 +145,207 @@ def build_linear_system(model, conn, rng):
 
 
 def build_decoders(model, conn, rng, transform):
-    encoders = model.params[conn.pre_obj].encoders
+    job = (None if model.decoder_pool is None else
+           model.decoder_pool.pop(conn))
+    if job is None:
+        eval_points, x, targets, E = decoder_problem(
+            model, conn, rng, transform)
+        solver_fn = solve_for_decoders
+    else:
+        eval_points, x, targets, E, rng, solver_fn = job
+
     gain = model.params[conn.pre_obj].gain
     bias = model.params[conn.pre_obj].bias
+    wrapped_solver = (model.decoder_cache.wrap_solver(solver_fn)
+                      if model.seeded[conn] else solver_fn)
+    decoders, solver_info = wrapped_solver(
+        conn, gain, bias, x, targets, rng=rng, E=E)
+
+    weights = (decoders.T if conn.solver.weights else
+               multiply(transform, decoders.T))
+    return eval_points, weights, solver_info
 
+
+def decoder_problem(model, conn, rng, transform):
+    """Returns the evaluation points, inputs, targets and encoders to solve.
+
+    These are the arguments of `.solve_for_decoders`, except for the gain
+    and bias, which are taken from ``model.params[conn.pre_obj]``.
+    """
     eval_points = get_eval_points(model, conn, rng)
     targets = get_targets(conn, eval_points)
 
-    x = np.dot(eval_points, encoders.T / conn.pre_obj.radius)
+    x = get_inputs(model, conn, eval_points)
     E = None
     if conn.solver.weights:
         E = model.params[conn.post_obj].scaled_encoders.T[conn.post_slice]
         # include transform in solved weights
         targets = multiply(targets, transform.T)
+    return eval_points, x, targets, E
 
-    wrapped_solver = (model.decoder_cache.wrap_solver(solve_for_decoders)
-                      if model.seeded[conn] else solve_for_decoders)
-    decoders, solver_info = wrapped_solver(
-        conn, gain, bias, x, targets, rng=rng, E=E)
 
-    weights = (decoders.T if conn.solver.weights else
-               multiply(transform, decoders.T))
-    return eval_points, weights, solver_info
+def get_inputs(model, conn, eval_points):
+    """Returns the inputs of the neurons of ``conn.pre_obj`` at the points.
+
+    While a network is built, the connections that use the evaluation
+    points of their pre ensemble share one readonly array of inputs, which
+    is kept in ``model.shared_inputs``. The activities for a readonly
+    array of inputs are computed only once (see `._rates`), and `.Cholesky`
+    factorizes the regularized Gram matrix of the activities only once,
+    so that each connection only solves for its own targets.
+    """
+    ens = conn.pre_obj
+    shared = conn.eval_points is None and model.shared_inputs is not None
+    if shared and ens in model.shared_inputs:
+        return model.shared_inputs[ens]
+
+    encoders = model.params[ens].encoders
+    x = np.dot(eval_points, encoders.T / ens.radius)
+    if shared:
+        x.setflags(write=False)
+        model.shared_inputs[ens] = x
+    return x
 
 
 def solve_for_decoders(conn, gain, bias, x, targets, rng, E=None):
-    activities = conn.pre_obj.neuron_type.rates(x, gain, bias)
-    if np.count_nonzero(activities) == 0:
+    return _check_solved(conn, _solve(conn.solver, conn.pre_obj.neuron_type,
+                                      gain, bias, x, targets, rng, E))
+
+
+def _check_solved(conn, solved):
+    if solved is None:
         raise BuildError(
             "Building %s: 'activities' matrix is all zero for %s. "
             "This is because no evaluation points fall in the firing "
             "ranges of any neurons." % (conn, conn.pre_obj))
+    return solved
+
+
+def _solve(solver, neuron_type, gain, bias, x, targets, rng, E):
+    # Module-level function, so that it can be run in another process
+    activities = _rates(neuron_type, gain, bias, x)
+    if np.count_nonzero(activities) == 0:
+        return None
+    return solver(activities, targets, rng=rng, E=E)
+
+
+# Activities of readonly inputs, as (neuron_type, gain, bias, activities)
+_activities = WeakKeyIDDictionary()
+_activities_lock = threading.Lock()
+
+
+def _rates(neuron_type, gain, bias, x):
+    """Returns the activities for the inputs ``x``.
+
+    If ``x`` is readonly (e.g., shared by the connections from an
+    ensemble, see `.get_inputs`), the activities are readonly too and kept
+    until ``x`` is deleted, so that they are computed only once.
+    """
+    if x.flags.writeable:
+        return neuron_type.rates(x, gain, bias)
+
+    with _activities_lock:
+        cached = _activities.get(x)
+    if (cached is not None and cached[0] is neuron_type
+            and cached[1] is gain and cached[2] is bias):
+        return cached[3]
+
+    activities = neuron_type.rates(x, gain, bias)
+    activities.setflags(write=False)
+    with _activities_lock:
+        _activities[x] = (neuron_type, gain, bias, activities)
+    return activities
+
+
+class DecoderSolverPool(object):
+    """Solves for the decoders of connections in a pool of workers.
+
+    While a network is built, `.build_network` submits the decoded
+    connections of each network with `.submit` before building them.
+    The evaluation points and targets are computed right away, in the
+    order of the connections, and only the solver runs in the pool.
+    `.build_decoders` then takes the result with `.pop` when the
+    connection is built. The solvers get the same random number generator
+    state as when solving sequentially, and the decoder cache is read and
+    written in the main thread in the order of the connections, so the
+    built model and the cache do not depend on the number of workers.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of worker threads or processes.
+    processes : bool, optional (Default: False)
+        Whether to use processes instead of threads. Threads run
+        in parallel while NumPy releases the global interpreter lock,
+        e.g. in `.LstsqL2`. Processes also run Python code in parallel,
+        but the solver, the neuron type and the arrays of each problem
+        have to be pickled.
+    """
+
+    def __init__(self, n_workers, processes=False):
+        self.n_workers = n_workers
+        self.processes = processes
+        self._pool = None
+        self._jobs = {}
+
+    def __enter__(self):
+        pool_type = multiprocessing.Pool if self.processes else ThreadPool
+        self._pool = pool_type(self.n_workers)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        self._jobs.clear()
+
+    def submit(self, model, conn):
+        """Sets up the decoder problem of ``conn`` and starts solving it.
+
+        Does nothing for connections without decoders, and connections
+        whose ensembles have not been built yet.
+        """
+        pre, post = conn.pre_obj, conn.post_obj
+        if (not isinstance(pre, Ensemble)
+                or isinstance(pre.neuron_type, Direct)
+                or pre not in model.params or conn in model.params
+                or (conn.solver.weights and post not in model.params)):
+            return
+
+        # the same random numbers as in `.build_connection`
+        rng = np.random.RandomState(model.seeds[conn])
+        transform = get_samples(
+            conn.transform, conn.size_out, d=conn.size_mid, rng=rng)
+        eval_points, x, targets, E = decoder_problem(
+            model, conn, rng, transform)
+        gain = model.params[pre].gain
+        bias = model.params[pre].bias
+
+        if model.seeded[conn] and model.decoder_cache.has_solution(
+                conn, gain, bias, x, targets, rng=rng, E=E):
+            # loaded from the cache when the connection is built
+            solver_fn = solve_for_decoders
+        else:
+            worker_rng = np.random.RandomState()
+            worker_rng.set_state(rng.get_state())
+            result = self._pool.apply_async(_solve, (
+                conn.solver, pre.neuron_type, gain, bias, x, targets,
+                worker_rng, E))
+
+            def solver_fn(conn, gain, bias, x, targets, rng, E=None):
+                return _check_solved(conn, result.get())
+
+        self._jobs[conn] = (eval_points, x, targets, E, rng, solver_fn)
+
+    def pop(self, conn):
+        """Returns the job of ``conn`` and forgets it, or None if unknown.
 
-    decoders, solver_info = conn.solver(activities, targets, rng=rng, E=E)
-    return decoders, solver_info
+        The job is a tuple of the evaluation points, the inputs, targets,
+        encoders and random number generator of the decoder problem,
+        and a function with the signature of `.solve_for_decoders`
+        that returns the solution.
+        """
+        return self._jobs.pop(conn, None)
 
 
 def multiply(x, y):
@@ -154,7 +366,8 @@ def slice_signal(model, signal, sl):
         return signal[sl]
     else:
         size = np.arange(signal.size)[sl].size
-        sliced_signal = Signal(np.zeros(size), name="%s.sliced" % signal.name)
+        sliced_signal = Signal(np.zeros(size, dtype=model.dtype),
+                               name="%s.sliced" % signal.name)
         model.add_op(Copy(signal, sliced_signal, src_slice=sl))
         return sliced_signal
 
@@ -239,7 +452,8 @@ def build_connection(model, conn):
         elif isinstance(conn.function, np.ndarray):
             raise BuildError("Cannot use function points in direct connection")
         else:
-            in_signal = Signal(np.zeros(conn.size_mid), name='%s.func' % conn)
+            in_signal = Signal(np.zeros(conn.size_mid, dtype=model.dtype),
+                               name='%s.func' % conn)
             model.add_op(SimPyFunc(in_signal, conn.function, None, sliced_in))
     elif isinstance(conn.pre_obj, Ensemble):  # Normal decoded connection
         eval_points, weights, solver_info = model.build(
@@ -258,8 +472,10 @@ def build_connection(model, conn):
 
     # Add operator for applying weights
     model.sig[conn]['weights'] = Signal(
-        weights, name="%s.weights" % conn, readonly=True)
-    signal = Signal(np.zeros(signal_size), name="%s.weighted" % conn)
+        np.asarray(weights, dtype=model.dtype),
+        name="%s.weights" % conn, readonly=True)
+    signal = Signal(np.zeros(signal_size, dtype=model.dtype),
+                    name="%s.weighted" % conn)
     model.add_op(Reset(signal))
     op = ElementwiseInc if weights.ndim < 2 else DotInc
     model.add_op(op(model.sig[conn]['weights'],
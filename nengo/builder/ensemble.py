@@ -147,7 +147,7 @@ def build_ensemble(model, ens):
     eval_points = gen_eval_points(ens, ens.eval_points, rng=rng)
 
     # Set up signal
-    model.sig[ens]['in'] = Signal(np.zeros(ens.dimensions),
+    model.sig[ens]['in'] = Signal(np.zeros(ens.dimensions, dtype=model.dtype),
                                   name="%s.signal" % ens)
     model.add_op(Reset(model.sig[ens]['in']))
 
@@ -167,16 +167,19 @@ def build_ensemble(model, ens):
 
     if isinstance(ens.neuron_type, Direct):
         model.sig[ens.neurons]['in'] = Signal(
-            np.zeros(ens.dimensions), name='%s.neuron_in' % ens)
+            np.zeros(ens.dimensions, dtype=model.dtype),
+            name='%s.neuron_in' % ens)
         model.sig[ens.neurons]['out'] = model.sig[ens.neurons]['in']
         model.add_op(Reset(model.sig[ens.neurons]['in']))
     else:
         model.sig[ens.neurons]['in'] = Signal(
-            np.zeros(ens.n_neurons), name="%s.neuron_in" % ens)
+            np.zeros(ens.n_neurons, dtype=model.dtype),
+            name="%s.neuron_in" % ens)
         model.sig[ens.neurons]['out'] = Signal(
-            np.zeros(ens.n_neurons), name="%s.neuron_out" % ens)
+            np.zeros(ens.n_neurons, dtype=model.dtype),
+            name="%s.neuron_out" % ens)
         model.sig[ens.neurons]['bias'] = Signal(
-            bias, name="%s.bias" % ens, readonly=True)
+            bias.astype(model.dtype), name="%s.bias" % ens, readonly=True)
         model.add_op(Copy(model.sig[ens.neurons]['bias'],
                           model.sig[ens.neurons]['in']))
         # This adds the neuron's operator and sets other signals
@@ -189,7 +192,8 @@ def build_ensemble(model, ens):
         scaled_encoders = encoders * (gain / ens.radius)[:, np.newaxis]
 
     model.sig[ens]['encoders'] = Signal(
-        scaled_encoders, name="%s.scaled_encoders" % ens, readonly=True)
+        scaled_encoders.astype(model.dtype),
+        name="%s.scaled_encoders" % ens, readonly=True)
 
     # Inject noise if specified
     if ens.noise is not None:
@@ -62,6 +62,8 @@ class SimBCM(Operator):
     4. updates ``[delta]``
     """
 
+    thread_safe = True
+
     def __init__(self, pre_filtered, post_filtered, theta, delta,
                  learning_rate, tag=None):
         super(SimBCM, self).__init__(tag=tag)
@@ -112,6 +114,8 @@ class SimBCM(Operator):
 
 class SimInhVSG(Operator):
     """Calculate delta omega according to the VSG rule."""
+
+    thread_safe = True
     def __init__(self, pre_filtered, post_filtered, theta, delta,
                  learning_signal, learning_rate, tag=None):
         super(SimInhVSG, self).__init__(tag=tag)
@@ -221,6 +225,8 @@ class SimOja(Operator):
     4. updates ``[delta]``
     """
 
+    thread_safe = True
+
     def __init__(self, pre_filtered, post_filtered, weights, delta,
                  learning_rate, beta, tag=None):
         super(SimOja, self).__init__(tag=tag)
@@ -324,6 +330,8 @@ class SimVoja(Operator):
     4. updates ``[delta]``
     """
 
+    thread_safe = True
+
     def __init__(self, pre_decoded, post_filtered, scaled_encoders, delta,
                  scale, learning_signal, learning_rate, tag=None):
         super(SimVoja, self).__init__(tag=tag)
@@ -438,7 +446,7 @@ def build_learning_rule(model, rule):
     else:
         raise BuildError("Unknown target %r" % rule.modifies)
 
-    delta = Signal(np.zeros(target.shape), name='Delta')
+    delta = Signal(np.zeros(target.shape, dtype=model.dtype), name='Delta')
 
     # update the target (weights/encoders as set above)
     # clip based on clip_type
@@ -504,14 +512,16 @@ def build_inhvsg(model, inhvsg, rule):
     # Learning signal, defaults to 1 in case no connection is made
     # and multiplied by the learning_rate * dt
     assert rule.size_in == 1
-    learning = Signal(np.zeros(rule.size_in), name="InhVSG:learning")
+    learning = Signal(np.zeros(rule.size_in, dtype=model.dtype),
+                      name="InhVSG:learning")
     model.add_op(Reset(learning, value=1.0))
     model.sig[rule]['in'] = learning  # optional connection will attach here
     if isinstance(inhvsg.theta,float):
-        theta = Signal(np.ones(conn.size_out)*inhvsg.theta,
+        theta = Signal(np.ones(conn.size_out, dtype=model.dtype)*inhvsg.theta,
                             name="InhVSG:theta", readonly=True)
     else:
-        theta = Signal(inhvsg.theta, name="InhVSG:theta", readonly=True)
+        theta = Signal(np.asarray(inhvsg.theta, dtype=model.dtype),
+                       name="InhVSG:theta", readonly=True)
 
     pre_activities = model.sig[get_pre_ens(conn).neurons]['out']
     pre_filtered = model.build(Lowpass(inhvsg.pre_tau), pre_activities)
@@ -603,7 +613,8 @@ def build_voja(model, voja, rule):
 
     # Learning signal, defaults to 1 in case no connection is made
     # and multiplied by the learning_rate * dt
-    learning = Signal(np.zeros(rule.size_in), name="Voja:learning")
+    learning = Signal(np.zeros(rule.size_in, dtype=model.dtype),
+                      name="Voja:learning")
     assert rule.size_in == 1
     model.add_op(Reset(learning, value=1.0))
     model.sig[rule]['in'] = learning  # optional connection will attach here
@@ -642,7 +653,8 @@ def build_voltagerule(model, voltagerule, rule):
     acts = model.build(Lowpass(voltagerule.pre_tau), model.sig[conn.pre_obj]['out'])
 
     # Use the post-synaptic voltage as the local error signal
-    local_error = Signal(np.zeros(voltage.shape), name="VoltageRule:correction")
+    local_error = Signal(np.zeros(voltage.shape, dtype=model.dtype),
+                         name="VoltageRule:correction")
     model.add_op(Reset(local_error))
     
     # correction = -learning_rate * (dt / n_neurons) * error
@@ -705,14 +717,15 @@ def build_pes(model, pes, rule):
     conn = rule.connection
 
     # Create input error signal
-    error = Signal(np.zeros(rule.size_in), name="PES:error")
+    error = Signal(np.zeros(rule.size_in, dtype=model.dtype), name="PES:error")
     model.add_op(Reset(error))
     model.sig[rule]['in'] = error  # error connection will attach here
 
     acts = model.build(Lowpass(pes.pre_tau), model.sig[conn.pre_obj]['out'])
 
     # Compute the correction, i.e. the scaled negative error
-    correction = Signal(np.zeros(error.shape), name="PES:correction")
+    correction = Signal(np.zeros(error.shape, dtype=model.dtype),
+                        name="PES:correction")
     model.add_op(Reset(correction))
 
     # correction = -learning_rate * (dt / n_neurons) * error
@@ -730,7 +743,8 @@ def build_pes(model, pes, rule):
         encoders = model.sig[post]['encoders']
 
         # encoded = dot(encoders, correction)
-        encoded = Signal(np.zeros(weights.shape[0]), name="PES:encoded")
+        encoded = Signal(np.zeros(weights.shape[0], dtype=model.dtype),
+                         name="PES:encoded")
         model.add_op(Reset(encoded))
         model.add_op(DotInc(encoders, correction, encoded, tag="PES:encode"))
         local_error = encoded
@@ -1,21 +1,57 @@
+import collections
 import contextlib
+import copy
 import logging
 
 import numpy as np
 
 import nengo.utils.numpy as npext
+from nengo.base import ObjView
 from nengo.builder import Builder
-from nengo.connection import Connection
-from nengo.ensemble import Ensemble
+from nengo.builder.builder import param_snapshot
+from nengo.builder.connection import DecoderSolverPool
+from nengo.connection import Connection, LearningRule
+from nengo.ensemble import Ensemble, Neurons
+from nengo.exceptions import BuildError
 from nengo.network import Network
 from nengo.node import Node
 from nengo.probe import Probe
+from nengo.utils.compat import iteritems
 from nengo.utils.progress import ProgressTracker
 
 logger = logging.getLogger(__name__)
 nullcontext = contextlib.contextmanager(lambda: (yield))
 
 
+# Put probes last so that they don't influence other seeds
+seed_order = (Connection, Ensemble, Network, Node, Probe)
+
+
+def get_seed(obj, rng):
+    """Returns the seed of ``obj``, drawing one from ``rng`` if it has none.
+
+    A seed is drawn no matter what, so that setting a seed or not on one
+    object doesn't affect the seeds of other objects.
+    """
+    seed = rng.randint(npext.maxint)
+    return seed if getattr(obj, 'seed', None) is None else obj.seed
+
+
+def seed_objects(network, seeds, seeded):
+    """Assigns seeds to the objects of ``network``.
+
+    The seed of ``network`` must already be in ``seeds`` and ``seeded``.
+    See `.Model` for the meaning of ``seeds`` and ``seeded``.
+    """
+    rng = np.random.RandomState(seeds[network])
+    assert all(tp in seed_order for tp in network.objects)
+    for obj_type in seed_order:
+        for obj in network.objects[obj_type]:
+            seeded[obj] = (seeded[network] or
+                           getattr(obj, 'seed', None) is not None)
+            seeds[obj] = get_seed(obj, rng)
+
+
 @Builder.register(Network)  # noqa: C901
 def build_network(model, network, progress_bar=False):
     """Builds a `.Network` object into a model.
@@ -34,6 +70,10 @@ def build_network(model, network, progress_bar=False):
     is tracked, and the decoder cache is only used when the seed is assigned
     manually.
 
+    If ``model.build_workers > 1``, the decoders of the connections of each
+    network are submitted to a `.DecoderSolverPool` at the start of step 3,
+    and solved in parallel while the connections are built.
+
     Parameters
     ----------
     model : Model
@@ -56,13 +96,6 @@ def build_network(model, network, progress_bar=False):
     -----
     Sets ``model.params[network]`` to ``None``.
     """
-    def get_seed(obj, rng):
-        # Generate a seed no matter what, so that setting a seed or not on
-        # one object doesn't affect the seeds of other objects.
-        seed = rng.randint(npext.maxint)
-        return (seed if not hasattr(obj, 'seed') or obj.seed is None
-                else obj.seed)
-
     if model.toplevel is None:
         model.toplevel = network
         model.seeds[network] = get_seed(network, np.random)
@@ -78,21 +111,21 @@ def build_network(model, network, progress_bar=False):
     model.config = network.config
 
     # assign seeds to children
-    rng = np.random.RandomState(model.seeds[network])
-    # Put probes last so that they don't influence other seeds
-    sorted_types = (Connection, Ensemble, Network, Node, Probe)
-    assert all(tp in sorted_types for tp in network.objects)
-    for obj_type in sorted_types:
-        for obj in network.objects[obj_type]:
-            model.seeded[obj] = (model.seeded[network] or
-                                 getattr(obj, 'seed', None) is not None)
-            model.seeds[obj] = get_seed(obj, rng)
+    seed_objects(network, model.seeds, model.seeded)
 
     # If this is the toplevel network, enter the decoder cache
     context = (model.decoder_cache if model.toplevel is network
                else nullcontext())
-    with context, progress:
+    # and, if there are several build workers, start the decoder pool
+    pool = (DecoderSolverPool(model.build_workers, model.build_processes)
+            if model.toplevel is network and model.build_workers > 1
+            else None)
+    with context, pool or nullcontext(), progress:
         model.build_callback = lambda obj: progress.step()
+        if pool is not None:
+            model.decoder_pool = pool
+        if model.toplevel is network:
+            model.shared_inputs = {}
 
         logger.debug("Network step 1: Building ensembles and nodes")
         for obj in network.ensembles + network.nodes:
@@ -103,6 +136,9 @@ def build_network(model, network, progress_bar=False):
             model.build(subnetwork)
 
         logger.debug("Network step 3: Building connections")
+        if model.decoder_pool is not None:
+            for conn in network.connections:
+                model.decoder_pool.submit(model, conn)
         for conn in network.connections:
             # NB: we do these in the order in which they're defined, and build
             # the learning rule in the connection builder. Because learning
@@ -122,7 +158,164 @@ def build_network(model, network, progress_bar=False):
             model.decoder_cache.shrink()
 
         model.build_callback = None
+        if pool is not None:
+            model.decoder_pool = None
+        if model.toplevel is network:
+            model.shared_inputs = None
 
     # Unset config
     model.config = old_config
     model.params[network] = None
+
+
+def rebuild_network(model, network):  # noqa: C901
+    """Returns a model of ``network`` that reuses the objects of ``model``.
+
+    ``model`` must have been created with ``incremental=True``, have built
+    ``network`` as its top-level network, and not have been optimized.
+    ``model`` is not modified.
+
+    The seeds of all objects are assigned again, in the same way as in
+    `.build_network` (the top-level network keeps its seed, unless a
+    different one has been set on it). An object is built again if
+
+    1. it was added to the network,
+    2. its parameters changed (see `.param_snapshot`) or its seed changed,
+    3. or it is a connection from or to an object that is built again
+       (including its ensemble and learning rules), or a probe of such
+       an object.
+
+    The operators, signals and parameters of all other objects are taken
+    from ``model``; those of removed objects and of objects built again
+    are dropped. Note that adding a connection or ensemble changes the
+    automatically assigned seeds of other objects in its network (so that
+    they are built again too), unless these objects have their own seed.
+    Adding a probe only changes the seeds of the probes after it.
+
+    Parameters
+    ----------
+    model : Model
+        The model that built a previous version of ``network``.
+    network : Network
+        The top-level network to build.
+
+    Returns
+    -------
+    Model
+        A new model of ``network``. Its operators are copies of the ones in
+        ``model``, followed by the operators of the objects built again.
+    """
+    if not model.incremental:
+        raise BuildError("Cannot rebuild a model created without "
+                         "'incremental=True'.")
+    if model.optimized:
+        raise BuildError("Cannot rebuild an optimized model. Rebuild the "
+                         "model before giving it to the Simulator.")
+    if model.toplevel is not network:
+        raise BuildError("Can only rebuild the top-level network of the "
+                         "model (%s)." % model.toplevel)
+
+    # assign seeds as build_network would
+    seeds, seeded = {}, {}
+    seeds[network] = (model.seeds[network] if network.seed is None
+                      else network.seed)
+    seeded[network] = network.seed is not None
+    for net in [network] + network.all_networks:
+        seed_objects(net, seeds, seeded)
+
+    # find the objects to build
+    current = set(seeds)
+    built = set(obj for obj, parent in iteritems(model.parents)
+                if parent is None or isinstance(parent, Network))
+    stale = set(obj for obj in built & current
+                if seeds[obj] != model.seeds[obj]
+                or seeded[obj] != model.seeded[obj]
+                or param_snapshot(obj) != model.snapshots[obj])
+    stale.update(obj for obj in current - built
+                 if not isinstance(obj, Network))
+
+    def owner(obj):
+        obj = obj.obj if isinstance(obj, ObjView) else obj
+        if isinstance(obj, Neurons):
+            return obj.ensemble
+        elif isinstance(obj, LearningRule):
+            return obj.connection
+        return obj
+
+    dependents = network.all_connections + network.all_probes
+    n_stale = None
+    while n_stale != len(stale):
+        n_stale = len(stale)
+        for obj in dependents:
+            if obj in stale:
+                continue
+            if isinstance(obj, Probe):
+                targets = [obj.target]
+            else:
+                targets = [obj.pre, obj.post]
+            if any(owner(target) in stale for target in targets):
+                stale.add(obj)
+
+    # drop the removed and stale objects, and everything they built
+    dropped = (built - current) | stale
+    n_dropped = None
+    while n_dropped != len(dropped):
+        n_dropped = len(dropped)
+        dropped.update(obj for obj, parent in iteritems(model.parents)
+                       if parent in dropped)
+
+    new = copy.copy(model)
+    new.operators = []
+    new.origins = {}
+    for op in model.operators:
+        objs = model.origins.get(op, [])
+        if len(objs) == 0 or not all(obj in dropped for obj in objs):
+            op_copy = copy.copy(op)
+            new.operators.append(op_copy)
+            if len(objs) > 0:
+                new.origins[op_copy] = objs
+
+    def keep(d):
+        return dict((k, v) for k, v in iteritems(d) if k not in dropped)
+
+    dropped_sigs = dropped | set(
+        obj.neurons for obj in dropped if isinstance(obj, Ensemble))
+    new.sig = collections.defaultdict(dict, (
+        (k, dict(v)) for k, v in iteritems(model.sig)
+        if k not in dropped_sigs))
+    new.params = dict((k, v) for k, v in iteritems(model.params)
+                      if k not in dropped_sigs)
+    new.probes = [probe for probe in model.probes if probe not in dropped]
+    new.parents = keep(model.parents)
+    new.snapshots = keep(model.snapshots)
+    new.seeds = keep(model.seeds)
+    new.seeded = keep(model.seeded)
+    new.seeds.update(seeds)
+    new.seeded.update(seeded)
+    new.decoder_pool = None
+    new.build_callback = None
+    new._building = []
+    logger.info("Rebuilding %d of %d objects", len(stale), len(current))
+
+    def build(net):
+        new.config = net.config
+        if net not in new.params:
+            new.params[net] = None
+            new.snapshots[net] = param_snapshot(net)
+        for objs in (net.ensembles + net.nodes, net.networks,
+                     net.connections, net.probes):
+            for obj in objs:
+                if isinstance(obj, Network):
+                    build(obj)
+                    new.parents[obj] = net
+                elif obj in stale:
+                    new.build(obj)
+                    new.parents[obj] = net
+
+    with new.decoder_cache:
+        new.shared_inputs = {}
+        build(network)
+        new.decoder_cache.shrink()
+    new.shared_inputs = None
+    new.config = None
+    return new
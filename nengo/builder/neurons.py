@@ -44,6 +44,8 @@ class SimNeurons(Operator):
     4. updates ``[]``
     """
 
+    thread_safe = True
+
     def __init__(self, neurons, J, output, states=None, tag=None):
         super(SimNeurons, self).__init__(tag=tag)
         self.neurons = neurons
@@ -72,11 +74,19 @@ class SimNeurons(Operator):
         J = signals[self.J]
         output = signals[self.output]
         states = [signals[state] for state in self.states]
+        step_math = self.neurons.step_math
 
         def step_simneurons():
-            self.neurons.step_math(dt, J, output, *states)
+            step_math(dt, J, output, *states)
         return step_simneurons
 
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        # step_math is elementwise, so it can advance all trials at once
+        if all(signals.is_batched(sig) for sig in self.all_signals):
+            return self.make_step(signals, dt, rngs[0])
+        return super(SimNeurons, self).make_batch_step(
+            signals, dt, rngs, trial_signals)
+
 
 @Builder.register(NeuronType)
 def build_neurons(model, neurontype, neurons):
@@ -130,9 +140,11 @@ def build_lif(model, lif, neurons):
     """
 
     model.sig[neurons]['voltage'] = Signal(
-        np.zeros(neurons.size_in), name="%s.voltage" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.voltage" % neurons)
     model.sig[neurons]['refractory_time'] = Signal(
-        np.zeros(neurons.size_in), name="%s.refractory_time" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.refractory_time" % neurons)
     model.add_op(SimNeurons(
         neurons=lif,
         J=model.sig[neurons]['in'],
@@ -164,7 +176,8 @@ def build_alifrate(model, alifrate, neurons):
     """
 
     model.sig[neurons]['adaptation'] = Signal(
-        np.zeros(neurons.size_in), name="%s.adaptation" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.adaptation" % neurons)
     model.add_op(SimNeurons(neurons=alifrate,
                             J=model.sig[neurons]['in'],
                             output=model.sig[neurons]['out'],
@@ -195,11 +208,14 @@ def build_alif(model, alif, neurons):
     """
 
     model.sig[neurons]['voltage'] = Signal(
-        np.zeros(neurons.size_in), name="%s.voltage" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.voltage" % neurons)
     model.sig[neurons]['refractory_time'] = Signal(
-        np.zeros(neurons.size_in), name="%s.refractory_time" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.refractory_time" % neurons)
     model.sig[neurons]['adaptation'] = Signal(
-        np.zeros(neurons.size_in), name="%s.adaptation" % neurons)
+        np.zeros(neurons.size_in, dtype=model.dtype),
+        name="%s.adaptation" % neurons)
     model.add_op(SimNeurons(neurons=alif,
                             J=model.sig[neurons]['in'],
                             output=model.sig[neurons]['out'],
@@ -231,10 +247,11 @@ def build_izhikevich(model, izhikevich, neurons):
     """
 
     model.sig[neurons]['voltage'] = Signal(
-        np.ones(neurons.size_in) * izhikevich.reset_voltage,
+        np.ones(neurons.size_in, dtype=model.dtype)
+        * izhikevich.reset_voltage,
         name="%s.voltage" % neurons)
     model.sig[neurons]['recovery'] = Signal(
-        np.ones(neurons.size_in)
+        np.ones(neurons.size_in, dtype=model.dtype)
         * izhikevich.reset_voltage
         * izhikevich.coupling, name="%s.recovery" % neurons)
     model.add_op(SimNeurons(neurons=izhikevich,
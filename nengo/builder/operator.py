@@ -75,8 +75,15 @@ class Operator(object):
     ----------
     tag : str or None
         A label associated with the operator, for debugging purposes.
+    thread_safe : bool
+        Whether the step function can be run outside of the main thread
+        (see the ``n_threads`` argument of `.Simulator`). This should only
+        be True for operators whose step is a vectorized NumPy computation,
+        which releases the global interpreter lock and calls no user code.
     """
 
+    thread_safe = False
+
     def __init__(self, tag=None):
         self.tag = tag
 
@@ -176,9 +183,46 @@ class Operator(object):
             Length of each simulation timestep, in seconds.
         rng : `numpy.random.RandomState`
             Random number generator for stochastic operators.
+
+        Notes
+        -----
+        State that the callable keeps between time steps outside of
+        ``signals`` should be exposed in a ``state`` attribute of the callable
+        (see `.get_step_state`), so that `.Simulator.save_state` can save it.
         """
         raise NotImplementedError("subclasses must implement this method.")
 
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        """Returns a callable that advances all trials of a batch.
+
+        By default, ``make_step`` is called for each trial with the
+        signals of that trial, and the returned callable runs these steps
+        one after the other. Operators that can advance all trials with
+        one vectorized computation should override this method.
+
+        Parameters
+        ----------
+        signals : BatchSignalDict
+            A mapping from signals to their associated live ndarrays,
+            which have a leading batch axis.
+        dt : float
+            Length of each simulation timestep, in seconds.
+        rngs : list of `numpy.random.RandomState`
+            Random number generators for each trial.
+        trial_signals : list of SignalDict
+            The signals of each trial (see `.BatchSignalDict.trial`).
+        """
+        steps = [self.make_step(trial_signals[i], dt, rng)
+                 for i, rng in enumerate(rngs)]
+
+        def step_batch():
+            for step in steps:
+                step()
+
+        step_batch.state = {i: step.state for i, step in enumerate(steps)
+                            if hasattr(step, 'state')}
+        return step_batch
+
 
 class TimeUpdate(Operator):
     """Updates the simulation step and time.
@@ -215,6 +259,8 @@ class TimeUpdate(Operator):
     4. updates ``[]``
     """
 
+    thread_safe = True
+
     def __init__(self, step, time, tag=None):
         super(TimeUpdate, self).__init__(tag=tag)
         self.sets = [step, time]
@@ -240,6 +286,10 @@ class TimeUpdate(Operator):
 
         return step_timeupdate
 
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        # step and time are shared by all trials
+        return self.make_step(signals, dt, rngs[0])
+
 
 class Reset(Operator):
     """Assign a constant value to a Signal.
@@ -272,6 +322,8 @@ class Reset(Operator):
     4. updates ``[]``
     """
 
+    thread_safe = True
+
     def __init__(self, dst, value=0, tag=None):
         super(Reset, self).__init__(tag=tag)
         self.value = float(value)
@@ -296,6 +348,9 @@ class Reset(Operator):
             target[...] = value
         return step_reset
 
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        return self.make_step(signals, dt, rngs[0])
+
 
 class Copy(Operator):
     """Assign the value of one signal to another, with optional slicing.
@@ -343,6 +398,8 @@ class Copy(Operator):
     4. updates ``[]``
     """
 
+    thread_safe = True
+
     def __init__(self, src, dst,
                  src_slice=None, dst_slice=None, inc=False, tag=None):
         super(Copy, self).__init__(tag=tag)
@@ -384,9 +441,24 @@ class Copy(Operator):
         dst = signals[self.dst]
         src_slice = self.src_slice if self.src_slice is not None else Ellipsis
         dst_slice = self.dst_slice if self.dst_slice is not None else Ellipsis
-        inc = self.inc
+        return self._make_step(src, dst, src_slice, dst_slice)
+
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        if not signals.is_batched(self.dst):
+            return super(Copy, self).make_batch_step(
+                signals, dt, rngs, trial_signals)
 
-        if inc:
+        def batch_slice(sig, sl):
+            if sl is None:
+                return Ellipsis
+            return (slice(None), sl) if signals.is_batched(sig) else sl
+
+        return self._make_step(signals[self.src], signals[self.dst],
+                               batch_slice(self.src, self.src_slice),
+                               batch_slice(self.dst, self.dst_slice))
+
+    def _make_step(self, src, dst, src_slice, dst_slice):
+        if self.inc:
             def step_copy():
                 dst[dst_slice] += src[src_slice]
         else:
@@ -441,6 +513,8 @@ class ElementwiseInc(Operator):
     4. updates ``[]``
     """
 
+    thread_safe = True
+
     def __init__(self, A, X, Y, tag=None, clip_type=0, decay_factor=1.0):
         super(ElementwiseInc, self).__init__(tag=tag)
         self.sets = []
@@ -469,29 +543,61 @@ class ElementwiseInc(Operator):
         A = signals[self.A]
         X = signals[self.X]
         Y = signals[self.Y]
+        self._check_shapes(A.shape, X.shape, Y.shape)
+        return self._make_step(A, X, Y)
+
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        if not signals.is_batched(self.Y):
+            return super(ElementwiseInc, self).make_batch_step(
+                signals, dt, rngs, trial_signals)
+        self._check_shapes(self.A.shape, self.X.shape, self.Y.shape)
+
+        # give batched arrays the same number of dimensions after the batch
+        # axis, so that they broadcast like the arrays of a single trial
+        ndim = max(self.A.ndim, self.X.ndim, self.Y.ndim)
+
+        def batch_view(sig):
+            x = signals[sig]
+            if not signals.is_batched(sig):
+                return x
+            return x[(slice(None),) + (np.newaxis,) * (ndim - sig.ndim)]
 
+        return self._make_step(
+            batch_view(self.A), batch_view(self.X), batch_view(self.Y))
+
+    def _check_shapes(self, Ashape, Xshape, Yshape):
         # check broadcasting shapes
-        Ashape = npext.broadcast_shape(A.shape, 2)
-        Xshape = npext.broadcast_shape(X.shape, 2)
-        Yshape = npext.broadcast_shape(Y.shape, 2)
+        Ashape = npext.broadcast_shape(Ashape, 2)
+        Xshape = npext.broadcast_shape(Xshape, 2)
+        Yshape = npext.broadcast_shape(Yshape, 2)
         assert all(len(s) == 2 for s in [Ashape, Xshape, Yshape])
         for da, dx, dy in zip(Ashape, Xshape, Yshape):
             if not (da in [1, dy] and dx in [1, dy] and max(da, dx) == dy):
                 raise BuildError("Incompatible shapes in ElementwiseInc: "
                                  "Trying to do %s += %s * %s" %
                                  (Yshape, Ashape, Xshape))
+
+    def _make_step(self, A, X, Y):
         decay_factor = self.decay_factor
         clip_type = self.clip_type
-        print self.tag,clip_type,decay_factor
+
+        # choose the step function once, so that plain increments do not
+        # pay for the decay and clipping on every step
+        if decay_factor == 1 and clip_type == 0:
+            def step_elementwiseinc():
+                Y[...] += A * X
+            return step_elementwiseinc
+
+        # clip_type =0:no clipping; =1:clip<0; =2:clip>0
+        clip_min, clip_max = {0: (None, None),
+                              1: (0, None),
+                              2: (None, 0)}[clip_type]
 
         def step_elementwiseinc():
             Y[...] *= decay_factor
             Y[...] += A * X
-            # clip_type =0:no clipping; =1:clip<0; =2:clip>0
-            if clip_type == 1: 
-                Y[...] = Y.clip(0)
-            elif clip_type == 2:
-                Y[...] = Y.clip(max=0)
+            if clip_type != 0:
+                np.clip(Y, clip_min, clip_max, out=Y)
         return step_elementwiseinc
 
 
@@ -559,8 +665,22 @@ class DotInc(Operator):
     2. incs ``[Y]``
     3. reads ``[A, X]``
     4. updates ``[]``
+
+    If ``A`` is a large readonly matrix (e.g., the weights of a connection
+    without learning rule), the step function skips the zero elements of
+    ``X`` in time steps in which only a few of them are nonzero (e.g.,
+    when ``X`` are the spikes of an ensemble). The rows of ``A.T`` for the
+    nonzero elements are then summed, which needs a transposed copy of
+    ``A`` that is made the first time this happens.
     """
 
+    thread_safe = True
+
+    # Matrices with fewer elements use the dense product in every step
+    sparse_min_size = 250000
+    # Largest fraction of nonzero elements of X for the sparse product
+    sparse_max_density = 0.1
+
     def __init__(self, A, X, Y, reshape=None, tag=None):
         super(DotInc, self).__init__(tag=tag)
 
@@ -594,16 +714,69 @@ class DotInc(Operator):
     def _descstr(self):
         return '%s, %s -> %s' % (self.A, self.X, self.Y)
 
+    @property
+    def sparse(self):
+        """(bool) Whether the step skips zero elements of ``X``."""
+        return (type(self) is DotInc and self.A.readonly
+                and self.A.ndim == 2 and self.X.ndim == 1
+                and self.A.size >= self.sparse_min_size and not self.reshape)
+
     def make_step(self, signals, dt, rng):
         X = signals[self.X]
         A = signals[self.A]
         Y = signals[self.Y]
 
+        if self.sparse:
+            return self._make_sparse_step(A, X, Y)
+        if self.reshape:
+            def step_dotinc():
+                Y[...] += np.asarray(np.dot(A, X)).reshape(Y.shape)
+        else:
+            def step_dotinc():
+                Y[...] += np.dot(A, X)
+        return step_dotinc
+
+    def _make_sparse_step(self, A, X, Y):
+        max_nonzero = int(self.sparse_max_density * X.size)
+        AT = []  # transposed copy of A, made when it is first needed
+
+        def step_dotinc():
+            if np.count_nonzero(X) > max_nonzero:
+                Y[...] += np.dot(A, X)
+                return
+            if not AT:
+                AT.append(np.ascontiguousarray(A.T))
+            nz = np.flatnonzero(X)
+            Y[...] += np.dot(X[nz], AT[0][nz])
+        return step_dotinc
+
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        if (self.A.ndim != 2 or self.X.size != self.A.shape[1]
+                or self.Y.size != self.A.shape[0]
+                or not signals.is_batched(self.Y)):
+            return super(DotInc, self).make_batch_step(
+                signals, dt, rngs, trial_signals)
+
+        X = signals[self.X]
+        A = signals[self.A]
+        Y = signals[self.Y]
+        A_batched = signals.is_batched(self.A)
+        X_batched = signals.is_batched(self.X)
+        n_trials = signals.n_trials
+        xshape = (n_trials, -1) if X_batched else (-1,)
+        incshape = ((n_trials,) if A_batched or X_batched else ()) + (
+            self.Y.shape)
+
         def step_dotinc():
-            inc = np.dot(A, X)
-            if self.reshape:
-                inc = np.asarray(inc).reshape(Y.shape)
-            Y[...] += inc
+            x = X.reshape(xshape)
+            if not A_batched:
+                # one matrix-matrix product for all trials
+                inc = np.dot(x, A.T)
+            elif X_batched:
+                inc = np.matmul(A, x[..., np.newaxis])
+            else:
+                inc = np.dot(A, x)
+            Y[...] += inc.reshape(incshape)
         return step_dotinc
 
 
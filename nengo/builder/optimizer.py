@@ -48,9 +48,16 @@ def optimize(model, dg, max_passes=None):
     dg : dict
         Dict of the form ``{a: {b, c}}`` where ``b`` and ``c`` depend on ``a``,
         specifying the operator dependency graph of the model.
+
+    Notes
+    -----
+    If the model has a ``build_profiler``, the passes and the total time
+    of the optimizer are recorded in it.
     """
 
     logger.info("Optimizing model...")
+    profiler = model.build_profiler
+    start = Timer.TIMER()
 
     # We try first to merge operators with views only as these have a fixed
     # order for the memory alignment whereas operators without views could
@@ -62,7 +69,7 @@ def optimize(model, dg, max_passes=None):
     # operators without views and then try again merging views (because
     # each operator merge might generate new views).
 
-    single_pass = OpMergePass(dg)
+    single_pass = OpMergePass(dg, model.operators)
 
     n_initial_ops = len(dg)
     cum_duration = 0.
@@ -90,6 +97,9 @@ def optimize(model, dg, max_passes=None):
             "Pass %i [%s]: Reduced %i to %i operators in %fs.",
             i, "views" if only_merge_ops_with_view else "non-views",
             before, after, t.duration)
+        if profiler is not None:
+            profiler.add_pass(
+                i, only_merge_ops_with_view, before, after, t.duration)
 
         # Prevent optimizer from running too long if we get up diminishing
         # returns.
@@ -106,22 +116,32 @@ def optimize(model, dg, max_passes=None):
                 "Stopping optimizer.".format(threshold))
             break
 
-    # Update model signals
-    for sigdict in itervalues(model.sig):
-        for name in sigdict:
-            while sigdict[name] in single_pass.sig_replacements:
-                sigdict[name] = single_pass.sig_replacements[sigdict[name]]
+    single_pass.replace_model_signals(model.sig)
+    model.origins = single_pass.remap_origins(model.origins)
 
-    # Reinitialize the model's operator list
+    # Reinitialize the model's operator list, keeping the order in which
+    # the (first of the merged) operators were originally added
     del model.operators[:]
-    for op in dg:
+    for op in sorted(dg, key=single_pass.order.get):
         model.add_op(op)
 
+    model.optimized = True
+
+    if profiler is not None:
+        profiler.optimize_time += Timer.TIMER() - start
+
 
 class OpMergePass(object):
-    def __init__(self, dg):
+    def __init__(self, dg, op_order=None):
         self.dg = BidirectionalDAG(dg)
         self.might_merge = set(dg)
+
+        # Operators are considered for merging in this order (merged
+        # operators take the place of their first operator), so that the
+        # merges do not depend on set ordering and are reproducible.
+        op_order = list(dg) if op_order is None else op_order
+        self.order = {op: i for i, op in enumerate(op_order)}
+        self.op_replacements = {}
         self.sig_replacements = {}
 
         self.sig2ops = WeakKeyDefaultDict(WeakSet)
@@ -169,7 +189,7 @@ class OpMergePass(object):
 
         # We go through the ops grouped by type as only ops with the same
         # type can be merged.
-        by_type = groupby(self.might_merge, type)
+        by_type = groupby(sorted(self.might_merge, key=self.order.get), type)
 
         # Note that we will stop once we merge any operator, so merges are
         # performed on at most one type of operator per pass.
@@ -178,7 +198,9 @@ class OpMergePass(object):
 
         # We go through ops in a heuristic order to reduce runtime
         firstops = [ElementwiseInc, Copy, DotInc, SimNeurons]
-        sortedops = firstops + [op for op in by_type if op not in firstops]
+        sortedops = firstops + sorted(
+            (op for op in by_type if op not in firstops),
+            key=lambda op: op.__name__)
         for optype in sortedops:
 
             if OpMerger.is_type_mergeable(optype):
@@ -207,7 +229,8 @@ class OpMergePass(object):
                 # If we're only merging views, then we get rid of this subset.
                 del by_view[None]
 
-            for view_subset in itervalues(by_view):
+            for view_subset in sorted(itervalues(by_view),
+                                      key=lambda ops: self.order[ops[0]]):
                 if len(view_subset) > 1:
                     self.perform_merges_for_view_subset(view_subset)
         elif None in by_view and len(by_view[None]) > 1:
@@ -226,7 +249,7 @@ class OpMergePass(object):
 
         # Sort to have sequential memory.
         offsets = np.array([self.opinfo[op].v_offset for op in subset])
-        sort_indices = np.argsort(offsets)
+        sort_indices = np.argsort(offsets, kind='mergesort')
         offsets = offsets[sort_indices]
         sorted_subset = [subset[i] for i in sort_indices]
 
@@ -273,6 +296,29 @@ class OpMergePass(object):
             elif self.only_merge_ops_with_view:
                 self.might_merge.remove(op1)
 
+    def final_op(self, op):
+        """Returns the operator that ``op`` has been merged into."""
+        while op in self.op_replacements:
+            op = self.op_replacements[op]
+        return op
+
+    def replace_model_signals(self, model_sig):
+        """Replaces merged signals in the ``model.sig`` dictionary."""
+        for sigdict in itervalues(model_sig):
+            for name in sigdict:
+                while sigdict[name] in self.sig_replacements:
+                    sigdict[name] = self.sig_replacements[sigdict[name]]
+
+    def remap_origins(self, origins):
+        """Returns ``model.origins`` with the keys mapped to merged operators.
+
+        Merged operators keep track of the objects of the replaced operators.
+        """
+        remapped = {}
+        for op, objs in iteritems(origins):
+            remapped.setdefault(self.final_op(op), []).extend(objs)
+        return remapped
+
     def merge(self, tomerge):
         """Merges the given operators.
 
@@ -283,12 +329,15 @@ class OpMergePass(object):
         """
         merged_op, merged_sig = OpMerger.merge(tomerge.ops)
         self.dg.merge(tomerge.ops, merged_op)
+        self.order[merged_op] = min(self.order[op] for op in tomerge.ops)
 
         # Update tracking what has been merged and might be mergeable later
         self.might_merge.difference_update(tomerge.ops)
         self.might_merge.add(merged_op)
         self.merged.update(tomerge.ops)
         self.merged_dependents.update(tomerge.all_dependents)
+        for op in tomerge.ops:
+            self.op_replacements[op] = merged_op
 
         for op in tomerge.ops:
             # Mark all operators referencing the same signals as merged
@@ -83,6 +83,12 @@ class SimProcess(Operator):
     def t(self):
         return self.reads[0]
 
+    @property
+    def thread_safe(self):
+        # synapses are linear filters computed with NumPy, whereas other
+        # processes may run arbitrary Python code in their step functions
+        return isinstance(self.process, Synapse)
+
     def _descstr(self):
         return '%s, %s -> %s' % (self.process, self.input, self.output)
 
@@ -93,7 +99,12 @@ class SimProcess(Operator):
         shape_in = input.shape if input is not None else (0,)
         shape_out = output.shape if output is not None else (0,)
         rng = self.process.get_rng(rng)
-        step_f = self.process.make_step(shape_in, shape_out, dt, rng)
+        if isinstance(self.process, Synapse) and output is not None:
+            # filter in the precision of the output signal
+            step_f = self.process.make_step(
+                shape_in, shape_out, dt, rng, dtype=output.dtype)
+        else:
+            step_f = self.process.make_step(shape_in, shape_out, dt, rng)
         inc = self.mode == 'inc'
 
         def step_simprocess():
@@ -105,8 +116,26 @@ class SimProcess(Operator):
                 else:
                     output[...] = result
 
+        if hasattr(step_f, 'state'):
+            step_simprocess.state = step_f.state
         return step_simprocess
 
+    def make_batch_step(self, signals, dt, rngs, trial_signals):
+        # Synapses filter each element independently, so one step function
+        # can filter all trials at once. Other processes may be stochastic,
+        # so each trial gets its own step function and RNG.
+        if (isinstance(self.process, Synapse)
+                and all(signals.is_batched(sig) for sig in self.all_signals
+                        if sig is not self.t)):
+            step = self.make_step(signals, dt, rngs[0])
+            for rng in rngs[1:]:
+                # draw the process seed, as for the first trial, so that
+                # the RNGs stay in sync with the unbatched simulator
+                self.process.get_rng(rng)
+            return step
+        return super(SimProcess, self).make_batch_step(
+            signals, dt, rngs, trial_signals)
+
 
 @Builder.register(Process)
 def build_process(model, process, sig_in=None, sig_out=None, inc=False):
@@ -159,7 +188,8 @@ def build_synapse(model, synapse, sig_in, sig_out=None):
     """
     if sig_out is None:
         sig_out = Signal(
-            np.zeros(sig_in.shape), name="%s.%s" % (sig_in.name, synapse))
+            np.zeros(sig_in.shape, dtype=model.dtype),
+            name="%s.%s" % (sig_in.name, synapse))
 
     model.add_op(SimProcess(
         synapse, sig_in, sig_out, model.time, mode='update'))
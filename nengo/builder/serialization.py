@@ -0,0 +1,273 @@
+"""Saves built models to files and loads them again.
+
+Building and optimizing a large network can take much longer than starting
+a simulation. `.save_model` writes a built (and usually optimized) `.Model`
+to a file, and `.load_model` reads it back for the same network, so that
+``nengo.Simulator(None, model=load_model(fname, network))`` skips both.
+"""
+
+import binascii
+import copy
+import hashlib
+import io
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from nengo.base import ObjView
+from nengo.cache import NoDecoderCache
+from nengo.ensemble import Neurons
+from nengo.exceptions import BuildError, CacheIOError
+from nengo.utils.compat import int_types, is_string, iteritems, pickle
+from nengo.version import version as nengo_version
+
+__all__ = ["load_model", "network_fingerprint", "save_model"]
+
+# File layout: MAGIC, format version (uint32), header size (uint64), the
+# header as JSON, the pickled model, then the array data, which starts at
+# the next multiple of ALIGNMENT bytes. Each array is aligned in the data.
+MAGIC = b'NENGOMDL'
+VERSION = 1
+ALIGNMENT = 64
+
+
+def save_model(model, fname):  # noqa: C901
+    """Writes a built model to a file.
+
+    The model can be loaded with `.load_model` for the same network.
+    Nengo objects of the network and the values of their parameters (e.g.,
+    the functions of nodes and connections) are not stored, but looked up
+    in the network when loading, so they do not need to be picklable.
+    All other parts of the model (operators, signals, probes, ``params``,
+    etc.) are pickled, except for the arrays, which are stored separately
+    so that `.load_model` can map them into memory.
+
+    Parameters
+    ----------
+    model : Model
+        The model to save. Its ``toplevel`` network must have been built.
+    fname : str
+        Name of the file to write.
+    """
+    if model.toplevel is None:
+        raise BuildError("Cannot save a model that has not built a network.")
+
+    objs = _network_objects(model.toplevel)
+    refs = {}
+    values = []  # keeps the values alive, so that their ids stay unique
+    for i, obj in enumerate(objs):
+        refs[id(obj)] = ('obj', i)
+    for i, obj in enumerate(objs):
+        for name in getattr(obj, 'params', ()):
+            value = getattr(obj, name)
+            if not _is_data(value):
+                values.append(value)
+                refs.setdefault(id(value), ('param', i, name))
+
+    roots = []  # (array, offset) of the arrays owning the stored data
+    root_offsets = {}
+    data_size = [0]
+
+    def persistent_id(obj):
+        if id(obj) in refs:
+            return refs[id(obj)]
+        elif not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+            return None
+
+        root = obj
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        if not (root.flags.c_contiguous or root.flags.f_contiguous):
+            root = np.ascontiguousarray(obj)
+        if id(root) not in root_offsets:
+            root_offsets[id(root)] = data_size[0]
+            roots.append((root, data_size[0]))
+            data_size[0] += -(-root.nbytes // ALIGNMENT) * ALIGNMENT
+
+        offset = root_offsets[id(root)]
+        if root is not obj:
+            offset += (obj.__array_interface__['data'][0]
+                       - root.__array_interface__['data'][0])
+        return ('array', obj.dtype.str, obj.shape, obj.strides, offset)
+
+    state = copy.copy(model)
+    state.decoder_cache = None
+    state.build_profiler = None
+    state.decoder_pool = None
+    state.build_callback = None
+
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump(state)
+    pickled = buf.getvalue()
+
+    header = {'nengo': nengo_version,
+              'fingerprint': network_fingerprint(model.toplevel),
+              'pickle_size': len(pickled),
+              'data_size': data_size[0]}
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+    pickle_offset = len(MAGIC) + 12 + len(header_bytes)
+    data_offset = -(-(pickle_offset + len(pickled)) // ALIGNMENT) * ALIGNMENT
+
+    with open(fname, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<IQ', VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(pickled)
+        for root, offset in roots:
+            f.seek(data_offset + offset)
+            f.write(root.tobytes(order='A'))
+        f.truncate(data_offset + data_size[0])
+
+
+def load_model(fname, network, check_fingerprint=True):
+    """Reads a model written by `.save_model`.
+
+    The arrays of the model are mapped into memory from the file instead of
+    being read. The arrays of readonly signals (e.g., connection weights)
+    are used directly by the simulator, so they are only read from disk
+    when needed, and are shared between processes simulating the same file.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the file to read.
+    network : Network
+        The network that the model was built from. Its objects are used
+        in the loaded model (e.g., as keys of ``params`` and for the probe
+        data of a simulator).
+    check_fingerprint : bool, optional (Default: True)
+        Whether to check that ``network`` has the same structure and
+        parameters as the network that was saved (see
+        `.network_fingerprint`). If it differs, a `.BuildError` is raised.
+
+    Returns
+    -------
+    Model
+    """
+    with open(fname, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise CacheIOError("%r is not a Nengo model file." % fname)
+        version, header_size = struct.unpack('<IQ', f.read(12))
+        if version > VERSION:
+            raise CacheIOError(
+                "Unsupported model file format version %d (only up to %d "
+                "is supported)." % (version, VERSION))
+        header = json.loads(f.read(header_size).decode('utf-8'))
+        if check_fingerprint and (
+                header['fingerprint'] != network_fingerprint(network)):
+            raise BuildError(
+                "The network differs from the network of the model saved in "
+                "%r (saved with Nengo %s). Rebuild the model." % (
+                    fname, header['nengo']))
+        pickled = f.read(header['pickle_size'])
+        data_offset = -(-f.tell() // ALIGNMENT) * ALIGNMENT
+        data = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if header['data_size'] > 0 else None)
+
+    objs = _network_objects(network)
+
+    def persistent_load(pid):
+        if pid[0] == 'obj':
+            return objs[pid[1]]
+        elif pid[0] == 'param':
+            return getattr(objs[pid[1]], pid[2])
+        _, dtype, shape, strides, offset = pid
+        if data is None:
+            return np.ndarray(shape, dtype=dtype, strides=strides)
+        return np.ndarray(shape, dtype=dtype, buffer=data,
+                          offset=data_offset + offset, strides=strides)
+
+    unpickler = pickle.Unpickler(io.BytesIO(pickled))
+    unpickler.persistent_load = persistent_load
+    model = unpickler.load()
+    model.decoder_cache = NoDecoderCache()
+    return model
+
+
+def network_fingerprint(network):
+    """Returns a hash of the structure and parameters of a network.
+
+    The hash is the same in all processes for the same network code.
+    It covers the types, labels, seeds and parameters of all objects in the
+    network. Arrays are hashed by their data, functions by their code, and
+    objects with parameters (e.g., neuron types or synapses) by their
+    parameters. Other values are only hashed by their type.
+
+    Parameters
+    ----------
+    network : Network
+
+    Returns
+    -------
+    str
+    """
+    objs = _network_objects(network)
+    index = dict((id(obj), i) for i, obj in enumerate(objs))
+    h = hashlib.sha1()
+    for obj in objs:
+        h.update(_token(type(obj), index).encode('utf-8'))
+        for name in ['label', 'seed'] + sorted(getattr(obj, 'params', ())):
+            h.update(("%s=%s;" % (name, _token(
+                getattr(obj, name, None), index))).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _network_objects(network):
+    """Returns the networks and objects of ``network`` in a fixed order."""
+    return [network] + network.all_networks + network.all_objects
+
+
+def _is_data(value):
+    return (value is None or isinstance(value, (
+        bool, float, complex, np.ndarray, np.generic) + int_types)
+        or is_string(value))
+
+
+def _token(value, index):  # noqa: C901
+    if id(value) in index:
+        return "obj%d" % index[id(value)]
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return "array(%s)" % ",".join(
+                _token(v, index) for v in value.ravel())
+        return "array(%s,%s,%s)" % (
+            value.dtype.str, value.shape, hashlib.sha1(
+                np.ascontiguousarray(value).view(np.uint8)).hexdigest())
+    elif _is_data(value):
+        return repr(value)
+    elif isinstance(value, (list, tuple)):
+        return "%s(%s)" % (type(value).__name__,
+                           ",".join(_token(v, index) for v in value))
+    elif isinstance(value, dict):
+        return "dict(%s)" % ",".join(
+            "%s:%s" % (_token(k, index), _token(v, index))
+            for k, v in sorted(iteritems(value), key=lambda kv: repr(kv[0])))
+    elif isinstance(value, type):
+        return "%s.%s" % (value.__module__, value.__name__)
+    elif isinstance(value, ObjView):
+        return "%s[%s]" % (_token(value.obj, index), value.slice)
+    elif isinstance(value, Neurons):
+        return "%s.neurons" % _token(value.ensemble, index)
+    elif hasattr(value, '__code__'):
+        return "%s(%s)" % (getattr(value, '__name__', ''),
+                           _code_token(value.__code__))
+    elif hasattr(value, '_paramdict') or hasattr(value, 'params'):
+        names = getattr(value, '_paramdict', None) or value.params
+        return "%s(%s)" % (_token(type(value), index), ",".join(
+            "%s=%s" % (name, _token(getattr(value, name), index))
+            for name in sorted(names)))
+    elif callable(value):
+        return "%s.%s" % (getattr(value, '__module__', None),
+                          getattr(value, '__name__', type(value).__name__))
+    return _token(type(value), index)
+
+
+def _code_token(code):
+    consts = ",".join(_code_token(c) if hasattr(c, 'co_code') else repr(c)
+                      for c in code.co_consts)
+    return "%s;%s;%s" % (binascii.hexlify(code.co_code).decode('ascii'),
+                         consts, ",".join(code.co_names))
@@ -4,7 +4,7 @@ import numpy as np
 
 import nengo.utils.numpy as npext
 from nengo.exceptions import SignalError
-from nengo.utils.compat import StringIO, is_integer
+from nengo.utils.compat import StringIO, is_integer, iteritems
 
 
 class Signal(object):
@@ -246,13 +246,15 @@ class SignalDict(dict):
         except KeyError:
             if isinstance(key, Signal) and key.base is not key:
                 # return a view on the base signal
-                base = dict.__getitem__(self, key.base)
-                return np.ndarray(
-                    buffer=base, dtype=key.dtype, shape=key.shape,
-                    offset=key.offset, strides=key.strides)
+                return self._view(key)
             else:
                 raise
 
+    def _view(self, signal):
+        base = dict.__getitem__(self, signal.base)
+        return np.ndarray(buffer=base, dtype=signal.dtype, shape=signal.shape,
+                          offset=signal.offset, strides=signal.strides)
+
     def __setitem__(self, key, val):
         """Ensures that ndarrays stay in the same place in memory.
 
@@ -295,3 +297,99 @@ class SignalDict(dict):
         """Reset ndarray to the base value of the signal that maps to it"""
         if not signal.readonly:
             self[signal] = signal.initial_value
+
+    def fork(self):
+        """Return a copy that shares the arrays of readonly signals.
+
+        The arrays of writable base signals are copied, and views are made
+        onto the copies, so changing the returned dictionary does not change
+        this one. Readonly arrays cannot change, so they are shared.
+        """
+        rval = type(self).__new__(type(self))
+        rval.__dict__.update(self.__dict__)
+        for sig, x in iteritems(self):
+            if not sig.is_view:
+                dict.__setitem__(rval, sig, x if sig.readonly else x.copy())
+        for sig in self:
+            if sig.is_view:
+                view = rval._view(sig)
+                view.setflags(write=not sig.readonly)
+                dict.__setitem__(rval, sig, view)
+        return rval
+
+
+class BatchSignalDict(SignalDict):
+    """Map from Signal -> ndarray with a leading batch axis.
+
+    Signals that can change during a simulation are stored with an extra
+    leading axis of length ``n_trials``, so that operators can advance all
+    trials of a batch at once. Readonly signals and the signals in ``shared``
+    are the same for all trials and are stored without the batch axis.
+
+    Parameters
+    ----------
+    n_trials : int
+        Number of trials in the batch.
+    shared : iterable of Signal, optional (Default: ())
+        Writable signals that are shared by all trials (e.g., the time).
+    """
+
+    def __init__(self, n_trials, shared=()):
+        super(BatchSignalDict, self).__init__()
+        self.n_trials = n_trials
+        self.shared = set(sig.base for sig in shared)
+
+    def __getitem__(self, key):
+        try:
+            return dict.__getitem__(self, key)
+        except KeyError:
+            if isinstance(key, Signal) and key.base is not key:
+                return self._view(key)
+            else:
+                raise
+
+    def _view(self, signal):
+        base = dict.__getitem__(self, signal.base)
+        shape, strides = signal.shape, signal.strides
+        if self.is_batched(signal):
+            shape = (self.n_trials,) + shape
+            strides = base.strides[:1] + strides
+        return np.ndarray(buffer=base, dtype=signal.dtype, shape=shape,
+                          offset=signal.offset, strides=strides)
+
+    def init(self, signal):
+        """Set up a permanent mapping from signal -> ndarray."""
+        if signal in self:
+            raise SignalError("Cannot add signal twice")
+
+        if signal.is_view:
+            if signal.base not in self:
+                self.init(signal.base)
+            view = self._view(signal)
+            view.setflags(write=not signal.readonly)
+            dict.__setitem__(self, signal, view)
+        elif self.is_batched(signal):
+            x = np.empty((self.n_trials,) + signal.shape, dtype=signal.dtype)
+            x[...] = signal.initial_value
+            dict.__setitem__(self, signal, x)
+        else:
+            x = signal.initial_value
+            x = x.view() if signal.readonly else x.copy()
+            dict.__setitem__(self, signal, x)
+
+    def is_batched(self, signal):
+        """Whether ``signal`` has a separate value for each trial."""
+        return not (signal.base.readonly or signal.base in self.shared)
+
+    def trial(self, i):
+        """Return a `.SignalDict` with the signals of trial ``i``.
+
+        The arrays in the returned dictionary are views, so changing them
+        changes the data in this dictionary.
+        """
+        signals = SignalDict()
+        for sig, x in iteritems(self):
+            if not sig.is_view:
+                dict.__setitem__(
+                    signals, sig, x[i] if self.is_batched(sig) else x)
+        return signals
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+import nengo
+import nengo.simulator
+from nengo.builder.compiler import compile_steps, StepCompiler
+from nengo.builder.operator import DotInc, ElementwiseInc, Reset
+from nengo.builder.signal import Signal, SignalDict
+from nengo.exceptions import ValidationError
+
+
+def _net(seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(8 * t))
+        a = nengo.Ensemble(40, 2, noise=nengo.processes.WhiteNoise(
+            dist=nengo.dists.Gaussian(0, 0.01)))
+        b = nengo.Ensemble(40, 1, neuron_type=nengo.LIFRate())
+        nengo.Connection(u, a[0])
+        conn = nengo.Connection(a, b, function=lambda x: x[0] * x[1],
+                                learning_rule_type=nengo.PES())
+        nengo.Connection(b, conn.learning_rule)
+        nengo.Connection(a.neurons[:10], b.neurons[:10],
+                         transform=0.01 * np.ones((10, 10)))
+        probes = [nengo.Probe(a, synapse=0.01), nengo.Probe(b.neurons),
+                  nengo.Probe(conn, 'weights')]
+    return net, probes
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+def test_compiled(RefSimulator, seed, optimize):
+    net, probes = _net(seed)
+
+    with RefSimulator(net, seed=seed, optimize=optimize) as sim:
+        sim.run(0.1)
+        data = [sim.data[p] for p in probes]
+
+    with RefSimulator(net, seed=seed, optimize=optimize,
+                      compiled=True) as sim:
+        assert len(sim._plan) == 1
+        source = sim._plan[0].source
+        assert "step_math(dt" in source and "dot(" in source
+        sim.run(0.1)
+        for p, x in zip(probes, data):
+            assert np.array_equal(sim.data[p], x)
+
+        # the code is cached, but the new arrays are bound on reset
+        sim.reset()
+        assert sim._plan[0].source == source
+        sim.run(0.1)
+        for p, x in zip(probes, data):
+            assert np.array_equal(sim.data[p], x)
+
+
+def test_compiled_batch(seed):
+    net, probes = _net(seed)
+    with nengo.simulator.BatchSimulator(net, seeds=[seed, seed + 1]) as sim:
+        sim.run(0.05)
+        data = [sim.data[p] for p in probes]
+    with nengo.simulator.BatchSimulator(
+            net, seeds=[seed, seed + 1], compiled=True) as sim:
+        sim.run(0.05)
+        for p, x in zip(probes, data):
+            assert np.array_equal(sim.data[p], x)
+
+
+def test_compiled_validation(RefSimulator):
+    with nengo.Network() as net:
+        nengo.Ensemble(10, 1)
+    with pytest.raises(ValidationError):
+        RefSimulator(net, compiled=True, n_threads=2)
+    with pytest.raises(ValidationError):
+        RefSimulator(net, compiled=True, profiling=True)
+
+
+def test_templates_match_steps():
+    x = Signal(np.arange(3.))
+    A = Signal(np.ones((2, 3)))
+    y = Signal(np.zeros(2))
+    w = Signal(-np.ones(2))
+    ops = [Reset(y, 2.),
+           DotInc(A, x, y),
+           ElementwiseInc(Signal(np.ones(2)), y, w,
+                          clip_type=1, decay_factor=0.5)]
+
+    results = []
+    for compiled in (False, True):
+        signals = SignalDict()
+        for op in ops:
+            op.init_signals(signals)
+        steps = [op.make_step(signals, 0.001, None) for op in ops]
+        if compiled:
+            step = compile_steps(ops, steps, signals, 0.001)
+            assert step.source.count("_step()") == 0
+            step()
+        else:
+            for step in steps:
+                step()
+        results.append((signals[y].copy(), signals[w].copy()))
+
+    assert np.array_equal(results[0][0], [5, 5])
+    assert np.array_equal(results[0][1], [4.5, 4.5])
+    for a, b in zip(*results):
+        assert np.array_equal(a, b)
+
+
+def test_compile_cache():
+    source = "def step_compiled():\n    pass\n"
+    code = StepCompiler.compile(source)
+    assert StepCompiler.compile(source) is code
+    for i in range(StepCompiler.cache_size):
+        StepCompiler.compile("def step_compiled():\n    x = %d\n" % i)
+    assert StepCompiler.compile(source) is not code
@@ -0,0 +1,76 @@
+import timeit
+
+import numpy as np
+import pytest
+
+import nengo
+from nengo.builder.operator import DotInc
+from nengo.builder.signal import Signal, SignalDict
+
+
+def _dotinc_step(A, X, readonly=True):
+    A = Signal(A, readonly=readonly)
+    X = Signal(X)
+    Y = Signal(np.zeros(A.shape[0]))
+    op = DotInc(A, X, Y)
+    signals = SignalDict()
+    op.init_signals(signals)
+    return op, op.make_step(signals, 0.001, None), signals[X], signals[Y]
+
+
+@pytest.mark.parametrize('density', [0, 0.01, 0.5])
+def test_dotinc_sparse(rng, density):
+    A = rng.randn(300, 1000)
+    op, step, x, y = _dotinc_step(A, np.zeros(1000))
+    assert op.sparse
+
+    for _ in range(3):
+        x[...] = np.where(rng.rand(1000) < density, 1000., 0.)
+        y[...] = 0
+        step()
+        assert np.allclose(y, np.dot(A, x))
+
+    assert not _dotinc_step(A, np.zeros(1000), readonly=False)[0].sparse
+    assert not _dotinc_step(A[:20], np.zeros(1000))[0].sparse
+
+
+def test_dotinc_sparse_spikes(RefSimulator, seed, monkeypatch):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(10 * t))
+        a = nengo.Ensemble(600, 1)
+        b = nengo.Ensemble(600, 1)
+        nengo.Connection(u, a)
+        nengo.Connection(a.neurons, b.neurons,
+                         transform=np.full((600, 600), -1e-4))
+        p = nengo.Probe(b.neurons, 'voltage')
+
+    with RefSimulator(net) as sim:
+        assert any(isinstance(op, DotInc) and op.sparse
+                   for op in sim.model.operators)
+        sim.run(0.1)
+        sparse = sim.data[p]
+
+    monkeypatch.setattr(DotInc, 'sparse_min_size', np.inf)
+    with RefSimulator(net) as sim:
+        sim.run(0.1)
+        assert np.allclose(sim.data[p], sparse)
+
+
+@pytest.mark.slow
+@pytest.mark.noassertions
+def test_dotinc_sparse_benchmark(rng, logger):
+    for n in (500, 2000, 5000):
+        A = rng.randn(n, n)
+        for density in (0.01, 0.05, 0.1):
+            op, step, x, y = _dotinc_step(A, np.zeros(n))
+            x[...] = np.where(rng.rand(n) < density, 1000., 0.)
+            number = max(10, int(1e8 // A.size))
+            step()  # make the transposed copy
+            t_sparse = min(timeit.repeat(step, number=number, repeat=3))
+
+            def step_dense():
+                y[...] += np.dot(A, x)
+            t_dense = min(timeit.repeat(step_dense, number=number, repeat=3))
+            logger.info("%dx%d, %.0f%% nonzero: dense %.3f ms, sparse %.3f ms",
+                        n, n, 100 * density, 1e3 * t_dense / number,
+                        1e3 * t_sparse / number)
@@ -0,0 +1,105 @@
+import mmap
+import struct
+
+import numpy as np
+import pytest
+
+import nengo
+from nengo.builder.serialization import (
+    load_model, network_fingerprint, save_model)
+from nengo.exceptions import BuildError, CacheIOError
+
+
+def _net(seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: [np.sin(8 * t), np.cos(8 * t)])
+        noise = nengo.Node(nengo.processes.WhiteNoise(
+            dist=nengo.dists.Gaussian(0, 0.1)), size_out=1)
+        a = nengo.Ensemble(60, 2)
+        b = nengo.Ensemble(40, 1, neuron_type=nengo.LIFRate())
+        nengo.Connection(u, a)
+        nengo.Connection(noise, b)
+        conn = nengo.Connection(a, b, function=lambda x: x[0] * x[1],
+                                learning_rule_type=nengo.PES())
+        nengo.Connection(b, conn.learning_rule)
+        nengo.Connection(a.neurons[:10], b.neurons[:10],
+                         transform=0.01 * np.ones((10, 10)))
+        probes = [nengo.Probe(a, synapse=0.01), nengo.Probe(b.neurons),
+                  nengo.Probe(conn, 'weights'), nengo.Probe(a[0])]
+    return net, probes
+
+
+def _mapped(x):
+    while isinstance(x, np.ndarray):
+        x = x.base
+    return isinstance(x, mmap.mmap)
+
+
+def test_save_load(RefSimulator, seed, tmpdir):
+    fname = str(tmpdir.join("model.nmdl"))
+    net, probes = _net(seed)
+    with RefSimulator(net, seed=seed) as sim:
+        sim.run(0.1)
+        data = [sim.data[p] for p in probes]
+        save_model(sim.model, fname)
+        n_ops = len(sim.model.operators)
+
+    # a new network with the same code has the same fingerprint
+    net2, probes2 = _net(seed)
+    assert network_fingerprint(net2) == network_fingerprint(net)
+    model = load_model(fname, net2)
+    assert model.optimized and model.toplevel is net2
+    assert len(model.operators) == n_ops
+    with RefSimulator(None, model=model, seed=seed) as sim:
+        assert len(sim.model.operators) == n_ops  # not optimized again
+        weights = [sig for sig in sim.signals if sig.readonly
+                   and sig.size > 1 and not sig.is_view]
+        assert len(weights) > 0
+        assert all(_mapped(sim.signals[sig]) for sig in weights)
+
+        sim.run(0.1)
+        for p, x in zip(probes2, data):
+            assert np.array_equal(sim.data[p], x)
+
+
+def test_load_checks(RefSimulator, seed, tmpdir):
+    fname = str(tmpdir.join("model.nmdl"))
+    net, _ = _net(seed)
+    with RefSimulator(net) as sim:
+        save_model(sim.model, fname)
+
+    net2, _ = _net(seed)
+    net2.ensembles[0].radius = 2.
+    assert network_fingerprint(net2) != network_fingerprint(net)
+    with pytest.raises(BuildError):
+        load_model(fname, net2)
+
+    with nengo.Network(seed=seed) as net3:
+        nengo.Ensemble(10, 1)
+    with pytest.raises(BuildError):
+        load_model(fname, net3)
+
+    with open(fname, 'r+b') as f:
+        f.seek(8)
+        f.write(struct.pack('<I', 1000))
+    with pytest.raises(CacheIOError):
+        load_model(fname, net)
+
+    with open(fname, 'wb') as f:
+        f.write(b'not a model')
+    with pytest.raises(CacheIOError):
+        load_model(fname, net)
+
+
+def test_fingerprint():
+    def make(function):
+        with nengo.Network() as net:
+            a = nengo.Ensemble(10, 1)
+            nengo.Connection(a, a, function=function,
+                             synapse=nengo.Lowpass(0.01))
+        return net
+
+    fingerprint = network_fingerprint(make(lambda x: x ** 2))
+    assert network_fingerprint(make(lambda x: x ** 2)) == fingerprint
+    assert network_fingerprint(make(lambda x: x ** 3)) != fingerprint
+    assert network_fingerprint(make(np.sin)) != fingerprint
@@ -3,7 +3,7 @@ import pytest
 
 import nengo
 from nengo.builder import Model
-from nengo.builder.signal import Signal, SignalDict
+from nengo.builder.signal import BatchSignalDict, Signal, SignalDict
 from nengo.exceptions import SignalError
 from nengo.utils.compat import itervalues
 
@@ -86,6 +86,57 @@ def test_signaldict_reset():
     assert np.allclose(signaldict[two_d], np.array([[1], [1]]))
 
 
+def test_batchsignaldict():
+    signals = BatchSignalDict(3, shared=[Signal(0.)])
+    shared = next(iter(signals.shared))
+    x = Signal(np.arange(6.).reshape(2, 3))
+    const = Signal(np.ones(4), readonly=True)
+    for sig in (shared, x, x[1], const, const[:2]):
+        signals.init(sig)
+
+    assert signals[shared].shape == ()
+    assert signals[const].shape == (4,)
+    assert signals[const[:2]].shape == (2,)
+    assert signals[x].shape == (3, 2, 3)
+    assert signals[x[1]].shape == (3, 1, 3)
+    assert np.array_equal(signals[x][2], x.initial_value)
+
+    # views share memory with the base array of each trial
+    signals[x[1]][1] += 10
+    assert np.array_equal(signals[x][1, 1], [13, 14, 15])
+    assert np.array_equal(signals[x][0, 1], [3, 4, 5])
+    assert np.array_equal(signals.trial(1)[x], signals[x][1])
+    assert np.array_equal(signals.trial(1)[x[1]], [[13, 14, 15]])
+
+    signals.trial(2)[x][...] = -1
+    assert np.all(signals[x][2] == -1)
+
+    signals.reset(x)
+    assert np.array_equal(signals[x][1], x.initial_value)
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_signaldict_fork(batch):
+    signals = BatchSignalDict(2) if batch else SignalDict()
+    x = Signal(np.arange(6.).reshape(2, 3))
+    const = Signal(np.ones(4), readonly=True)
+    for sig in (x, x[1], const, const[:2]):
+        signals.init(sig)
+    signals[x] += 1
+
+    fork = signals.fork()
+    assert type(fork) is type(signals)
+    assert np.array_equal(fork[x], signals[x])
+    assert np.shares_memory(fork[const], signals[const])
+    assert not np.shares_memory(fork[x], signals[x])
+
+    # views are made on the copied base array
+    fork[x[1]][...] = -1
+    assert np.all(fork[x][..., 1, :] == -1)
+    assert not np.any(signals[x] == -1)
+    assert not fork[const[:2]].flags.writeable
+
+
 def test_assert_named_signals():
     """Make sure assert_named_signals works."""
     Signal(np.array(0.))
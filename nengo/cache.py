@@ -468,6 +468,13 @@ class DecoderCache(object):
         Path to the directory in which the cache will be stored. It will be
         created if it does not exists. Will use the value returned by
         `.get_default_dir`, if ``None``.
+
+    Attributes
+    ----------
+    n_hits : int
+        Number of decoders loaded from the cache.
+    n_misses : int
+        Number of decoders solved because they were not in the cache.
     """
 
     _CACHE_EXT = '.nco'
@@ -485,6 +492,8 @@ class DecoderCache(object):
         self._fragment_size = get_fragment_size(self.cache_dir)
         self._fd = None
         self._in_context = False
+        self.n_hits = 0
+        self.n_misses = 0
 
     def __enter__(self):
         try:
@@ -641,27 +650,9 @@ class DecoderCache(object):
                 return solver_fn(conn, gain, bias, x, targets,
                                  rng=rng, E=E, **uncached_kwargs)
 
-            try:
-                args, _, _, defaults = inspect.getargspec(conn.solver)
-            except TypeError:
-                args, _, _, defaults = inspect.getargspec(conn.solver.__call__)
-            args = args[-len(defaults):]
-            if rng is None and 'rng' in args:
-                rng = defaults[args.index('rng')]
-            if E is None and 'E' in args:
-                E = defaults[args.index('E')]
-
-            try:
-                key = self._get_cache_key(conn.solver,
-                                          conn.pre_obj.neuron_type,
-                                          gain,
-                                          bias,
-                                          x,
-                                          targets,
-                                          rng,
-                                          E)
-            except FingerprintError as e:
-                logger.debug("Failed to generate cache key: %s", e)
+            key, rng, E = self._solver_key(
+                conn, gain, bias, x, targets, rng, E)
+            if key is None:
                 return solver_fn(conn, gain, bias, x, targets,
                                  rng=rng, E=E, **uncached_kwargs)
 
@@ -674,6 +665,7 @@ class DecoderCache(object):
                     info, decoders = nco.read(f)
             except:
                 logger.debug("Cache miss [%s].", key)
+                self.n_misses += 1
                 decoders, info = solver_fn(conn, gain, bias, x, targets,
                                            rng=rng, E=E, **uncached_kwargs)
                 if not self.readonly:
@@ -684,10 +676,46 @@ class DecoderCache(object):
                     self._index[key] = (fd.name, start, end)
             else:
                 logger.debug("Cache hit [%s]: Loaded stored decoders.", key)
+                self.n_hits += 1
             return decoders, info
 
         return cached_solver
 
+    def has_solution(self, conn, gain, bias, x, targets, rng=None, E=None):
+        """Returns whether the decoders for these arguments are cached.
+
+        The arguments are the same as those of the solver wrapped with
+        `.wrap_solver`. This lets callers skip solving when the wrapped
+        solver would load the decoders from the cache anyway.
+
+        Returns
+        -------
+        bool
+        """
+        if not self._in_context or self._index is None:
+            return False
+        key, _, _ = self._solver_key(conn, gain, bias, x, targets, rng, E)
+        return key is not None and key in self._index
+
+    def _solver_key(self, conn, gain, bias, x, targets, rng, E):
+        try:
+            args, _, _, defaults = inspect.getargspec(conn.solver)
+        except TypeError:
+            args, _, _, defaults = inspect.getargspec(conn.solver.__call__)
+        args = args[-len(defaults):]
+        if rng is None and 'rng' in args:
+            rng = defaults[args.index('rng')]
+        if E is None and 'E' in args:
+            E = defaults[args.index('E')]
+
+        try:
+            key = self._get_cache_key(conn.solver, conn.pre_obj.neuron_type,
+                                      gain, bias, x, targets, rng, E)
+        except FingerprintError as e:
+            logger.debug("Failed to generate cache key: %s", e)
+            key = None
+        return key, rng, E
+
     def _get_cache_key(
             self, solver, neuron_type, gain, bias, x, targets, rng, E):
         h = hashlib.sha1()
@@ -728,6 +756,9 @@ class DecoderCache(object):
 class NoDecoderCache(object):
     """Provides the same interface as `.DecoderCache` without caching."""
 
+    n_hits = 0
+    n_misses = 0
+
     def __enter__(self):
         return self
 
@@ -737,6 +768,9 @@ class NoDecoderCache(object):
     def wrap_solver(self, solver_fn):
         return solver_fn
 
+    def has_solution(self, conn, gain, bias, x, targets, rng=None, E=None):
+        return False
+
     def get_size_in_bytes(self):
         return 0
 
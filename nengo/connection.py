@@ -322,6 +322,14 @@ class Connection(NengoObject):
         A descriptive label for the connection.
     seed : int, optional (Default: None)
         The seed used for random number generation.
+    vectorized : bool, optional (Default: False)
+        Whether ``function`` can be called with all evaluation points at
+        once. If True, ``function`` is called once with an
+        ``(n_eval_points, size_in)`` array when computing decoders, and must
+        return an ``(n_eval_points, size_mid)`` array, with row ``i`` being
+        the result for point ``i``. If the call fails or its result does not
+        match calling ``function`` on single points, a warning is raised and
+        ``function`` is called on each evaluation point instead.
 
     Attributes
     ----------
@@ -361,6 +369,8 @@ class Connection(NengoObject):
         (see ``nengo.synapses``).
     transform : (size_out, size_mid) array_like
         Linear transform mapping the pre function output to the post input.
+    vectorized : bool
+        Whether ``function`` is called with all evaluation points at once.
 
     Properties
     ----------
@@ -391,6 +401,7 @@ class Connection(NengoObject):
                                   optional=True,
                                   sample_shape=('*', 'size_in'))
     scale_eval_points = BoolParam('scale_eval_points', default=True)
+    vectorized = BoolParam('vectorized', default=False)
     modulatory = ObsoleteParam(
         'modulatory',
         "Modulatory connections have been removed. "
@@ -405,7 +416,8 @@ class Connection(NengoObject):
     def __init__(self, pre, post, synapse=Default, function=Default,
                  transform=Default, solver=Default, learning_rule_type=Default,
                  eval_points=Default, scale_eval_points=Default,
-                 label=Default, seed=Default, modulatory=Unconfigurable):
+                 label=Default, seed=Default, vectorized=Default,
+                 modulatory=Unconfigurable):
         super(Connection, self).__init__(label=label, seed=seed)
 
         self.pre = pre
@@ -414,6 +426,7 @@ class Connection(NengoObject):
         self.synapse = synapse
         self.transform = transform
         self.scale_eval_points = scale_eval_points
+        self.vectorized = vectorized
         self.eval_points = eval_points  # Must be set before function
         self.function_info = function  # Must be set after transform
         self.solver = solver  # Must be set before learning rule
@@ -285,6 +285,8 @@ class EnumParam(StringParam):
 
     def coerce(self, instance, string):
         string = super(EnumParam, self).coerce(instance, string)
+        if string is None:
+            return string
         string = string.lower() if self.lower else string
         if string not in self.value_set:
             raise ValidationError("String %r must be one of %s"
@@ -3,7 +3,8 @@ from nengo.config import Config
 from nengo.connection import Connection, LearningRule
 from nengo.exceptions import ObsoleteError, ValidationError
 from nengo.params import (
-    Default, ConnectionDefault, NumberParam, Parameter, StringParam)
+    BoolParam, Default, ConnectionDefault, EnumParam, NumberParam, Parameter,
+    StringParam)
 from nengo.solvers import SolverParam
 from nengo.synapses import SynapseParam
 
@@ -90,18 +91,40 @@ class Probe(NengoObject):
         A name for the probe. Used for debugging and visualization.
     seed : int, optional (Default: None)
         The seed used for random number generation.
+    on : bool, optional (Default: True)
+        Whether the probe collects data. Probes that are switched off
+        do not record any samples while the simulation runs.
+    storage : {'memory', 'disk'}, optional (Default: None)
+        Where the probed data is stored. ``'disk'`` streams the data
+        to a file, which is useful when it does not fit into memory.
+        If None, the simulator's ``probe_storage`` will be used.
+    reduce : {'mean', 'sum', 'max', 'count'}, optional (Default: None)
+        How the values of the probed signal are reduced over the window
+        between two samples (``sample_every``). The simulator accumulates
+        the values in place at every time step and records one sample per
+        window: their mean, sum, maximum, or the number of time steps
+        in which each element was nonzero (e.g., the spike count).
+        If None, only the value at the time of the sample is recorded.
 
     Attributes
     ----------
     attr : str or None
         The signal that will be probed. If None, the first element of the
         target's ``probeable`` list will be used.
+    on : bool
+        Whether the probe collects data.
+    reduce : str or None
+        How the values of the probed signal are reduced between samples.
+        If None, only the value at the time of the sample is recorded.
     sample_every : float or None
         Sampling period in seconds. If None, the ``dt`` of the simluation
         will be used.
     solver : Solver or None
         `~nengo.solvers.Solver` to compute decoders. Only used for probes
         of an ensemble's decoded output.
+    storage : str or None
+        Where the probed data is stored. If None, the simulator's
+        ``probe_storage`` will be used.
     synapse : Synapse or None
         A synaptic model to filter the probed signal.
     target : Ensemble, Neurons, Node, or Connection
@@ -114,17 +137,26 @@ class Probe(NengoObject):
         'sample_every', default=None, optional=True, low=1e-10)
     synapse = SynapseParam('synapse', default=None)
     solver = ProbeSolverParam('solver', default=ConnectionDefault)
+    on = BoolParam('on', default=True)
+    storage = EnumParam('storage', default=None, values=('memory', 'disk'),
+                        optional=True)
+    reduce = EnumParam('reduce', default=None,
+                       values=('mean', 'sum', 'max', 'count'), optional=True)
 
     _param_init_order = ['target']
 
     def __init__(self, target, attr=None, sample_every=Default,
-                 synapse=Default, solver=Default, label=Default, seed=Default):
+                 synapse=Default, solver=Default, label=Default, seed=Default,
+                 on=Default, storage=Default, reduce=Default):
         super(Probe, self).__init__(label=label, seed=seed)
         self.target = target
         self.attr = attr if attr is not None else self.obj.probeable[0]
         self.sample_every = sample_every
         self.synapse = synapse
         self.solver = solver
+        self.on = on
+        self.storage = storage
+        self.reduce = reduce
 
     def __repr__(self):
         return "<Probe%s at 0x%x of '%s' of %s>" % (
@@ -55,6 +55,7 @@ class WhiteNoise(Process):
             x = dist.sample(n=1, d=shape_out[0], rng=rng)[0]
             return alpha * x if scale else x
 
+        step_whitenoise.state = {'rng': rng}
         return step_whitenoise
 
 
@@ -112,6 +113,8 @@ class FilteredNoise(Process):
                 x *= alpha
             return filter_step(t, x)
 
+        step_filterednoise.state = {'rng': rng, 'synapse': getattr(
+            filter_step, 'state', {})}
         return step_filterednoise
 
 
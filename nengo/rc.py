@@ -75,6 +75,12 @@ RC_DEFAULTS = {
         'size': '512 MB',
         'path': nengo.utils.paths.decoder_cache_dir,
     },
+    'probe_storage': {
+        'backend': 'memory',
+        'path': nengo.utils.paths.probe_dir,
+        'chunk_size': '1 MB',
+        'flush': 'chunk',
+    },
     'progress': {
         'updater': 'auto',
         'progress_bar': 'auto',
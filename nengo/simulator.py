@@ -1,32 +1,317 @@
 """Reference simulator for nengo models."""
 
+import copy
+import hashlib
 import logging
+import os
+from multiprocessing.pool import ThreadPool
+import struct
+import tempfile
 import warnings
 from collections import Mapping
 
 import numpy as np
+from numpy.lib import format as npformat
 
 import nengo.utils.numpy as npext
 from nengo.builder import Model
+from nengo.builder.compiler import compile_steps
 from nengo.builder.optimizer import optimize as opmerge_optimize
-from nengo.builder.signal import SignalDict
+from nengo.builder.signal import BatchSignalDict, SignalDict
 from nengo.cache import get_default_decoder_cache
-from nengo.exceptions import ReadonlyError, SimulatorClosed
+from nengo.exceptions import (
+    ReadonlyError, SimulationError, SimulatorClosed, ValidationError)
+from nengo.rc import rc
+from nengo.utils.cache import human2bytes
 from nengo.utils.compat import range, ResourceWarning
 from nengo.utils.graphs import toposort
+from nengo.utils.profiling import BuildProfiler, OperatorProfiler
 from nengo.utils.progress import ProgressTracker
-from nengo.utils.simulator import operator_dependency_graph
+from nengo.utils.simulator import (
+    get_step_state, operator_cost, operator_dependency_graph,
+    operator_levels, rng_state_arrays, set_rng_state_arrays, set_step_state,
+    set_step_state_arrays, step_state_arrays, write_groups)
 
 logger = logging.getLogger(__name__)
 
 
+class ProbeBuffer(object):
+    """Growable array that stores the samples collected by a probe.
+
+    Samples are written in place into a preallocated NumPy array. When the
+    array is full, its capacity is doubled, so appending is amortized O(1)
+    and no per-sample Python objects are kept around.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of a single sample.
+    dtype : numpy.dtype, optional (Default: ``np.float64``)
+        Data type of the samples.
+    capacity : int, optional (Default: 0)
+        Number of samples to preallocate space for.
+    """
+
+    def __init__(self, shape, dtype=np.float64, capacity=0):
+        self._data = np.empty((capacity,) + tuple(shape), dtype=dtype)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def capacity(self):
+        """(int) Number of samples that fit without reallocating."""
+        return self._data.shape[0]
+
+    @property
+    def dtype(self):
+        """(numpy.dtype) Data type of the samples."""
+        return self._data.dtype
+
+    @property
+    def shape(self):
+        """(tuple) Shape of a single sample."""
+        return self._data.shape[1:]
+
+    def append(self, x):
+        """Copy the sample ``x`` into the next free row of the buffer."""
+        if self._n == self.capacity:
+            self.reserve(max(self.capacity, 1))
+        self._data[self._n] = x
+        self._n += 1
+
+    def reserve(self, n):
+        """Ensure that ``n`` more samples fit without reallocating."""
+        needed = self._n + n
+        if needed > self.capacity:
+            data = np.empty((max(needed, 2 * self.capacity),) + self.shape,
+                            dtype=self.dtype)
+            data[:self._n] = self._data[:self._n]
+            self._data = data
+
+    def view(self):
+        """Return a readonly view on the samples collected so far."""
+        view = self._data[:self._n]
+        view.setflags(write=False)
+        return view
+
+
+class DiskProbeBuffer(object):
+    """Stores the samples collected by a probe in a ``.npy`` file on disk.
+
+    Samples are collected in an in-memory chunk, which is appended to
+    the file once it is full. Reading the data returns an `numpy.memmap`,
+    so probe data that does not fit into memory can still be accessed.
+    The file is not removed when the simulator is closed, so that the data
+    stays accessible; it is left to the user to delete it. Files of data
+    discarded by the simulator (e.g., on `.Simulator.reset`) are removed.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of a single sample.
+    dtype : numpy.dtype, optional (Default: ``np.float64``)
+        Data type of the samples.
+    path : str, optional (Default: None)
+        Directory in which the file will be created.
+        If None, the ``probe_storage.path`` RC setting will be used.
+    chunk_size : int, optional (Default: None)
+        Size of the in-memory chunk in bytes.
+        If None, the ``probe_storage.chunk_size`` RC setting will be used.
+    flush : {'chunk', 'fsync', 'close'}, optional (Default: None)
+        When data is flushed to disk. ``'chunk'`` flushes the file after
+        each chunk is written, ``'fsync'`` additionally asks the operating
+        system to write the data to the disk, and ``'close'`` only flushes
+        when the data is read or the buffer is closed.
+        If None, the ``probe_storage.flush`` RC setting will be used.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the ``.npy`` file containing the samples.
+    """
+
+    flush_policies = ('chunk', 'fsync', 'close')
+
+    def __init__(self, shape, dtype=np.float64,
+                 path=None, chunk_size=None, flush=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        path = rc.get('probe_storage', 'path') if path is None else path
+        if chunk_size is None:
+            chunk_size = human2bytes(rc.get('probe_storage', 'chunk_size'))
+        self.flush = (rc.get('probe_storage', 'flush') if flush is None
+                      else flush).lower()
+        if self.flush not in self.flush_policies:
+            raise ValidationError("Must be one of %s (got %r)" % (
+                list(self.flush_policies), self.flush), attr='flush', obj=self)
+
+        sample_size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self._chunk = np.empty(
+            (max(chunk_size // sample_size, 1),) + self.shape, dtype=dtype)
+        self._n_chunk = 0
+        self._n_written = 0
+        self._view = None
+
+        # The header has room for the largest possible number of samples,
+        # so that it can be rewritten in place as the number of samples grows.
+        # Its size is a multiple of 64 bytes, as for files written by NumPy.
+        max_header = self._header(np.iinfo(np.int64).max)
+        self.header_size = 64 * -(-(len(max_header) + 11) // 64)
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+        fd, self.filename = tempfile.mkstemp(
+            suffix='.npy', prefix='probe_', dir=path)
+        self._file = os.fdopen(fd, 'w+b')
+        self._write_header()
+
+    def __len__(self):
+        return self._n_written + self._n_chunk
+
+    @property
+    def closed(self):
+        """(bool) Whether the file has been closed."""
+        return self._file is None
+
+    def append(self, x):
+        """Copy the sample ``x`` into the chunk, writing it if it is full."""
+        self._chunk[self._n_chunk] = x
+        self._n_chunk += 1
+        if self._n_chunk == len(self._chunk):
+            self._write_chunk()
+            if self.flush != 'close':
+                self._flush()
+
+    def close(self):
+        """Write all remaining samples and close the file."""
+        if not self.closed:
+            self._write_chunk()
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the file, discarding the samples."""
+        self.close()
+        self._view = None
+        try:
+            os.remove(self.filename)
+        except OSError:  # e.g., the file is still memory mapped on Windows
+            logger.warning("Could not remove probe file %r", self.filename)
+
+    def reserve(self, n):
+        """Does nothing; the file grows as chunks are written."""
+
+    def view(self):
+        """Return a readonly memory map of the samples collected so far."""
+        if not self.closed:
+            self._write_chunk()
+            self._flush()
+
+        if self._view is None or len(self._view) != self._n_written:
+            if self._n_written == 0:
+                self._view = np.empty((0,) + self.shape, dtype=self.dtype)
+                self._view.setflags(write=False)
+            else:
+                self._view = np.memmap(
+                    self.filename, dtype=self.dtype, mode='r',
+                    offset=self.header_size,
+                    shape=(self._n_written,) + self.shape)
+        return self._view
+
+    def _flush(self):
+        self._file.flush()
+        if self.flush == 'fsync':
+            os.fsync(self._file.fileno())
+
+    def _write_chunk(self):
+        if self._n_chunk > 0:
+            self._file.seek(0, os.SEEK_END)
+            self._chunk[:self._n_chunk].tofile(self._file)
+            self._n_written += self._n_chunk
+            self._n_chunk = 0
+            self._write_header()
+
+    def _header(self, n_samples):
+        return "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+            npformat.dtype_to_descr(self.dtype), (n_samples,) + self.shape)
+
+    def _write_header(self):
+        header = self._header(self._n_written)
+        # magic string (6 bytes), version (2 bytes), header length (2 bytes)
+        if len(header) > self.header_size - 11:
+            raise SimulationError(
+                "Header of %r does not fit into %d bytes"
+                % (self.filename, self.header_size))
+        header = header.ljust(self.header_size - 11) + '\n'
+        self._file.seek(0)
+        self._file.write(npformat.magic(1, 0))
+        self._file.write(struct.pack('<H', len(header)))
+        self._file.write(header.encode('latin1'))
+
+
+class ProbeReducer(object):
+    """Reduces the values of a probed signal over a window of time steps.
+
+    Values are accumulated in place, so a probe with a ``reduce`` mode
+    stores only one sample per window (see `.Probe`).
+
+    Parameters
+    ----------
+    mode : {'mean', 'sum', 'max', 'count'}
+        How the values are reduced.
+    shape : tuple
+        Shape of the probed signal.
+
+    Attributes
+    ----------
+    acc : ndarray
+        The values accumulated in the current window.
+    n : int
+        Number of values in the current window.
+    """
+
+    def __init__(self, mode, shape):
+        self.mode = mode
+        self.acc = np.zeros(shape, dtype=(
+            np.int64 if mode == 'count' else np.float64))
+        self.n = 0
+
+    def add(self, x):
+        """Add the value ``x`` to the current window."""
+        if self.mode == 'count':
+            self.acc += x != 0
+        elif self.mode == 'max' and self.n > 0:
+            np.maximum(self.acc, x, out=self.acc)
+        elif self.mode == 'max':
+            self.acc[...] = x
+        else:
+            self.acc += x
+        self.n += 1
+
+    def reduce(self, x):
+        """Add ``x``, return the reduced window, and start a new window."""
+        self.add(x)
+        result = self.acc / self.n if self.mode == 'mean' else self.acc.copy()
+        self.acc[...] = 0
+        self.n = 0
+        return result
+
+
 class ProbeDict(Mapping):
     """Map from Probe -> ndarray
 
     This is more like a view on the dict that the simulator manipulates.
-    However, for speed reasons, the simulator uses Python lists,
-    and we want to return NumPy arrays. Additionally, this mapping
-    is readonly, which is more appropriate for its purpose.
+    The simulator stores probe data in `.ProbeBuffer` or `.DiskProbeBuffer`
+    instances, for which this mapping returns a readonly view without
+    copying. Other backends may use Python lists, which are converted to
+    NumPy arrays. Only the samples appended since the last access are
+    copied (into a `.ProbeBuffer`), so that accessing the data between
+    runs takes time proportional to the new samples only.
+    Additionally, this mapping is readonly, which is more appropriate
+    for its purpose.
     """
 
     def __init__(self, raw):
@@ -35,14 +320,26 @@ class ProbeDict(Mapping):
         self._cache = {}
 
     def __getitem__(self, key):
-        if (key not in self._cache or
-                len(self._cache[key]) != len(self.raw[key])):
-            rval = self.raw[key]
-            if isinstance(rval, list):
-                rval = np.asarray(rval)
-                rval.setflags(write=False)
-            self._cache[key] = rval
-        return self._cache[key]
+        rval = self.raw[key]
+        if isinstance(rval, (ProbeBuffer, DiskProbeBuffer)):
+            return rval.view()
+        if not isinstance(rval, list):
+            return rval
+        if len(rval) == 0:
+            rval = np.asarray(rval)
+            rval.setflags(write=False)
+            return rval
+
+        samples, buf = self._cache.get(key, (None, None))
+        if samples is not rval or len(buf) > len(rval):
+            # the list has been replaced (e.g., on reset), so start over
+            x = np.asarray(rval[0])
+            buf = ProbeBuffer(x.shape, dtype=x.dtype)
+            self._cache[key] = (rval, buf)
+        buf.reserve(len(rval) - len(buf))
+        for x in rval[len(buf):]:
+            buf.append(x)
+        return buf.view()
 
     def __iter__(self):
         return iter(self.raw)
@@ -104,13 +401,51 @@ class Simulator(object):
         If ``True``, the builder will run an additional optimization step
         that can speed up simulations signficantly at the cost of slower
         builds. If running models for very small amounts of time,
-        pass ``False`` to disable the optimizer.
+        pass ``False`` to disable the optimizer. A ``model`` that has
+        already been optimized (e.g., one loaded with `.load_model`)
+        is not optimized again.
+    probe_storage : {'memory', 'disk'}, optional (Default: None)
+        Where probe data is stored for probes that do not set their own
+        ``storage``. ``'memory'`` keeps data in `.ProbeBuffer` arrays,
+        ``'disk'`` streams it to files with `.DiskProbeBuffer`.
+        If None, the ``probe_storage.backend`` RC setting will be used.
+    profiling : bool or `.OperatorProfiler`, optional (Default: False)
+        Whether to measure the time spent in each operator, which can be
+        inspected with `.Simulator.profile`. Pass an `.OperatorProfiler`
+        to also record a timeline of some steps. Profiling makes the
+        simulation slower. If ``model`` is not given, the build is profiled
+        as well (see `.Model.build_profile`).
+    n_threads : int, optional (Default: 1)
+        Number of threads used to run operators. With more than one thread,
+        operators that do not depend on each other (see `.operator_levels`)
+        and are costly enough (see ``parallel_min_cost``) are run at the
+        same time. This speeds up models with large operators, like big
+        `.DotInc` and `.SimNeurons` operators, because NumPy releases the
+        global interpreter lock while computing with large arrays.
+        Operators that may run Python code, like ``Node`` functions and
+        processes other than synapses, always run in the main thread
+        (see `.Operator.thread_safe`).
+    dtype : numpy.dtype, optional (Default: ``np.float64``)
+        The floating point type of the signals of the built model
+        (see `.Model`). ``np.float32`` halves the memory and bandwidth
+        used by the simulation, at the cost of precision.
+        Ignored if ``model`` is given.
+    compiled : bool, optional (Default: False)
+        Whether to compile the step functions of all operators into one
+        Python function (see `.compile_steps`). This reduces the overhead
+        of running many small operators. Cannot be combined with
+        ``profiling`` or ``n_threads > 1``.
+    build_workers : int, optional (Default: 1)
+        Number of threads that solve for decoders while the network is
+        built (see `.DecoderSolverPool`). Ignored if ``model`` is given.
 
     Attributes
     ----------
     closed : bool
         Whether the simulator has been closed.
         Once closed, it cannot be reopened.
+    compiled : bool
+        Whether the step functions are compiled into one function.
     data : ProbeDict
         The `.ProbeDict` mapping from Nengo objects to the data associated
         with those objects. In particular, each `.Probe` maps to the data
@@ -121,6 +456,13 @@ class Simulator(object):
     model : Model
         The `.Model` containing the signals and operators necessary to
         simulate the network.
+    n_threads : int
+        Number of threads used to run operators.
+    probe_storage : str
+        Where probe data is stored by default (``'memory'`` or ``'disk'``).
+    profiler : OperatorProfiler or None
+        The profiler measuring the time spent in each operator,
+        or None if profiling is disabled.
     signals : SignalDict
         The `.SignalDict` mapping from `.Signal` instances to NumPy arrays.
 
@@ -135,16 +477,52 @@ class Simulator(object):
     # would skip all test whose names start with 'test_pes'.
     unsupported = []
 
+    # Number of steps that `.Simulator.run_steps` runs as one block,
+    # i.e., between updates of the progress bar.
+    chunk_steps = 100
+
+    # Operators with a smaller estimated cost (see `.operator_cost`) are not
+    # worth the overhead of running them in another thread.
+    parallel_min_cost = 20000
+
+    probe_buffers = {'memory': ProbeBuffer, 'disk': DiskProbeBuffer}
+
     def __init__(
             self, network,
-            dt=0.001, seed=None, model=None, progress_bar=True, optimize=True):
+            dt=0.001, seed=None, model=None, progress_bar=True, optimize=True,
+            probe_storage=None, profiling=False, n_threads=1,
+            dtype=np.float64, compiled=False, build_workers=1):
+        if int(n_threads) < 1:
+            raise ValidationError("Must be at least 1 (got %r)" % n_threads,
+                                  attr='n_threads', obj=self)
+        self.n_threads = int(n_threads)
+        if compiled and (profiling or self.n_threads > 1):
+            raise ValidationError(
+                "Cannot be combined with profiling or n_threads > 1",
+                attr='compiled', obj=self)
+        self.compiled = bool(compiled)
+        self._pool = None
+
+        if probe_storage is None:
+            probe_storage = rc.get('probe_storage', 'backend')
+        if probe_storage.lower() not in self.probe_buffers:
+            raise ValidationError("Must be one of %s (got %r)" % (
+                sorted(self.probe_buffers), probe_storage),
+                attr='probe_storage', obj=self)
+        self.probe_storage = probe_storage.lower()
+
         self.closed = False
         self.progress_bar = progress_bar
+        self.profiler = OperatorProfiler() if profiling is True else (
+            profiling or None)
 
         if model is None:
             self.model = Model(dt=float(dt),
                                label="%s, dt=%f" % (network, dt),
-                               decoder_cache=get_default_decoder_cache())
+                               decoder_cache=get_default_decoder_cache(),
+                               dtype=dtype, build_workers=build_workers,
+                               build_profiler=(BuildProfiler() if profiling
+                                               else None))
         else:
             self.model = model
 
@@ -155,20 +533,28 @@ class Simulator(object):
         # Order the steps (they are made in `Simulator.reset`)
         self.dg = operator_dependency_graph(self.model.operators)
 
-        if optimize:
+        if optimize and not self.model.optimized:
             opmerge_optimize(self.model, self.dg)
 
-        self._step_order = [op for op in toposort(self.dg)
+        # Break ties in the order of the operators of the model, so that the
+        # step order (and the order of random draws) is reproducible
+        op_index = {op: i for i, op in enumerate(self.model.operators)}
+        self._step_order = [op for op in toposort(self.dg, key=op_index.get)
                             if hasattr(op, 'make_step')]
 
         # -- map from Signal.base -> ndarray
-        self.signals = SignalDict()
+        self.signals = self._make_signals()
         for op in self.model.operators:
             op.init_signals(self.signals)
 
         # Add built states to the probe dictionary
         self._probe_outputs = self.model.params
 
+        # Probe data left by another simulator of this model stays on disk
+        self._close_probe_buffers()
+        for probe in self.model.probes:
+            self._probe_outputs.pop(probe, None)
+
         # Provide a nicer interface to probe outputs
         self.data = ProbeDict(self._probe_outputs)
 
@@ -177,7 +563,7 @@ class Simulator(object):
 
     def __del__(self):
         """Raise a ResourceWarning if we are deallocated while open."""
-        if not self.closed:
+        if not getattr(self, 'closed', True):
             warnings.warn(
                 "Simulator with model=%s was deallocated while open. Please "
                 "close simulators manually to ensure resources are properly "
@@ -217,6 +603,20 @@ class Simulator(object):
         """
         self.closed = True
         self.signals = None  # signals may no longer exist on some backends
+        self._close_probe_buffers()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def _close_probe_buffers(self, remove=False):
+        """Close the files of disk probes, deleting them if ``remove``."""
+        for probe in self.model.probes:
+            buf = self._probe_outputs.get(probe, None)
+            if isinstance(buf, DiskProbeBuffer):
+                if remove:
+                    buf.remove()
+                else:
+                    buf.close()
 
     def _probe(self):
         """Copy all probed signals to buffers."""
@@ -224,11 +624,17 @@ class Simulator(object):
 
         for probe in self.model.probes:
             if probe.on:                # only collect data if probe is 'on'
-                period = (1 if probe.sample_every is None else
-                          probe.sample_every / self.dt)
-                if self.n_steps % period < 1:
-                    tmp = self.signals[self.model.sig[probe]['in']].copy()
-                    self._probe_outputs[probe].append(tmp)
+                x = self.signals[self.model.sig[probe]['in']]
+                reducer = self._probe_reducers.get(probe)
+                if self.n_steps % self._probe_period(probe) < 1:
+                    self._probe_outputs[probe].append(
+                        x if reducer is None else reducer.reduce(x))
+                elif reducer is not None:
+                    reducer.add(x)
+
+    def _probe_period(self, probe):
+        return (1 if probe.sample_every is None else
+                probe.sample_every / self.dt)
 
     def _probe_step_time(self):
         self._n_steps = self.signals[self.model.step].copy()
@@ -256,16 +662,297 @@ class Simulator(object):
             self.signals.reset(key)
 
         # rebuild steps (resets ops with their own state, like Processes)
-        self.rng = np.random.RandomState(self.seed)
-        self._steps = [op.make_step(self.signals, self.dt, self.rng)
-                       for op in self._step_order]
+        self._init_steps()
 
         # clear probe data
+        self._close_probe_buffers(remove=True)
         for probe in self.model.probes:
-            self._probe_outputs[probe] = []
+            self._probe_outputs[probe] = self._make_probe_buffer(probe)
+        self._probe_reducers = {
+            probe: ProbeReducer(probe.reduce, self.signals[
+                self.model.sig[probe]['in']].shape)
+            for probe in self.model.probes if probe.reduce is not None}
 
         self._probe_step_time()
 
+    def _init_steps(self):
+        self._steps = self._make_steps()
+        if self.profiler is not None:
+            self._steps = self.profiler.wrap_steps(
+                self._step_order, self._steps, self.model.origins)
+        self._plan = self._make_plan(self._steps)
+
+    def _make_probe_buffer(self, probe, shape=None):
+        storage = (self.probe_storage if probe.storage is None
+                   else probe.storage)
+        sig = self.model.sig[probe]['in']
+        return self.probe_buffers[storage](
+            sig.shape if shape is None else shape,
+            np.int64 if probe.reduce == 'count' else sig.dtype)
+
+    def _make_signals(self):
+        return SignalDict()
+
+    def _make_steps(self):
+        self.rng = np.random.RandomState(self.seed)
+        return [op.make_step(self.signals, self.dt, self.rng)
+                for op in self._step_order]
+
+    def save_state(self, fname):
+        """Save the current state of the simulator to a file.
+
+        The saved state includes the values of all signals (e.g., neuron
+        voltages and refractory times, learned weights), the current step
+        and time, the random number generator, the internal state of step
+        functions (e.g., synapses and noise processes), and the probed data.
+        It can be restored with `.Simulator.load_state`, either in this
+        simulator or in another simulator of the same built model.
+        This makes it possible to run several experiments from the state
+        reached after a warm-up period, without simulating it again.
+
+        Parameters
+        ----------
+        fname : str or file
+            File to save the state to, as a compressed ``.npz`` archive.
+
+        Notes
+        -----
+        The state of `.Node` functions, and of custom processes whose step
+        functions have no ``state`` attribute (see `.get_step_state`),
+        is not saved.
+
+        The file contains only arrays and no pickled objects, so loading
+        a state does not run arbitrary code.
+        """
+        if self.closed:
+            raise SimulatorClosed("Cannot save state of closed Simulator.")
+
+        arrays = {}
+        for i, sig in enumerate(self._state_signals()):
+            arrays['signal%d' % i] = self.signals[sig]
+        for i, probe in enumerate(self.model.probes):
+            arrays['probe%d' % i] = self._probe_outputs[probe].view()
+            if probe in self._probe_reducers:
+                reducer = self._probe_reducers[probe]
+                arrays['reducer%d/acc' % i] = reducer.acc
+                arrays['reducer%d/n' % i] = np.array(reducer.n)
+
+        arrays['fingerprint'] = np.array(self._state_fingerprint())
+        arrays['seed'] = np.array(self.seed, dtype=np.int64)
+        for i, rng in enumerate(self._rngs()):
+            arrays.update(rng_state_arrays(rng, 'rng%d' % i))
+        for i, step in self._stateful_steps():
+            arrays.update(step_state_arrays(step.state, 'step%d' % i))
+        np.savez_compressed(fname, **arrays)
+
+    def load_state(self, fname):
+        """Restore the state of the simulator from a file.
+
+        Parameters
+        ----------
+        fname : str or file
+            File with a state saved by `.Simulator.save_state`.
+
+        Notes
+        -----
+        The state must have been saved by a simulator of the same model,
+        i.e., of the same network built with the same seed and options.
+        Since the build and the optimizer are deterministic, this can be
+        a simulator created with a new build of the network.
+        """
+        if self.closed:
+            raise SimulatorClosed("Cannot load state into closed Simulator.")
+
+        with np.load(fname) as data:
+            if ('fingerprint' not in data.files or str(data['fingerprint'])
+                    != self._state_fingerprint()):
+                raise SimulationError(
+                    "Saved state does not match the model of this Simulator")
+
+            for i, sig in enumerate(self._state_signals()):
+                self.signals[sig][...] = data['signal%d' % i]
+
+            self._close_probe_buffers(remove=True)
+            for i, probe in enumerate(self.model.probes):
+                self._set_probe_data(probe, data['probe%d' % i])
+                if probe in self._probe_reducers:
+                    reducer = self._probe_reducers[probe]
+                    reducer.acc[...] = data['reducer%d/acc' % i]
+                    reducer.n = int(data['reducer%d/n' % i])
+
+            self.seed = data['seed'].tolist()
+            for i, rng in enumerate(self._rngs()):
+                set_rng_state_arrays(rng, data, 'rng%d' % i)
+            for i, step in self._stateful_steps():
+                set_step_state_arrays(step.state, data, 'step%d' % i)
+        self._probe_step_time()
+
+    def fork(self, n=1):
+        """Create copies of the simulator in its current state.
+
+        The forked simulators continue from the current state of this
+        simulator (see `.Simulator.save_state` for what is included), but
+        run independently of it and of each other, which makes it possible
+        to try out several alternatives from an intermediate state.
+
+        Only the signals that can change during a simulation, and the probed
+        data, are copied. The model and the readonly signals (e.g., encoders,
+        biases, and the weights of connections without learning rules) are
+        shared, so forks of large models are cheap.
+
+        If this simulator is profiled, each fork gets its own copy of the
+        profiler, which starts without measurements.
+
+        Parameters
+        ----------
+        n : int, optional (Default: 1)
+            Number of forks to create.
+
+        Returns
+        -------
+        list of Simulator
+            The forked simulators. Like any simulator, they should be closed
+            when no longer needed.
+        """
+        if self.closed:
+            raise SimulatorClosed("Cannot fork closed Simulator.")
+        return [self._fork() for _ in range(n)]
+
+    def _fork(self):
+        sim = copy.copy(self)
+        sim.signals = self.signals.fork()
+
+        # the model is shared, so the fork needs its own probe outputs
+        sim._probe_outputs = dict(self._probe_outputs)
+        for probe in self.model.probes:
+            sim._set_probe_data(probe, self._probe_outputs[probe].view())
+        sim.data = type(self.data)(sim._probe_outputs)
+        sim._probe_reducers = {probe: copy.deepcopy(reducer) for probe, reducer
+                               in self._probe_reducers.items()}
+
+        sim.profiler = copy.copy(self.profiler)
+        sim._pool = None
+        sim._init_steps()
+        sim._set_rng_state(self._get_rng_state())
+        sim._set_step_states(self._get_step_states())
+        sim._probe_step_time()
+        return sim
+
+    def _set_probe_data(self, probe, samples):
+        buf = self._make_probe_buffer(probe)
+        buf.reserve(len(samples))
+        for x in samples:
+            buf.append(x)
+        self._probe_outputs[probe] = buf
+
+    def _stateful_steps(self):
+        """Step functions with a ``state``, with the index of their operator.
+
+        Operators are indexed by their position in ``model.operators``,
+        which does not depend on the order in which the steps are run.
+        """
+        steps = dict(zip(self._step_order, self._steps))
+        return [(i, steps[op]) for i, op in enumerate(self.model.operators)
+                if hasattr(steps.get(op, None), 'state')]
+
+    def _get_step_states(self):
+        return {i: get_step_state(step.state)
+                for i, step in self._stateful_steps()}
+
+    def _set_step_states(self, states):
+        for i, step in self._stateful_steps():
+            set_step_state(step.state, states[i])
+
+    def _rngs(self):
+        return [self.rng]
+
+    def _get_rng_state(self):
+        return self.rng.get_state()
+
+    def _set_rng_state(self, state):
+        self.rng.set_state(state)
+
+    def _state_signals(self):
+        """Base signals that can change during the simulation.
+
+        The signals are returned in the order of the operators of the model,
+        which is the same for all simulators of the same built model.
+        """
+        bases = []
+        seen = set()
+        for op in self.model.operators:
+            for sig in op.all_signals:
+                if sig.base not in seen and not sig.base.readonly:
+                    seen.add(sig.base)
+                    bases.append(sig.base)
+        return bases
+
+    def _state_fingerprint(self):
+        """Identifies the operators and signals whose state is saved."""
+        h = hashlib.sha1()
+        for op in self.model.operators:
+            h.update(type(op).__name__.encode('utf-8'))
+        for sig in self._state_signals():
+            x = self.signals[sig]
+            h.update(repr((x.shape, x.dtype.str)).encode('utf-8'))
+        return h.hexdigest()
+
+    def _make_plan(self, steps):
+        """Returns the functions that are called to run one time step.
+
+        If the simulator is compiled, this is one function running all
+        steps. With one thread, these are the step functions themselves.
+        Otherwise, each level of the dependency graph with at least two
+        independent groups of costly operators (see `.write_groups`) is run
+        by one function that runs these groups in the thread pool, while the
+        main thread runs the remaining operators of the level. Groups with
+        operators that are not `~.Operator.thread_safe` (e.g., `.SimPyFunc`,
+        which calls ``Node`` functions) always run in the main thread.
+        """
+        if self.compiled:
+            return [self._compile_steps(steps)]
+        if self.n_threads <= 1:
+            return steps
+
+        step_fns = dict(zip(self._step_order, steps))
+        plan = []
+        for level in operator_levels(self.dg, self._step_order):
+            main_heavy, heavy, light = [], [], []
+            for group in write_groups(level):
+                fns = [step_fns[op] for op in group]
+                if sum(operator_cost(op) for op in group) < (
+                        self.parallel_min_cost):
+                    light.append(fns)
+                elif all(op.thread_safe for op in group):
+                    heavy.append(fns)
+                else:
+                    main_heavy.append(fns)
+
+            if len(heavy) == 0 or len(heavy) + len(main_heavy) < 2:
+                plan.extend(step_fns[op] for op in level)
+            else:
+                if len(main_heavy) == 0:
+                    main_heavy.append(heavy.pop(0))
+                plan.append(self._make_parallel_step(
+                    heavy, [fn for fns in main_heavy + light for fn in fns]))
+        return plan
+
+    def _compile_steps(self, steps):
+        return compile_steps(self._step_order, steps, self.signals, self.dt)
+
+    def _make_parallel_step(self, thread_groups, main_fns):
+        if self._pool is None:
+            self._pool = ThreadPool(self.n_threads - 1, _init_worker)
+        pool = self._pool
+
+        def step_parallel():
+            results = [pool.apply_async(_call_all, (fns,))
+                       for fns in thread_groups]
+            _call_all(main_fns)
+            for result in results:
+                result.get()
+        return step_parallel
+
     def run(self, time_in_seconds, progress_bar=None):
         """Simulate for the given length of time.
 
@@ -302,28 +989,169 @@ class Simulator(object):
             If False, the progress bar will be disabled.
             For more control over the progress bar, pass in a `.ProgressBar`
             or `.ProgressUpdater` instance.
+
+        Notes
+        -----
+        The steps are run in blocks of ``chunk_steps`` steps, which gives
+        the same results as calling `.Simulator.step` ``steps`` times,
+        but with less overhead per step.
         """
+        if self.closed:
+            raise SimulatorClosed("Simulator cannot run because it is closed.")
+
         if progress_bar is None:
             progress_bar = self.progress_bar
+
+        # preallocate space for the samples collected during this run
+        for probe in self.model.probes:
+            n_samples = int(np.ceil(steps / self._probe_period(probe))) + 1
+            self._probe_outputs[probe].reserve(n_samples)
+
         with ProgressTracker(steps, progress_bar, "Simulating") as progress:
-            for i in range(steps):
-                self.step()
-                progress.step()
+            for start in range(0, steps, self.chunk_steps):
+                n = min(self.chunk_steps, steps - start)
+                self._run_chunk(n)
+                progress.step(n)
+
+    def iter_run(self, time_in_seconds, chunk_steps=None, discard=False):
+        """Simulate for the given length of time, yielding data in chunks.
+
+        This makes probe data available while the simulation runs, e.g.,
+        to analyze it online or to pass it on to another process.
+
+        Parameters
+        ----------
+        time_in_seconds : float
+            Amount of time to run the simulation for.
+        chunk_steps : int, optional (Default: None)
+            Number of steps to run between two chunks.
+            If None, `.Simulator.chunk_steps` will be used.
+        discard : bool, optional (Default: False)
+            Whether to discard the probe data once it has been yielded, so
+            that the memory (or disk space) used for it stays bounded. Note
+            that ``sim.data`` then does not contain the yielded data.
+
+        Yields
+        ------
+        t : ndarray
+            The times of the steps run for this chunk.
+        data : dict
+            Mapping from each probe to a copy of the samples it collected
+            during this chunk (shaped like the arrays in ``sim.data``).
+        """
+        if self.closed:
+            raise SimulatorClosed("Simulator cannot run because it is closed.")
+
+        chunk_steps = self.chunk_steps if chunk_steps is None else int(
+            chunk_steps)
+        if chunk_steps < 1:
+            raise ValidationError("Must be at least 1 (got %r)" % chunk_steps,
+                                  attr='chunk_steps', obj=self)
+
+        steps = int(np.round(float(time_in_seconds) / self.dt))
+        for start in range(0, steps, chunk_steps):
+            n_before = self.n_steps
+            n_samples = {probe: len(self._probe_outputs[probe])
+                         for probe in self.model.probes}
+            self.run_steps(min(chunk_steps, steps - start), progress_bar=False)
+
+            t = self.dt * np.arange(n_before + 1, self.n_steps + 1)
+            data = {probe: self._probe_chunk(probe, n_samples[probe])
+                    for probe in self.model.probes}
+            if discard:
+                self._close_probe_buffers(remove=True)
+                for probe in self.model.probes:
+                    self._probe_outputs[probe] = self._make_probe_buffer(probe)
+            yield t, data
+
+    def _probe_chunk(self, probe, start):
+        return np.array(self._probe_outputs[probe].view()[start:])
+
+    def _run_chunk(self, n):
+        """Advance the simulator by ``n`` steps with little overhead per step.
+
+        Which probes record data after each step is computed once for the
+        whole chunk, rather than after every step as in `.Simulator.step`.
+        """
+        schedule = self._probe_schedule(n)
+        step_fns = self._plan
+        start_step = (self.profiler.start_step if self.profiler is not None
+                      else None)
+        old_err = np.seterr(invalid='raise', divide='ignore')
+        try:
+            for records in schedule:
+                if start_step is not None:
+                    start_step()
+                for step_fn in step_fns:
+                    step_fn()
+                for record, x in records:
+                    record(x)
+        finally:
+            np.seterr(**old_err)
+            self._probe_step_time()
+
+    def _probe_schedule(self, n):
+        """Returns the ``(record, x)`` pairs to call after each of ``n`` steps.
+
+        ``record(x)`` appends the probed signal ``x`` to a probe buffer or
+        adds it to the window of a `.ProbeReducer`.
+        """
+        step_numbers = np.arange(1, n + 1) + int(self.n_steps)
+        schedule = [[] for _ in range(n)]
+        for probe in self.model.probes:
+            if probe.on:
+                x = self.signals[self.model.sig[probe]['in']]
+                append = self._probe_outputs[probe].append
+                reducer = self._probe_reducers.get(probe)
+                sampled = step_numbers % self._probe_period(probe) < 1
+                if reducer is None:
+                    for i in np.flatnonzero(sampled):
+                        schedule[i].append((append, x))
+                    continue
+
+                def reduce_append(x, append=append, reducer=reducer):
+                    append(reducer.reduce(x))
+
+                for i in range(n):
+                    schedule[i].append(
+                        (reduce_append if sampled[i] else reducer.add, x))
+        return schedule
 
     def step(self):
         """Advance the simulator by 1 step (``dt`` seconds)."""
         if self.closed:
             raise SimulatorClosed("Simulator cannot run because it is closed.")
 
+        if self.profiler is not None:
+            self.profiler.start_step()
         old_err = np.seterr(invalid='raise', divide='ignore')
         try:
-            for step_fn in self._steps:
+            for step_fn in self._plan:
                 step_fn()
         finally:
             np.seterr(**old_err)
 
         self._probe()
 
+    def profile(self):
+        """Report the time spent in each operator.
+
+        The simulator must have been created with ``profiling=True``.
+        Times are measured from the last reset of the simulator.
+
+        Returns
+        -------
+        dict
+            The time spent in each operator and summed by operator type,
+            tag, and the object that the operators were built for.
+            See `.OperatorProfiler.report` for details.
+        """
+        if self.profiler is None:
+            raise SimulationError(
+                "Profiling is disabled. Create the Simulator with "
+                "'profiling=True' to enable it.")
+        return self.profiler.report()
+
     def trange(self, dt=None):
         """Create a vector of times matching probed data.
 
@@ -339,3 +1167,155 @@ class Simulator(object):
         dt = self.dt if dt is None else dt
         n_steps = int(self.n_steps * (self.dt / dt))
         return dt * np.arange(1, n_steps + 1)
+
+
+def _init_worker():
+    np.seterr(invalid='raise', divide='ignore')
+
+
+def _call_all(fns):
+    for fn in fns:
+        fn()
+
+
+class BatchProbeDict(ProbeDict):
+    """Map from Probe -> ndarray, with the trials along the first axis.
+
+    Probe data is returned as ``(n_trials, n_samples, ...)`` arrays,
+    which are views on the data collected by the `.BatchSimulator`.
+    """
+
+    def __getitem__(self, key):
+        rval = super(BatchProbeDict, self).__getitem__(key)
+        if isinstance(self.raw[key], (ProbeBuffer, DiskProbeBuffer)):
+            rval = np.swapaxes(rval, 0, 1)
+        return rval
+
+
+class BatchSimulator(Simulator):
+    """Simulates several trials of the same model at once.
+
+    The model is built once and then simulated with a different seed for each
+    trial. Every signal that can change during the simulation gets a leading
+    batch axis (see `.BatchSignalDict`), so that most operators advance all
+    trials with a single vectorized computation. Operators that cannot do so
+    fall back to running each trial separately (see
+    `.Operator.make_batch_step`). Each trial gives the same results as a
+    `.Simulator` with the same seed.
+
+    Note that ``Node`` functions are called once per trial and time step.
+
+    Parameters
+    ----------
+    network : Network or None
+        A network object to be built and then simulated. If None,
+        then a `.Model` with the build model must be provided instead.
+    seeds : iterable of int
+        The seed for the stochastic operators of each trial.
+        The number of seeds determines the number of trials.
+    dt : float, optional (Default: 0.001)
+        The length of a simulator timestep, in seconds.
+    model : Model, optional (Default: None)
+        A `.Model` that contains build artifacts to be simulated.
+    progress_bar : bool or `.ProgressBar` or `.ProgressUpdater`, optional \
+                   (Default: True)
+        Progress bar for displaying build and simulation progress.
+    optimize : bool, optional (Default: True)
+        If ``True``, the builder will run an additional optimization step.
+    probe_storage : {'memory', 'disk'}, optional (Default: None)
+        Where probe data is stored for probes that do not set their own
+        ``storage``.
+    profiling : bool or `.OperatorProfiler`, optional (Default: False)
+        Whether to measure the time spent in each operator.
+    n_threads : int, optional (Default: 1)
+        Number of threads used to run operators.
+    dtype : numpy.dtype, optional (Default: ``np.float64``)
+        The floating point type of the signals of the built model.
+    compiled : bool, optional (Default: False)
+        Whether to compile the step functions into one Python function.
+    build_workers : int, optional (Default: 1)
+        Number of threads that solve for decoders while building.
+
+    Attributes
+    ----------
+    data : BatchProbeDict
+        The `.BatchProbeDict` mapping from Nengo objects to the data
+        associated with those objects. Probe data has the shape
+        ``(n_trials, n_samples, ...)``.
+    n_trials : int
+        The number of trials simulated in parallel.
+    rngs : list of `numpy.random.RandomState`
+        The random number generator of each trial.
+    signals : BatchSignalDict
+        The `.BatchSignalDict` mapping from `.Signal` instances to NumPy
+        arrays with a leading batch axis.
+    """
+
+    def __init__(self, network, seeds, dt=0.001, model=None,
+                 progress_bar=True, optimize=True, probe_storage=None,
+                 profiling=False, n_threads=1, dtype=np.float64,
+                 compiled=False, build_workers=1):
+        seeds = [int(seed) for seed in seeds]
+        if len(seeds) == 0:
+            raise ValidationError(
+                "Must provide at least one seed", attr='seeds', obj=self)
+        self.n_trials = len(seeds)
+
+        super(BatchSimulator, self).__init__(
+            network, dt=dt, seed=seeds, model=model,
+            progress_bar=progress_bar, optimize=optimize,
+            probe_storage=probe_storage, profiling=profiling,
+            n_threads=n_threads, dtype=dtype, compiled=compiled,
+            build_workers=build_workers)
+        self.data = BatchProbeDict(self._probe_outputs)
+
+    def reset(self, seed=None):
+        """Reset the simulator state.
+
+        Parameters
+        ----------
+        seed : iterable of int, optional
+            A seed for each trial. Must have length ``n_trials``.
+        """
+        if seed is not None:
+            seed = [int(s) for s in seed]
+            if len(seed) != self.n_trials:
+                raise ValidationError(
+                    "Must provide %d seeds (got %d)" % (
+                        self.n_trials, len(seed)), attr='seed', obj=self)
+        super(BatchSimulator, self).reset(seed=seed)
+
+    def _make_probe_buffer(self, probe, shape=None):
+        sig = self.model.sig[probe]['in']
+        return super(BatchSimulator, self)._make_probe_buffer(
+            probe, shape=(self.n_trials,) + sig.shape)
+
+    def _make_signals(self):
+        return BatchSignalDict(
+            self.n_trials, shared=[self.model.step, self.model.time])
+
+    def _make_steps(self):
+        self.rngs = [np.random.RandomState(seed) for seed in self.seed]
+        trial_signals = [self.signals.trial(i) for i in range(self.n_trials)]
+        return [
+            op.make_batch_step(self.signals, self.dt, self.rngs, trial_signals)
+            for op in self._step_order]
+
+    def _rngs(self):
+        return self.rngs
+
+    def _probe_chunk(self, probe, start):
+        return np.swapaxes(
+            super(BatchSimulator, self)._probe_chunk(probe, start), 0, 1)
+
+    def _compile_steps(self, steps):
+        # the templates are written for the arrays of a single trial
+        return compile_steps(self._step_order, steps, self.signals, self.dt,
+                             templates=False)
+
+    def _get_rng_state(self):
+        return [rng.get_state() for rng in self.rngs]
+
+    def _set_rng_state(self, state):
+        for rng, rng_state in zip(self.rngs, state):
+            rng.set_state(rng_state)
@@ -240,7 +240,8 @@ class LinearFilter(Synapse):
         if y0 is not None:
             output[:] = y0
 
-        return LinearFilter.NoDen(np.array([1.]), np.array([]), output)
+        return LinearFilter.NoDen(
+            np.array([1.], dtype=dtype), np.array([], dtype=dtype), output)
 
     class Step(object):
         """Abstract base class for LTI filtering step functions."""
@@ -252,6 +253,11 @@ class LinearFilter(Synapse):
         def __call__(self, t, signal):
             raise NotImplementedError("Step functions must implement __call__")
 
+        @property
+        def state(self):
+            """(dict) The objects holding the state of the filter."""
+            return {'output': self.output}
+
     class NoDen(Step):
         """An LTI step function for transfer functions with no denominator.
 
@@ -327,6 +333,11 @@ class LinearFilter(Synapse):
 
             return self.output
 
+        @property
+        def state(self):
+            """(dict) The objects holding the state of the filter."""
+            return {'output': self.output, 'x': self.x, 'y': self.y}
+
 
 class Lowpass(LinearFilter):
     """Standard first-order lowpass filter synapse.
@@ -458,6 +469,7 @@ class Triangle(Synapse):
             x.appendleft(ndiff * signal)
             return output
 
+        step_triangle.state = {'output': output, 'x': x}
         return step_triangle
 
 
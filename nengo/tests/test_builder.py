@@ -5,7 +5,9 @@ import nengo
 from nengo.builder import Model
 from nengo.builder.ensemble import BuiltEnsemble
 from nengo.builder.signal import Signal, SignalDict
-from nengo.exceptions import ObsoleteError, SignalError
+from nengo.cache import CacheIndex, DecoderCache
+from nengo.exceptions import (
+    BuildError, ObsoleteError, SignalError, ValidationError)
 from nengo.utils.compat import itervalues, range
 
 
@@ -259,3 +261,213 @@ def test_obsolete_params(RefSimulator):
         pass
     with pytest.raises(ObsoleteError):
         sim.data[c].decoders
+
+
+def test_origins(RefSimulator):
+    with nengo.Network() as net:
+        a = nengo.Ensemble(10, 1)
+        b = nengo.Ensemble(10, 1)
+        conn = nengo.Connection(a, b, learning_rule_type=nengo.PES())
+        nengo.Connection(b, conn.learning_rule)
+        p = nengo.Probe(b, synapse=0.01)
+
+    model = Model()
+    model.build(net)
+    for op in model.operators[1:]:
+        assert len(model.origins[op]) == 1
+    origins = set(objs[0] for objs in model.origins.values())
+    assert set([a, b, conn, conn.learning_rule, p]) <= origins
+    assert net not in origins
+
+    # merged operators keep the objects of all merged operators
+    with RefSimulator(net, optimize=True) as sim:
+        objs = [obj for op in sim.model.operators
+                for obj in sim.model.origins.get(op, [])]
+        assert len(objs) == len(model.origins)
+        assert len(sim.model.operators) < len(model.operators)
+
+
+def _decoded_net(seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node([0.5, -0.2])
+        a = nengo.Ensemble(60, 2)
+        b = nengo.Ensemble(50, 1)
+        nengo.Connection(u, a)
+        conns = [nengo.Connection(a, b, function=lambda x: x[0] * x[1]),
+                 nengo.Connection(a[1], b, solver=nengo.solvers.LstsqL2(
+                     weights=True)),
+                 nengo.Connection(a, b.neurons, transform=np.ones((50, 2)),
+                                  solver=nengo.solvers.LstsqNoise())]
+        with nengo.Network():
+            c = nengo.Ensemble(40, 1)
+            conns.append(nengo.Connection(c, c, synapse=0.1))
+        conns.append(nengo.Connection(b, c))
+        nengo.Probe(c, synapse=0.01)
+    return net, conns
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_build_workers(seed, processes):
+    net, conns = _decoded_net(seed)
+    models = []
+    for build_workers in (1, 3):
+        model = Model(build_workers=build_workers,
+                      build_processes=processes)
+        model.build(net)
+        assert model.decoder_pool is None
+        models.append(model)
+
+    for conn in conns:
+        for attr in ('eval_points', 'weights', 'transform'):
+            assert np.array_equal(getattr(models[0].params[conn], attr),
+                                  getattr(models[1].params[conn], attr))
+    assert len(models[0].operators) == len(models[1].operators)
+
+
+def test_build_workers_cache(tmpdir, seed, monkeypatch):
+    net, conns = _decoded_net(seed)
+
+    def build(cache_dir, build_workers):
+        model = Model(build_workers=build_workers,
+                      decoder_cache=DecoderCache(cache_dir=cache_dir))
+        model.build(net)
+        with CacheIndex(cache_dir) as index:
+            return model, sorted(index._index)
+
+    model1, keys1 = build(str(tmpdir.mkdir('a')), 1)
+    model3, keys3 = build(str(tmpdir.mkdir('b')), 3)
+    assert len(keys1) == len(conns) + 1  # and the connection of the probe
+    assert keys3 == keys1
+
+    # cached decoders are loaded instead of solved
+    def solve(*args):
+        raise AssertionError("decoders should be loaded from the cache")
+    monkeypatch.setattr(nengo.builder.connection, '_solve', solve)
+    model, keys = build(str(tmpdir.join('b')), 3)
+    assert keys == keys3
+    for conn in conns:
+        assert np.array_equal(model.params[conn].weights,
+                              model1.params[conn].weights)
+
+
+def test_build_workers_validation():
+    with pytest.raises(ValidationError):
+        Model(build_workers=0)
+
+
+def test_shared_activities(seed, monkeypatch):
+    with nengo.Network(seed=seed) as net:
+        a = nengo.Ensemble(80, 2)
+        b = nengo.Node(size_in=2)
+        conns = [nengo.Connection(a, b),
+                 nengo.Connection(a, b[0], function=lambda x: x[0] * x[1]),
+                 nengo.Connection(a[1], b[1], function=np.square),
+                 nengo.Connection(a, b, solver=nengo.solvers.LstsqL2(
+                     reg=0.01)),
+                 nengo.Connection(a, b, eval_points=np.ones((10, 2)))]
+
+    rates = []
+    lif_rates = nengo.LIF.rates
+
+    def count_rates(self, x, gain, bias):
+        rates.append(x.shape)
+        return lif_rates(self, x, gain, bias)
+    monkeypatch.setattr(nengo.LIF, 'rates', count_rates)
+
+    model = Model()
+    model.build(net)
+    assert model.shared_inputs is None
+    # once for the ensemble's evaluation points, and once for the connection
+    # with its own evaluation points
+    n_eval = len(model.params[a].eval_points)
+    assert sorted(rates) == sorted([(n_eval, 80), (10, 80)])
+
+    built = model.params[a]
+    for conn in conns:
+        eval_points = model.params[conn].eval_points
+        x = np.dot(eval_points, built.encoders.T / a.radius)
+        activities = lif_rates(a.neuron_type, x, built.gain, built.bias)
+        targets = nengo.builder.connection.get_targets(conn, eval_points)
+        decoders, _ = conn.solver(activities, targets)
+        assert np.array_equal(model.params[conn].weights, decoders.T)
+
+
+def test_rebuild(RefSimulator, seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(6 * t))
+        a = nengo.Ensemble(50, 1)
+        b = nengo.Ensemble(50, 1)
+        with nengo.Network() as subnet:
+            c = nengo.Ensemble(40, 1)
+        nengo.Connection(u, a)
+        ab = nengo.Connection(a, b, learning_rule_type=nengo.PES())
+        nengo.Connection(b, ab.learning_rule)
+        bc = nengo.Connection(b, c)
+        probes = [nengo.Probe(b, synapse=0.01), nengo.Probe(c, synapse=0.01)]
+
+    def check(rebuilt):
+        with RefSimulator(None, model=rebuilt) as sim:
+            sim.run(0.1)
+            data = [sim.data[p] for p in probes]
+        with RefSimulator(net) as sim:
+            sim.run(0.1)
+            for p, x in zip(probes, data):
+                assert np.allclose(sim.data[p], x)
+
+    model = Model(incremental=True)
+    model.build(net)
+
+    # nothing changed
+    rebuilt = model.rebuild(net)
+    assert len(rebuilt.operators) == len(model.operators)
+    assert not any(op in model.operators for op in rebuilt.operators)
+    for obj in (a, b, c, ab, bc):
+        assert rebuilt.params[obj] is model.params[obj]
+    check(model.rebuild(net))
+    assert not model.optimized
+
+    # a changed function rebuilds only that connection
+    bc.function = lambda x: x ** 2
+    rebuilt = model.rebuild(net)
+    assert rebuilt.params[bc] is not model.params[bc]
+    for obj in (a, b, c, ab):
+        assert rebuilt.params[obj] is model.params[obj]
+    assert len(rebuilt.operators) == len(model.operators)
+    check(rebuilt.rebuild(net))
+
+    # a changed ensemble rebuilds its connections and probes
+    b.radius = 1.5
+    model, old = model.rebuild(net), model
+    assert model.params[b] is not old.params[b]
+    for obj in (b, ab, bc, ab.learning_rule, probes[0]):
+        assert model.sig[obj] is not old.sig[obj]
+    for obj in (a, c, probes[1]):
+        assert model.params[obj] is old.params[obj]
+    check(model.rebuild(net))
+
+    # added probes do not change the seeds of other objects
+    with net:
+        probes.append(nengo.Probe(a.neurons))
+    model, old = model.rebuild(net), model
+    assert probes[-1] in model.probes
+    for obj in (a, b, c, ab, bc):
+        assert model.params[obj] is old.params[obj]
+    check(model.rebuild(net))
+
+    # added and removed objects
+    with subnet:
+        d = nengo.Ensemble(20, 1)
+        nengo.Connection(c, d)
+    net.connections.remove(bc)
+    model = model.rebuild(net)
+    assert bc not in model.params and bc not in model.sig
+    assert all(model.origins[op][0] is not bc for op in model.origins)
+    assert d in model.params
+    check(model.rebuild(net))
+
+    with RefSimulator(None, model=model):
+        pass
+    with pytest.raises(BuildError):
+        model.rebuild(net)
+    with pytest.raises(BuildError):
+        Model().rebuild(net)
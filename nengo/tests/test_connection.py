@@ -5,12 +5,13 @@ import pytest
 
 import nengo
 import nengo.utils.numpy as npext
+from nengo.builder.connection import get_targets
 from nengo.connection import ConnectionSolverParam
 from nengo.dists import UniformHypersphere
 from nengo.exceptions import BuildError, ObsoleteError, ValidationError
 from nengo.solvers import LstsqL2
 from nengo.utils.functions import piecewise
-from nengo.utils.testing import allclose
+from nengo.utils.testing import allclose, warns
 
 
 def test_args(nl, seed, rng):
@@ -965,3 +966,46 @@ def test_function_returns_none_error(Simulator):
     with pytest.raises(BuildError):
         with nengo.Simulator(model):
             pass
+
+
+def test_vectorized_function(RefSimulator, seed):
+    calls = []
+
+    def product(x):
+        calls.append(x.shape)
+        return x[..., 0:1] * x[..., 1:2]
+
+    with nengo.Network(seed=seed) as model:
+        a = nengo.Ensemble(50, 2)
+        b = nengo.Node(size_in=1)
+        conn = nengo.Connection(a, b, function=product)
+        vconn = nengo.Connection(a, b, function=product, vectorized=True)
+        assert not conn.vectorized and vconn.vectorized
+
+    del calls[:]
+    with RefSimulator(model) as sim:
+        pass
+    n_eval = len(sim.data[conn].eval_points)
+    # one call with all points, one to check the first point, and one call
+    # per point for the connection that is not vectorized
+    assert sorted(calls).count((n_eval, 2)) == 1
+    assert len(calls) == n_eval + 2
+    assert np.allclose(sim.data[vconn].weights, sim.data[conn].weights)
+
+
+@pytest.mark.parametrize('function', [
+    lambda x: x[0] * x[1],  # wrong shape when vectorized
+    lambda x: np.sum(x, keepdims=True),  # wrong values when vectorized
+    lambda x: [float(x[0] * x[1])],  # raises an error when vectorized
+])
+def test_vectorized_function_fallback(function, rng):
+    with nengo.Network():
+        a = nengo.Ensemble(10, 2)
+        conn = nengo.Connection(a, nengo.Node(size_in=1), function=function,
+                                vectorized=True)
+
+    eval_points = rng.uniform(-1, 1, size=(20, 2))
+    with warns(UserWarning):
+        targets = get_targets(conn, eval_points)
+    assert np.allclose(targets.ravel(),
+                       np.ravel([function(x) for x in eval_points]))
@@ -2,7 +2,7 @@ import numpy as np
 import pytest
 
 import nengo
-from nengo.exceptions import ObsoleteError
+from nengo.exceptions import ObsoleteError, ValidationError
 from nengo.utils.compat import range
 from nengo.utils.stdlib import Timer
 
@@ -257,3 +257,86 @@ def test_update_timing(Simulator):
 
     assert np.allclose(sim.data[sig_p][0], 0)
     assert np.allclose(sim.data[sig_p][1:], 1)
+
+
+def test_probe_off(Simulator):
+    with nengo.Network() as net:
+        u = nengo.Node(output=1)
+        p_on = nengo.Probe(u)
+        p_off = nengo.Probe(u, on=False)
+
+    with Simulator(net) as sim:
+        sim.run(0.01)
+
+    assert sim.data[p_on].shape == (10, 1)
+    assert len(sim.data[p_off]) == 0
+
+
+def test_probe_storage(RefSimulator, tmpdir):
+    with nengo.Network() as net:
+        u = nengo.Node(output=np.sin)
+        p_default = nengo.Probe(u)
+        p_disk = nengo.Probe(u, storage='disk')
+        p_memory = nengo.Probe(u, storage='memory')
+
+    path = nengo.rc.get('probe_storage', 'path')
+    nengo.rc.set('probe_storage', 'path', str(tmpdir))
+    try:
+        with RefSimulator(net) as sim:
+            sim.run(0.01)
+        assert not isinstance(sim.data[p_default], np.memmap)
+        assert not isinstance(sim.data[p_memory], np.memmap)
+        assert isinstance(sim.data[p_disk], np.memmap)
+        assert np.allclose(sim.data[p_disk], sim.data[p_memory])
+
+        with RefSimulator(net, probe_storage='disk') as sim:
+            sim.run(0.01)
+            sim.run(0.005)
+            # data discarded by reset is removed from disk
+            n_files = len(tmpdir.listdir())
+            for _ in range(3):
+                sim.reset()
+                sim.run(0.005)
+            assert len(tmpdir.listdir()) == n_files
+        assert isinstance(sim.data[p_default], np.memmap)
+        assert not isinstance(sim.data[p_memory], np.memmap)
+        assert np.allclose(sim.data[p_default][:, 0], np.sin(sim.trange()))
+    finally:
+        nengo.rc.set('probe_storage', 'path', path)
+
+    with pytest.raises(ValidationError):
+        nengo.Probe(u, storage='cloud')
+    with pytest.raises(ValidationError):
+        RefSimulator(net, probe_storage='cloud')
+
+
+@pytest.mark.parametrize('reduce', ['mean', 'sum', 'max', 'count'])
+def test_probe_reduce(RefSimulator, seed, reduce):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(10 * t))
+        a = nengo.Ensemble(20, 1)
+        nengo.Connection(u, a)
+        targets = [(a.neurons, 'spikes'), (a.neurons, 'voltage'),
+                   (a, 'decoded_output')]
+        full = [nengo.Probe(obj, attr) for obj, attr in targets]
+        reduced = [nengo.Probe(obj, attr, sample_every=0.01, reduce=reduce)
+                   for obj, attr in targets]
+
+    reducers = {'mean': lambda x: x.mean(axis=1),
+                'sum': lambda x: x.sum(axis=1),
+                'max': lambda x: x.max(axis=1),
+                'count': lambda x: (x != 0).sum(axis=1)}
+    with RefSimulator(net) as sim:
+        sim.run(0.035)
+        for _ in range(10):
+            sim.step()
+        for p_full, p_reduced in zip(full, reduced):
+            x = sim.data[p_full][:40]
+            expected = reducers[reduce](x.reshape((4, 10) + x.shape[1:]))
+            assert sim.data[p_reduced].shape == expected.shape
+            assert np.allclose(sim.data[p_reduced], expected)
+        if reduce == 'count':
+            assert sim.data[reduced[0]].dtype == np.int64
+
+    with pytest.raises(ValidationError):
+        nengo.Probe(a, reduce='median')
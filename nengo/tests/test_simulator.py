@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 import pkg_resources
 import pytest
@@ -8,7 +10,8 @@ from nengo.builder import Model
 from nengo.builder.ensemble import BuiltEnsemble
 from nengo.builder.operator import DotInc
 from nengo.builder.signal import Signal
-from nengo.exceptions import ObsoleteError, SimulatorClosed
+from nengo.exceptions import (
+    ObsoleteError, SimulationError, SimulatorClosed, ValidationError)
 from nengo.utils.compat import ResourceWarning
 from nengo.utils.testing import warns
 
@@ -57,6 +60,96 @@ def test_probedict():
     assert np.all(probedict.get("list") == np.asarray(raw.get("list")))
 
 
+def test_probedict_incremental():
+    raw = {"list": [np.array([0., 1.])]}
+    probedict = nengo.simulator.ProbeDict(raw)
+    first = probedict["list"]
+    for i in range(1, 10):
+        raw["list"].append(np.array([i, i + 1.]))
+        assert np.array_equal(probedict["list"],
+                              [[j, j + 1] for j in range(i + 1)])
+    # earlier views stay valid, and samples are not copied again
+    assert np.array_equal(first, [[0, 1]])
+    assert np.shares_memory(probedict["list"], probedict["list"])
+    assert not probedict["list"].flags.writeable
+
+    raw["list"] = [np.array([5., 6.])]
+    assert np.array_equal(probedict["list"], [[5, 6]])
+    raw["list"] = []
+    assert probedict["list"].shape == (0,)
+
+
+def test_probebuffer():
+    buf = nengo.simulator.ProbeBuffer((2,))
+    assert len(buf) == 0 and buf.capacity == 0
+
+    buf.reserve(3)
+    assert buf.capacity == 3
+    for i in range(5):
+        buf.append([i, -i])
+    assert len(buf) == 5 and buf.capacity >= 5
+
+    view = buf.view()
+    assert np.array_equal(view, [[i, -i] for i in range(5)])
+    assert not view.flags.writeable
+
+    # growing the buffer must not invalidate views handed out before
+    buf.reserve(100)
+    buf.append([5, -5])
+    assert view.shape == (5, 2)
+    assert np.array_equal(buf.view()[-1], [5, -5])
+
+
+@pytest.mark.parametrize('flush', ('chunk', 'fsync', 'close'))
+def test_diskprobebuffer(tmpdir, flush):
+    buf = nengo.simulator.DiskProbeBuffer(
+        (3,), path=str(tmpdir), chunk_size=4 * 3 * 8, flush=flush)
+    x = np.arange(30, dtype=float).reshape(10, 3)
+    for xi in x[:6]:
+        buf.append(xi)
+    assert len(buf) == 6
+
+    view = buf.view()
+    assert isinstance(view, np.memmap)
+    assert not view.flags.writeable
+    assert np.array_equal(view, x[:6])
+
+    for xi in x[6:]:
+        buf.append(xi)
+    buf.close()
+    assert np.array_equal(buf.view(), x)
+    assert np.array_equal(np.load(buf.filename), x)
+
+    buf.remove()
+    assert tmpdir.listdir() == []
+
+
+def test_diskprobebuffer_header(tmpdir):
+    # a long shape does not fit into the default 128 byte header
+    shape = (1,) * 30
+    buf = nengo.simulator.DiskProbeBuffer(shape, path=str(tmpdir))
+    for _ in range(3):
+        buf.append(np.ones(shape))
+    assert buf.header_size % 64 == 0
+    assert buf.header_size > 128
+    buf.close()
+    assert np.array_equal(np.load(buf.filename), np.ones((3,) + shape))
+
+
+def test_probedict_is_view(RefSimulator):
+    with nengo.Network() as model:
+        u = nengo.Node(output=np.sin)
+        p = nengo.Probe(u)
+
+    with RefSimulator(model) as sim:
+        sim.run(0.01)
+        data = sim.data[p]
+        assert data.shape == (10, 1)
+        assert not data.flags.writeable
+        assert np.may_share_memory(data, sim.data[p])
+        assert np.allclose(data[:, 0], np.sin(sim.trange()))
+
+
 def test_probedict_with_repeated_simulator_runs(RefSimulator):
     with nengo.Network() as model:
         ens = nengo.Ensemble(10, 1)
@@ -137,6 +230,188 @@ def test_entry_point(Simulator):
     assert Simulator in sims
 
 
+def test_run_steps_equals_step(RefSimulator, seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(10 * t))
+        a = nengo.Ensemble(20, 1)
+        nengo.Connection(u, a)
+        probes = [nengo.Probe(a, synapse=0.01),
+                  nengo.Probe(a.neurons, sample_every=0.0023),
+                  nengo.Probe(u, sample_every=0.007, synapse=0.005)]
+
+    with RefSimulator(net) as sim:
+        sim.run_steps(37)
+        sim.run_steps(250)
+        chunked = [sim.data[p] for p in probes]
+        time = sim.time
+
+        sim.reset()
+        for _ in range(287):
+            sim.step()
+        assert sim.n_steps == 287
+        assert sim.time == time
+        for p, data in zip(probes, chunked):
+            assert np.array_equal(sim.data[p], data)
+
+
+@pytest.mark.parametrize('discard', [False, True])
+def test_iter_run(RefSimulator, seed, discard):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: np.sin(10 * t))
+        a = nengo.Ensemble(20, 1)
+        nengo.Connection(u, a)
+        probes = [nengo.Probe(a, synapse=0.01),
+                  nengo.Probe(a.neurons, sample_every=0.003)]
+
+    with RefSimulator(net) as sim:
+        sim.run(0.1)
+        data = [sim.data[p] for p in probes]
+
+        sim.reset()
+        chunks = list(sim.iter_run(0.1, chunk_steps=30, discard=discard))
+        assert [len(t) for t, _ in chunks] == [30, 30, 30, 10]
+        assert np.allclose(np.concatenate([t for t, _ in chunks]),
+                           sim.trange())
+        for p, x in zip(probes, data):
+            assert np.array_equal(
+                np.concatenate([chunk[p] for _, chunk in chunks]), x)
+            assert len(sim.data[p]) == (0 if discard else len(x))
+
+        with pytest.raises(ValidationError):
+            next(sim.iter_run(0.1, chunk_steps=0))
+
+
+def _stateful_net(seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(nengo.processes.WhiteNoise(), size_out=1)
+        a = nengo.Ensemble(30, 1, neuron_type=nengo.LIF())
+        b = nengo.Ensemble(30, 1, noise=nengo.processes.FilteredNoise(
+            synapse=nengo.Alpha(0.005)))
+        nengo.Connection(u, a)
+        nengo.Connection(a, b, synapse=nengo.Alpha(0.01))
+        probes = [nengo.Probe(b, synapse=nengo.synapses.Triangle(0.01)),
+                  nengo.Probe(a.neurons, 'voltage'),
+                  nengo.Probe(b.neurons, sample_every=0.003)]
+    return net, probes
+
+
+def test_save_load_state(RefSimulator, seed, tmpdir):
+    net, probes = _stateful_net(seed)
+    fname = str(tmpdir.join("state.npz"))
+
+    with RefSimulator(net) as sim:
+        sim.run(0.05)
+        sim.save_state(fname)
+        sim.run(0.05)
+        time = sim.time
+        data = [sim.data[p] for p in probes]
+
+        sim.reset(seed=seed + 1)
+        sim.run(0.02)
+        sim.load_state(fname)
+        assert sim.n_steps == 50
+        sim.run(0.05)
+        assert sim.time == time
+        for p, x in zip(probes, data):
+            assert np.array_equal(sim.data[p], x)
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+def test_load_state_new_simulator(RefSimulator, optimize, seed, tmpdir):
+    net, probes = _stateful_net(seed)
+    fname = str(tmpdir.join("state.npz"))
+
+    with RefSimulator(net, optimize=optimize) as sim:
+        sim.run(0.05)
+        sim.save_state(fname)
+        sim.run(0.05)
+        data = [sim.data[p] for p in probes]
+
+    net2, probes2 = _stateful_net(seed)
+    with RefSimulator(net2, optimize=optimize) as sim:
+        sim.load_state(fname)
+        sim.run(0.05)
+        for p, x in zip(probes2, data):
+            assert np.allclose(sim.data[p], x)
+
+    with nengo.Network() as other:
+        nengo.Ensemble(10, 1)
+    with RefSimulator(other) as sim:
+        with pytest.raises(SimulationError):
+            sim.load_state(fname)
+        sim.close()
+        with pytest.raises(SimulatorClosed):
+            sim.save_state(fname)
+
+
+def test_fork(RefSimulator, seed):
+    net, probes = _stateful_net(seed)
+    a = net.ensembles[0]
+
+    with RefSimulator(net) as sim:
+        sim.run(0.05)
+        forks = sim.fork(2)
+        assert len(forks) == 2
+
+        encoders = sim.model.sig[a]['encoders']
+        voltage = sim.model.sig[a.neurons]['voltage']
+        for fork in forks:
+            assert fork.n_steps == sim.n_steps
+            assert np.shares_memory(fork.signals[encoders],
+                                    sim.signals[encoders])
+            assert not np.shares_memory(fork.signals[voltage],
+                                        sim.signals[voltage])
+
+        forks[1].signals[voltage][...] = 0.5
+        for s in [sim] + forks:
+            s.run(0.05)
+        for p in probes:
+            assert np.array_equal(forks[0].data[p], sim.data[p])
+        assert not np.array_equal(forks[1].data[probes[1]],
+                                  sim.data[probes[1]])
+
+        for fork in forks:
+            fork.close()
+        assert not sim.closed
+        sim.run(0.01)
+
+
+def test_n_threads(RefSimulator, seed):
+    node_threads = set()
+
+    def node_f(t):
+        node_threads.add(threading.current_thread())
+        return np.sin(10 * t)
+
+    with nengo.Network(seed=seed) as net:
+        ensembles = [nengo.Ensemble(50, 1) for _ in range(4)]
+        for ens in ensembles:
+            nengo.Connection(nengo.Node(node_f), ens)
+        for pre, post in zip(ensembles[:-1], ensembles[1:]):
+            nengo.Connection(pre.neurons, post.neurons,
+                             transform=0.001 * np.ones((50, 50)))
+        probes = [nengo.Probe(ens.neurons) for ens in ensembles]
+
+    with pytest.raises(ValidationError):
+        RefSimulator(net, n_threads=0)
+
+    with RefSimulator(net, n_threads=3) as sim:
+        sim.parallel_min_cost = 0
+        sim.reset()
+        assert len(sim._plan) < len(sim._steps)
+        sim.run(0.1)
+        parallel = [sim.data[p] for p in probes]
+        # Node functions are only called in the main thread
+        assert node_threads == {threading.current_thread()}
+
+        sim.n_threads = 1
+        sim.reset()
+        assert len(sim._plan) == len(sim._steps)
+        sim.run(0.1)
+        for p, x in zip(probes, parallel):
+            assert np.array_equal(sim.data[p], x)
+
+
 def test_signal_init_values(RefSimulator):
     """Tests that initial values are not overwritten."""
     zero = Signal([0])
@@ -258,3 +533,97 @@ def test_obsolete_params(RefSimulator):
         pass
     with pytest.raises(ObsoleteError):
         sim.data[c].decoders
+
+
+@pytest.mark.parametrize('optimize', (True, False))
+def test_batch_simulator(RefSimulator, seed, optimize):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(lambda t: [np.sin(t), np.cos(t)])
+        a = nengo.Ensemble(50, 2, noise=nengo.processes.WhiteNoise(
+            dist=nengo.dists.Gaussian(0, 0.01), seed=seed))
+        b = nengo.Ensemble(30, 1, neuron_type=nengo.LIFRate())
+        nengo.Connection(u, a)
+        nengo.Connection(a, b, function=lambda x: x[0] * x[1],
+                         synapse=nengo.Alpha(0.005))
+        nengo.Connection(a.neurons[:10], b.neurons[:10],
+                         transform=-0.1 * np.ones((10, 10)))
+        probes = [nengo.Probe(u), nengo.Probe(a, synapse=0.01),
+                  nengo.Probe(a.neurons, 'spikes'),
+                  nengo.Probe(a.neurons, 'voltage', sample_every=0.003),
+                  nengo.Probe(b, synapse=nengo.Triangle(0.01))]
+
+    with nengo.simulator.BatchSimulator(
+            net, seeds=[1, 2, 3], optimize=optimize) as batch_sim:
+        batch_sim.run(0.05)
+        assert batch_sim.n_steps == 50
+    with RefSimulator(net, optimize=optimize) as sim:
+        sim.run(0.05)
+
+    for p in probes:
+        assert batch_sim.data[p].shape == (3,) + sim.data[p].shape
+        for i in range(3):
+            assert np.allclose(batch_sim.data[p][i], sim.data[p])
+
+
+def test_batch_simulator_rngs(RefSimulator, seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(nengo.processes.WhiteNoise(), size_out=2)
+        p = nengo.Probe(u)
+
+    seeds = [seed + i for i in range(3)]
+    with nengo.simulator.BatchSimulator(net, seeds) as batch_sim:
+        batch_sim.run(0.01)
+    for i, trial_seed in enumerate(seeds):
+        with RefSimulator(net, seed=trial_seed) as sim:
+            sim.run(0.01)
+        assert np.allclose(batch_sim.data[p][i], sim.data[p])
+    assert not np.allclose(batch_sim.data[p][0], batch_sim.data[p][1])
+
+
+def test_batch_simulator_seeds(RefSimulator):
+    with nengo.Network() as net:
+        nengo.Ensemble(10, 1)
+
+    with pytest.raises(ValidationError):
+        nengo.simulator.BatchSimulator(net, seeds=[])
+    with nengo.simulator.BatchSimulator(net, seeds=[1, 2]) as sim:
+        with pytest.raises(ValidationError):
+            sim.reset(seed=[1, 2, 3])
+        sim.reset(seed=[3, 4])
+        assert sim.seed == [3, 4]
+
+
+def test_float32(RefSimulator, seed):
+    with nengo.Network(seed=seed) as net:
+        u = nengo.Node(nengo.processes.WhiteSignal(0.5, high=5, rms=0.3))
+        a = nengo.Ensemble(100, 1)
+        b = nengo.Ensemble(100, 1)
+        nengo.Connection(u, a)
+        conn = nengo.Connection(a, b, function=lambda x: -x,
+                                learning_rule_type=nengo.PES())
+        nengo.Connection(b, conn.learning_rule)
+        p_a = nengo.Probe(a, synapse=0.01)
+        p_b = nengo.Probe(b, synapse=0.01)
+        p_spikes = nengo.Probe(a.neurons)
+        p_weights = nengo.Probe(conn, 'weights', sample_every=0.01)
+
+    with pytest.raises(ValidationError):
+        Model(dtype=np.int32)
+
+    with RefSimulator(net, seed=seed, dtype=np.float64) as sim64:
+        sim64.run(0.5)
+    with RefSimulator(net, seed=seed, dtype=np.float32) as sim32:
+        assert sim32.model.dtype == np.float32
+        assert sim32.signals[sim32.model.sig[a]['encoders']].dtype == (
+            np.float32)
+        sim32.run(0.5)
+
+    # solvers work in double precision, so only the simulation differs
+    assert np.allclose(sim32.data[conn].weights, sim64.data[conn].weights)
+    for p in (p_a, p_b, p_spikes, p_weights):
+        assert sim32.data[p].dtype == np.float32
+    assert np.allclose(sim32.data[p_a], sim64.data[p_a], atol=0.03)
+    assert np.allclose(sim32.data[p_b], sim64.data[p_b], atol=0.03)
+    assert np.allclose(sim32.data[p_weights], sim64.data[p_weights],
+                       atol=1e-4)
+    assert np.mean(sim32.data[p_spikes] == sim64.data[p_spikes]) > 0.99
@@ -82,6 +82,25 @@ def test_cholesky(rng):
     assert np.allclose(x0, x2)
 
 
+@pytest.mark.parametrize('transpose', [False, True])
+def test_cholesky_factor_reuse(transpose, rng):
+    A, _ = get_system(200, 50, 2, rng=rng)
+    A = A.T if transpose else A
+    Ys = [rng.normal(size=(len(A), d)) for d in (1, 3)]
+    sigma = 0.1 * A.max()
+    solver = lstsq.Cholesky(transpose=transpose)
+    expected = [solver(A, Y, sigma)[0] for Y in Ys]
+    assert A not in lstsq.Cholesky._factors
+
+    A.setflags(write=False)
+    for Y, X0 in zip(Ys, expected):
+        X, _ = solver(A, Y, sigma)
+        assert np.array_equal(X, X0)
+    assert len(lstsq.Cholesky._factors[A]) == 1
+    solver(A, Ys[0], 2 * sigma)
+    assert len(lstsq.Cholesky._factors[A]) == 2
+
+
 def test_conjgrad(rng):
     A, b = get_system(1000, 100, 2, rng=rng)
     sigma = 0.1 * A.max()
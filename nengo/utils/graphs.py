@@ -36,6 +36,8 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 from collections import defaultdict
+import heapq
+import itertools
 
 from .compat import iteritems
 from ..exceptions import BuildError
@@ -101,7 +103,7 @@ class BidirectionalDAG(object):
             self.forward[e].add(merged_vertex)
 
 
-def toposort(edges):
+def toposort(edges, key=None):
     """Topological sort algorithm by Kahn[1]
 
     Complexity is O(nodes + vertices).
@@ -110,6 +112,10 @@ def toposort(edges):
     ----------
     edges : dict
         Dict of the form {a: {b, c}} where b and c depend on a
+    key : callable, optional
+        If given, nodes that become ready at the same time are ordered by
+        ``key(node)``, which makes the order independent of set ordering
+        (e.g., memory addresses). If None, the order is arbitrary.
 
     Returns
     -------
@@ -134,16 +140,29 @@ def toposort(edges):
     incoming_edges = {k: set(val) for k, val in iteritems(incoming_edges)}
     vertices = {v for v in edges
                 if v not in incoming_edges or not incoming_edges[v]}
+    if key is None:
+        pop, add = vertices.pop, vertices.add
+    else:
+        # a heap with a counter to break ties between equal keys
+        counter = itertools.count()
+        vertices = [(key(v), next(counter), v) for v in vertices]
+        heapq.heapify(vertices)
+
+        def pop():
+            return heapq.heappop(vertices)[2]
+
+        def add(v):
+            heapq.heappush(vertices, (key(v), next(counter), v))
     ordered = []
 
     while vertices:
-        n = vertices.pop()
+        n = pop()
         ordered.append(n)
         for m in edges.get(n, ()):
             assert n in incoming_edges[m]
             incoming_edges[m].remove(n)
             if not incoming_edges[m]:
-                vertices.add(m)
+                add(m)
     if any(incoming_edges.get(v, None) for v in edges):
         raise BuildError(
             "Input graph has cycles. This usually occurs because "
@@ -8,12 +8,15 @@ For example::
 
 from __future__ import absolute_import
 
+import threading
+
 import numpy as np
 
 import nengo.utils.numpy as npext
 from nengo.exceptions import ValidationError
 from nengo.params import (
     BoolParam, FrozenObject, IntParam, NdarrayParam, NumberParam, Parameter)
+from nengo.utils.stdlib import WeakKeyIDDictionary
 
 
 def format_system(A, Y):
@@ -38,10 +41,21 @@ class LeastSquaresSolver(FrozenObject):
 
 
 class Cholesky(LeastSquaresSolver):
-    """Solve a least-squares system using the Cholesky decomposition."""
+    """Solve a least-squares system using the Cholesky decomposition.
+
+    The factorization of the regularized Gram matrix of a readonly ``A``
+    (e.g., the activities that the builder shares between the connections
+    from an ensemble) is kept until ``A`` is deleted, so that solving
+    for other ``Y`` with the same ``A`` and ``sigma`` only needs the
+    triangular solves.
+    """
 
     transpose = BoolParam('transpose', optional=True)
 
+    # Factorizations of readonly matrices, as {(transpose, sigma): factor}
+    _factors = WeakKeyIDDictionary()
+    _factors_lock = threading.Lock()
+
     def __init__(self, transpose=None):
         super(Cholesky, self).__init__()
         self.transpose = transpose
@@ -53,30 +67,51 @@ class Cholesky(LeastSquaresSolver):
             # transpose if matrix is fat, but not if sigmas for each neuron
             transpose = m < n and sigma.size == 1
 
-        if transpose:
-            # substitution: x = A'*xbar, G*xbar = b where G = A*A' + lambda*I
-            G = np.dot(A, A.T)
-            b = Y
+        factor = self.factor(A, sigma, transpose)
+        # substitution: x = A'*xbar, G*xbar = b where G = A*A' + lambda*I
+        # multiplication by A': G*x = A'*b where G = A'*A + lambda*I
+        b = Y if transpose else np.dot(A.T, Y)
+        if isinstance(factor, tuple):
+            import scipy.linalg
+            X = scipy.linalg.cho_solve(factor, b)
         else:
-            # multiplication by A': G*x = A'*b where G = A'*A + lambda*I
-            G = np.dot(A.T, A)
-            b = np.dot(A.T, Y)
+            X = np.dot(factor, np.dot(factor.T, b))
+
+        X = np.dot(A.T, X) if transpose else X
+        info = {'rmses': rmses(A, X, Y)}
+        return X, info
+
+    def factor(self, A, sigma, transpose):
+        """Returns the factorization of the regularized Gram matrix of A.
+
+        This is the result of ``scipy.linalg.cho_factor``, or the inverse
+        of the lower Cholesky factor if SciPy is not available.
+        """
+        cached = isinstance(A, np.ndarray) and not A.flags.writeable
+        key = (transpose, np.asarray(sigma).tobytes())
+        if cached:
+            with self._factors_lock:
+                factors = self._factors.get(A)
+                if factors is None:
+                    factors = self._factors[A] = {}
+            if key in factors:
+                return factors[key]
+
+        G = np.dot(A, A.T) if transpose else np.dot(A.T, A)
 
         # add L2 regularization term 'lambda' = m * sigma**2
-        np.fill_diagonal(G, G.diagonal() + m * sigma**2)
+        np.fill_diagonal(G, G.diagonal() + A.shape[0] * sigma**2)
 
         try:
             import scipy.linalg
             factor = scipy.linalg.cho_factor(G, overwrite_a=True)
-            X = scipy.linalg.cho_solve(factor, b)
         except ImportError:
             L = np.linalg.cholesky(G)
-            L = np.linalg.inv(L.T)
-            X = np.dot(L, np.dot(L.T, b))
+            factor = np.linalg.inv(L.T)
 
-        X = np.dot(A.T, X) if transpose else X
-        info = {'rmses': rmses(A, X, Y)}
-        return X, info
+        if cached:
+            factors[key] = factor
+        return factor
 
 
 class ConjgradScipy(LeastSquaresSolver):
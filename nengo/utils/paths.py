@@ -10,6 +10,7 @@ else:
     cache_dir = os.path.expanduser(os.path.join("~", ".cache", "nengo"))
 
 decoder_cache_dir = os.path.join(cache_dir, "decoders")
+probe_dir = os.path.join(cache_dir, "probes")
 install_dir = os.path.abspath(
     os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
 examples_dir = os.path.join(install_dir, "examples")
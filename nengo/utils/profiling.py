@@ -0,0 +1,328 @@
+from __future__ import absolute_import
+
+import json
+import timeit
+
+import numpy as np
+
+from nengo.exceptions import ValidationError
+
+
+class OperatorProfiler(object):
+    """Measures the time that a simulator spends in each operator.
+
+    The profiler wraps the step functions of a simulator to time each call.
+    The simulator calls `.start_step` before each time step, so that steps
+    are counted in one place even when operators run in several threads.
+    Pass it to the ``profiling`` argument of `.Simulator` and use
+    `.Simulator.profile` to get the results.
+
+    Parameters
+    ----------
+    trace_steps : tuple of int, optional (Default: None)
+        The steps ``(start, stop)`` for which every call of every operator
+        is recorded, to be exported with `.write_chrome_trace`.
+        Steps are counted from 0 (the first step after a reset) and ``stop``
+        is not included, like for `range`. If None, no calls are recorded.
+
+    Attributes
+    ----------
+    calls : ndarray
+        Number of calls of each operator.
+    durations : ndarray
+        Total time spent in each operator, in seconds.
+    events : list
+        The recorded calls, as ``(index, step, start, duration)`` tuples.
+    n_steps : int
+        Number of steps run since the profiler was reset.
+    operators : list
+        The profiled operators, in the order they are run.
+    origins : dict
+        Mapping from operators to the objects they were built for
+        (see `.Model`).
+    """
+
+    timer = staticmethod(timeit.default_timer)
+
+    def __init__(self, trace_steps=None):
+        self.trace_steps = trace_steps
+        self.operators = []
+        self.origins = {}
+        self.reset()
+
+    def reset(self):
+        """Clear all measurements."""
+        self.n_steps = 0
+        self.durations = np.zeros(len(self.operators))
+        self.calls = np.zeros(len(self.operators), dtype=np.int64)
+        self.events = []
+        self._tracing = False
+
+    def wrap_steps(self, operators, steps, origins=None):
+        """Returns step functions that time the given step functions.
+
+        Parameters
+        ----------
+        operators : list of Operator
+            The operators that made the step functions.
+        steps : list of callable
+            The step functions, in the order in which they are run.
+        origins : dict, optional (Default: None)
+            Mapping from operators to the objects they were built for.
+        """
+        self.operators = list(operators)
+        self.origins = {} if origins is None else origins
+        self.reset()
+        return [self._wrap(i, step) for i, step in enumerate(steps)]
+
+    def _wrap(self, i, step_fn):
+        timer = self.timer
+
+        def step_profiled():
+            start = timer()
+            step_fn()
+            duration = timer() - start
+            self.durations[i] += duration
+            self.calls[i] += 1
+            if self._tracing:
+                self.events.append((i, self.n_steps - 1, start, duration))
+
+        if hasattr(step_fn, 'state'):
+            step_profiled.state = step_fn.state
+        return step_profiled
+
+    def start_step(self):
+        """Count a new time step, starting the trace if it is recorded."""
+        if self.trace_steps is not None:
+            start, stop = self.trace_steps
+            self._tracing = start <= self.n_steps < stop
+        self.n_steps += 1
+
+    def report(self):
+        """Summarize the measured times.
+
+        Returns
+        -------
+        dict
+            With the following items:
+
+            ``'n_steps'``
+                Number of profiled steps.
+            ``'total'``
+                Total time spent in all operators, in seconds.
+            ``'operators'``
+                A list with a dictionary for each operator, with the keys
+                ``'operator'``, ``'type'``, ``'tag'``, ``'objects'``,
+                ``'calls'`` and ``'time'``, sorted by decreasing time.
+            ``'by_type'``
+                Mapping from operator class names to time.
+            ``'by_tag'``
+                Mapping from operator tags to time.
+            ``'by_object'``
+                Mapping from the objects that operators were built for to
+                time. The time of an operator that was merged from the
+                operators of several objects is split evenly between them.
+                Operators without object are counted under None.
+        """
+        operators = []
+        by_type, by_tag, by_object = {}, {}, {}
+        for i, op in enumerate(self.operators):
+            time = float(self.durations[i])
+            objs = self.origins.get(op, [])
+            operators.append({'operator': op,
+                              'type': type(op).__name__,
+                              'tag': op.tag,
+                              'objects': objs,
+                              'calls': int(self.calls[i]),
+                              'time': time})
+
+            by_type[type(op).__name__] = by_type.get(
+                type(op).__name__, 0.) + time
+            by_tag[op.tag] = by_tag.get(op.tag, 0.) + time
+            for obj in objs if len(objs) > 0 else [None]:
+                by_object[obj] = (by_object.get(obj, 0.)
+                                  + time / max(len(objs), 1))
+
+        operators.sort(key=lambda x: x['time'], reverse=True)
+        return {'n_steps': self.n_steps,
+                'total': float(np.sum(self.durations)),
+                'operators': operators,
+                'by_type': by_type,
+                'by_tag': by_tag,
+                'by_object': by_object}
+
+    def write_chrome_trace(self, fname):
+        """Write the recorded calls as a Chrome trace.
+
+        The resulting JSON file can be opened in ``chrome://tracing``
+        or other viewers supporting the Trace Event Format.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the file to write.
+        """
+        t0 = min(event[2] for event in self.events) if self.events else 0.
+        events = []
+        for i, step, start, duration in self.events:
+            op = self.operators[i]
+            events.append({
+                'name': type(op).__name__,
+                'cat': type(op).__name__,
+                'ph': 'X',
+                'ts': (start - t0) * 1e6,
+                'dur': duration * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': {'step': step,
+                         'operator': str(op),
+                         'tag': op.tag,
+                         'objects': [str(obj) for obj in
+                                     self.origins.get(op, [])]}})
+
+        with open(fname, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+class BuildProfiler(object):
+    """Measures the time and memory that the builder spends on each object.
+
+    `.Builder.build` calls `.start` and `.stop` around each build function,
+    `.Model.add_op` calls `.add_op` for each operator and `.optimize`
+    calls `.add_pass` for each optimizer pass. Pass it to the
+    ``build_profiler`` argument of `.Model` (or create the `.Simulator` with
+    ``profiling=True``) and use `.Model.build_profile` to get the results.
+
+    Builds are nested (e.g., a network builds its ensembles), so each record
+    has the total ``time`` of the build, including nested builds, and the
+    ``self_time`` spent in the build function itself. All other values only
+    count the build function itself.
+
+    Attributes
+    ----------
+    passes : list
+        A dictionary for each optimizer pass, with the keys ``'pass'``
+        (the pass number), ``'views'`` (whether only operators with views
+        were merged), ``'before'`` and ``'after'`` (the number of operators)
+        and ``'time'``.
+    optimize_time : float
+        Total time spent in the optimizer, in seconds.
+    records : list
+        A dictionary for each built object, in the order the builds
+        started, with the keys ``'object'``, ``'type'``, ``'builder'``
+        (the name of the build function), ``'time'``, ``'self_time'``,
+        ``'n_ops'`` (number of operators added), ``'signal_bytes'``
+        (bytes of the new signals used by these operators),
+        ``'cache_hits'`` and ``'cache_misses'`` (decoder cache lookups).
+    """
+
+    timer = staticmethod(timeit.default_timer)
+
+    # Values of the records that `.report` can sort by
+    sort_keys = ('time', 'self_time', 'n_ops', 'signal_bytes',
+                 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.records = []
+        self.passes = []
+        self.optimize_time = 0.
+        self._stack = []
+        self._bases = set()
+
+    def start(self, model, obj, build_fn):
+        """Start the record of building ``obj`` with ``build_fn``."""
+        record = {'object': obj,
+                  'type': type(obj).__name__,
+                  'builder': "%s.%s" % (build_fn.__module__,
+                                        build_fn.__name__),
+                  'time': 0.,
+                  'self_time': 0.,
+                  'n_ops': 0,
+                  'signal_bytes': 0,
+                  'cache_hits': 0,
+                  'cache_misses': 0}
+        self.records.append(record)
+        cache = model.decoder_cache
+        self._stack.append(
+            (record, self.timer(), cache.n_hits, cache.n_misses, [0., 0, 0]))
+
+    def stop(self, model):
+        """Finish the record of the innermost build."""
+        record, start, hits, misses, nested = self._stack.pop()
+        cache = model.decoder_cache
+        time = self.timer() - start
+        hits = cache.n_hits - hits
+        misses = cache.n_misses - misses
+        record['time'] = time
+        record['self_time'] = time - nested[0]
+        record['cache_hits'] = hits - nested[1]
+        record['cache_misses'] = misses - nested[2]
+        if len(self._stack) > 0:
+            parent = self._stack[-1][-1]
+            parent[0] += time
+            parent[1] += hits
+            parent[2] += misses
+
+    def add_op(self, op):
+        """Count ``op`` and its new signals for the innermost build."""
+        if len(self._stack) == 0:
+            return  # e.g., operators re-added by the optimizer
+        record = self._stack[-1][0]
+        record['n_ops'] += 1
+        for sig in op.all_signals:
+            if sig.base not in self._bases:
+                self._bases.add(sig.base)
+                record['signal_bytes'] += sig.base.nbytes
+
+    def add_pass(self, i, views, before, after, time):
+        """Record an optimizer pass."""
+        self.passes.append({'pass': i, 'views': views, 'before': before,
+                            'after': after, 'time': time})
+
+    def report(self, sort='self_time'):
+        """Summarize the measurements.
+
+        Parameters
+        ----------
+        sort : str, optional (Default: 'self_time')
+            The value of the records to sort by, in decreasing order.
+            One of ``sort_keys``.
+
+        Returns
+        -------
+        dict
+            With the following items:
+
+            ``'total'``
+                Total time spent in the outermost builds, in seconds.
+            ``'objects'``
+                The ``records``, sorted by ``sort``.
+            ``'by_builder'``
+                Mapping from the names of the build functions to a dictionary
+                with the sums of the ``'self_time'``, ``'n_ops'``,
+                ``'signal_bytes'``, ``'cache_hits'`` and ``'cache_misses'``
+                of their records, and the number of ``'calls'``.
+            ``'optimizer'``
+                A dictionary with the optimizer ``'passes'`` and the total
+                ``'time'`` spent in the optimizer.
+        """
+        if sort not in self.sort_keys:
+            raise ValidationError("Must be one of %s (got %r)" % (
+                self.sort_keys, sort), attr='sort', obj=self)
+
+        by_builder = {}
+        for record in self.records:
+            total = by_builder.setdefault(record['builder'], {
+                'calls': 0, 'self_time': 0., 'n_ops': 0, 'signal_bytes': 0,
+                'cache_hits': 0, 'cache_misses': 0})
+            total['calls'] += 1
+            for key in total:
+                if key != 'calls':
+                    total[key] += record[key]
+
+        objects = sorted(self.records, key=lambda r: r[sort], reverse=True)
+        return {'total': sum(record['self_time'] for record in self.records),
+                'objects': objects,
+                'by_builder': by_builder,
+                'optimizer': {'passes': list(self.passes),
+                              'time': self.optimize_time}}
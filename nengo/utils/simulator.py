@@ -1,8 +1,12 @@
-from collections import defaultdict
+from __future__ import absolute_import
+
+from collections import defaultdict, deque, OrderedDict
 import itertools
 
-from .compat import iteritems
-from .graphs import add_edges
+import numpy as np
+
+from .compat import iteritems, itervalues, range
+from .graphs import add_edges, toposort
 from .stdlib import groupby
 
 
@@ -75,6 +79,89 @@ def operator_dependency_graph(operators):  # noqa: C901
     return dg
 
 
+def operator_levels(dg, order=None):
+    """Partition an operator dependency graph into levels.
+
+    Each operator is put in the level after the last level of the operators
+    it depends on, so no operator depends on another operator in the same
+    level. Running the levels in order, and the operators in each level in
+    any order (or at the same time), satisfies all dependencies.
+
+    Parameters
+    ----------
+    dg : dict
+        Dict of the form ``{a: {b, c}}`` where ``b`` and ``c`` depend on ``a``.
+    order : list, optional (Default: None)
+        A topological order of the operators in ``dg``. If None, the order
+        is determined with `.toposort`.
+
+    Returns
+    -------
+    list of list
+        The operators in each level, in the given topological order.
+    """
+    order = toposort(dg) if order is None else order
+    level = {}
+    for op in order:
+        level.setdefault(op, 0)
+        for dependent in dg[op]:
+            level[dependent] = max(level.get(dependent, 0), level[op] + 1)
+
+    levels = [[] for _ in range(max(itervalues(level)) + 1 if level else 0)]
+    for op in order:
+        levels[level[op]].append(op)
+    return levels
+
+
+def write_groups(ops):
+    """Group operators that write to overlapping memory.
+
+    Operators in different groups do not write to the same memory, so
+    if they do not depend on each other, the groups can be run at the same
+    time (e.g., in different threads). The operators within a group have to
+    be run one after the other.
+
+    Parameters
+    ----------
+    ops : list of Operator
+        The operators to group.
+
+    Returns
+    -------
+    list of list
+        The groups, with the operators in the order of ``ops``.
+    """
+    parent = list(range(len(ops)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    writes = defaultdict(list)
+    for i, op in enumerate(ops):
+        for sig in op.sets + op.incs + op.updates:
+            for j, sig2 in writes[sig.base]:
+                if sig.may_share_memory(sig2):
+                    parent[find(j)] = find(i)
+            writes[sig.base].append((i, sig))
+
+    groups = OrderedDict()
+    for i, op in enumerate(ops):
+        groups.setdefault(find(i), []).append(op)
+    return list(groups.values())
+
+
+def operator_cost(op):
+    """Estimate the work an operator does in one time step.
+
+    The estimate is the number of signal elements the operator accesses,
+    so the matrix of a `.DotInc` counts with all of its elements.
+    """
+    return sum(sig.size for sig in op.all_signals)
+
+
 def validate_ops(sets, ups, incs):
     # -- assert that only one op sets any particular view
     for sig in sets:
@@ -97,3 +184,151 @@ def validate_ops(sets, ups, incs):
         for sig, sig2 in itertools.combinations(base_group, 2):
             assert not sig.may_share_memory(sig2), (
                 "%s shares memory with %s" % (sig, sig2))
+
+
+def get_step_state(state):
+    """Returns a copy of the internal state of a step function.
+
+    Step functions that keep state between time steps (e.g., in closures)
+    expose it in a ``state`` attribute: a dictionary mapping names to the
+    mutable objects that hold the state. Supported values are ndarrays,
+    deques of ndarrays, `numpy.random.RandomState` instances, and
+    dictionaries of these.
+
+    Parameters
+    ----------
+    state : dict
+        The ``state`` attribute of a step function.
+
+    Returns
+    -------
+    dict
+        A copy of the state that can be pickled and given to
+        `.set_step_state`.
+    """
+    saved = {}
+    for key, value in iteritems(state):
+        if isinstance(value, dict):
+            saved[key] = get_step_state(value)
+        elif isinstance(value, deque):
+            saved[key] = [np.array(x) for x in value]
+        elif isinstance(value, np.random.RandomState):
+            saved[key] = value.get_state()
+        else:
+            saved[key] = np.array(value)
+    return saved
+
+
+def set_step_state(state, saved):
+    """Restores the internal state of a step function in place.
+
+    Parameters
+    ----------
+    state : dict
+        The ``state`` attribute of a step function.
+    saved : dict
+        A copy of the state, as returned by `.get_step_state`.
+    """
+    for key, value in iteritems(state):
+        if isinstance(value, dict):
+            set_step_state(value, saved[key])
+        elif isinstance(value, deque):
+            value.clear()
+            value.extend(np.array(x) for x in saved[key])
+        elif isinstance(value, np.random.RandomState):
+            value.set_state(saved[key])
+        else:
+            value[...] = saved[key]
+
+
+def rng_state_arrays(rng, prefix):
+    """Returns the state of a `numpy.random.RandomState` as named arrays.
+
+    The arrays can be stored with `numpy.savez` and restored with
+    `.set_rng_state_arrays`, without pickling.
+
+    Parameters
+    ----------
+    rng : `numpy.random.RandomState`
+        The random number generator.
+    prefix : str
+        Prefix of the array names.
+    """
+    name, key, pos, has_gauss, cached_gaussian = rng.get_state()
+    return {prefix + '/name': np.array(name),
+            prefix + '/key': np.array(key),
+            prefix + '/pos': np.array(pos),
+            prefix + '/has_gauss': np.array(has_gauss),
+            prefix + '/cached_gaussian': np.array(cached_gaussian)}
+
+
+def set_rng_state_arrays(rng, arrays, prefix):
+    """Restores the state of a `numpy.random.RandomState` from named arrays.
+
+    Parameters
+    ----------
+    rng : `numpy.random.RandomState`
+        The random number generator.
+    arrays : Mapping
+        The arrays returned by `.rng_state_arrays` (e.g., an ``.npz`` file).
+    prefix : str
+        Prefix of the array names.
+    """
+    rng.set_state((str(arrays[prefix + '/name']),
+                   arrays[prefix + '/key'],
+                   int(arrays[prefix + '/pos']),
+                   int(arrays[prefix + '/has_gauss']),
+                   float(arrays[prefix + '/cached_gaussian'])))
+
+
+def step_state_arrays(state, prefix):
+    """Returns the internal state of a step function as named arrays.
+
+    Like `.get_step_state`, but the state is flattened into arrays that
+    can be stored with `numpy.savez` and restored with
+    `.set_step_state_arrays`, without pickling.
+
+    Parameters
+    ----------
+    state : dict
+        The ``state`` attribute of a step function.
+    prefix : str
+        Prefix of the array names.
+    """
+    arrays = {}
+    for key, value in iteritems(state):
+        name = '%s/%s' % (prefix, key)
+        if isinstance(value, dict):
+            arrays.update(step_state_arrays(value, name))
+        elif isinstance(value, deque):
+            arrays[name] = np.array(list(value))
+        elif isinstance(value, np.random.RandomState):
+            arrays.update(rng_state_arrays(value, name))
+        else:
+            arrays[name] = np.array(value)
+    return arrays
+
+
+def set_step_state_arrays(state, arrays, prefix):
+    """Restores the internal state of a step function from named arrays.
+
+    Parameters
+    ----------
+    state : dict
+        The ``state`` attribute of a step function.
+    arrays : Mapping
+        The arrays returned by `.step_state_arrays` (e.g., an ``.npz`` file).
+    prefix : str
+        Prefix of the array names.
+    """
+    for key, value in iteritems(state):
+        name = '%s/%s' % (prefix, key)
+        if isinstance(value, dict):
+            set_step_state_arrays(value, arrays, name)
+        elif isinstance(value, deque):
+            value.clear()
+            value.extend(np.array(x) for x in arrays[name])
+        elif isinstance(value, np.random.RandomState):
+            set_rng_state_arrays(value, arrays, name)
+        else:
+            value[...] = arrays[name]
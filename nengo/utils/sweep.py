@@ -0,0 +1,169 @@
+"""Run a network for many parameter values in parallel processes."""
+
+from __future__ import absolute_import
+
+import collections
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import nengo
+from nengo.builder import Model
+from nengo.cache import (
+    DecoderCache, NoDecoderCache, get_default_decoder_cache)
+from nengo.exceptions import ValidationError
+from nengo.rc import rc
+
+
+class SweepResult(collections.namedtuple(
+        'SweepResult', ['params', 'seed', 'data'])):
+    """The result of one simulation of a parameter sweep.
+
+    Attributes
+    ----------
+    params : dict
+        The parameters passed to the network factory.
+    seed : int
+        The seed of the simulation.
+    data : list of ndarray
+        The data of each probe, in the order of ``network.all_probes``.
+    """
+
+    __slots__ = ()
+
+
+class _SweepDecoderCache(DecoderCache):
+    """A decoder cache that leaves shrinking to the parent process.
+
+    Shrinking removes cache files, which other workers may be reading.
+    The index itself is protected by a file lock and merged when synced,
+    so workers can add decoders concurrently.
+    """
+
+    def shrink(self, limit=None):
+        pass
+
+
+def sweep(make_network, grid, run_time, seeds=(0,), dt=0.001,
+          processes=None, optimize=True, path=None):
+    """Simulate a network for all combinations of parameter values.
+
+    Each combination of the values in ``grid`` and ``seeds`` is built and
+    simulated in one of a pool of worker processes. Decoders are shared
+    between the workers through the decoder cache. The probed data is
+    streamed to ``.npy`` files (see `.DiskProbeBuffer`), which are memory
+    mapped by this process instead of being sent back through a pipe.
+
+    The result of each simulation only depends on its parameters and seed,
+    and not on the number of processes or the order in which they run.
+
+    Parameters
+    ----------
+    make_network : callable
+        Function called with the parameters as keyword arguments, which
+        returns the `.Network` to simulate. It must be picklable (i.e.,
+        defined at the top level of a module). If the network has no seed,
+        it is seeded with the seed of the simulation.
+    grid : dict
+        Mapping from parameter names to the list of values to try.
+    run_time : float
+        Time to simulate each network, in seconds.
+    seeds : iterable of int, optional (Default: ``(0,)``)
+        Each combination of parameters is simulated once with each seed.
+    dt : float, optional (Default: 0.001)
+        The length of a simulator timestep, in seconds.
+    processes : int, optional (Default: None)
+        Number of worker processes. If None, the number of CPUs is used.
+    optimize : bool, optional (Default: True)
+        If True, the built models are optimized (see `.Simulator`).
+    path : str, optional (Default: None)
+        Directory in which the probe data is stored while the results are
+        collected. If None, a temporary directory is created, in shared
+        memory (``/dev/shm``) if available. The files are removed once all
+        results have been loaded.
+
+    Returns
+    -------
+    list of SweepResult
+        The results of the simulations, in the order of the parameter
+        combinations (with the last parameter in ``sorted(grid)`` varying
+        fastest) and then of the seeds.
+    """
+    if processes is not None and processes < 1:
+        raise ValidationError("Must be at least 1 (got %d)" % processes,
+                              attr='processes')
+
+    names = sorted(grid)
+    jobs = [(make_network, dict(zip(names, values)), seed,
+             run_time, dt, optimize)
+            for values in itertools.product(*(grid[name] for name in names))
+            for seed in seeds]
+
+    tmpdir = path is None
+    if tmpdir:
+        path = tempfile.mkdtemp(
+            prefix='nengo_sweep_',
+            dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+    pool = multiprocessing.Pool(processes, _init_worker, (path,))
+    try:
+        results = []
+        for (_, params, seed, _, _, _), fnames in zip(
+                jobs, pool.imap(_run_job, jobs)):
+            data = []
+            for fname in fnames:
+                # The memory map stays valid after the file is removed
+                data.append(np.load(fname, mmap_mode='r'))
+                _remove(fname)
+            results.append(SweepResult(params, seed, data))
+    finally:
+        pool.close()
+        pool.join()
+        if tmpdir:
+            shutil.rmtree(path, ignore_errors=True)
+
+    # The workers do not shrink the decoder cache, so we do it once here
+    with get_default_decoder_cache() as decoder_cache:
+        decoder_cache.shrink()
+    return results
+
+
+def _get_decoder_cache():
+    if rc.getboolean('decoder_cache', 'enabled'):
+        return _SweepDecoderCache(rc.getboolean('decoder_cache', 'readonly'))
+    else:
+        return NoDecoderCache()
+
+
+def _init_worker(path):
+    rc.set('probe_storage', 'path', path)
+
+
+def _run_job(job):
+    make_network, params, seed, run_time, dt, optimize = job
+    network = make_network(**params)
+    if network.seed is None:
+        network.seed = seed
+
+    model = Model(dt=float(dt), label="%s, dt=%f" % (network, dt),
+                  decoder_cache=_get_decoder_cache())
+    sim = nengo.Simulator(network, dt=dt, seed=seed, model=model,
+                          progress_bar=False, optimize=optimize,
+                          probe_storage='disk')
+    try:
+        sim.run(run_time, progress_bar=False)
+    finally:
+        sim.close()
+    return [sim._probe_outputs[probe].filename
+            for probe in network.all_probes]
+
+
+def _remove(fname):
+    try:
+        os.remove(fname)
+    except OSError:
+        pass
@@ -12,6 +12,14 @@ def test_toposort():
     assert graphs.toposort(edges) == ['a', 'b', 'c']
 
 
+def test_toposort_key():
+    edges = graphs.graph({'a': {'d'}, 'b': {'d'}, 'c': set(), 'd': set()})
+    order = {'c': 0, 'b': 1, 'a': 2, 'd': 3}
+    assert graphs.toposort(edges, key=order.get) == ['c', 'b', 'a', 'd']
+    order = {'a': 0, 'b': 1, 'c': 4, 'd': 2}
+    assert graphs.toposort(edges, key=order.get) == ['a', 'b', 'd', 'c']
+
+
 def test_transitive_closure():
     edges = graphs.graph(
         {'a': {}, 'b': {'c', 'd'}, 'c': set(), 'd': {'e', }, 'e': set()})
@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pytest
+
+import nengo
+from nengo.builder import Model
+from nengo.cache import DecoderCache
+from nengo.exceptions import BuildError, SimulationError, ValidationError
+from nengo.utils.profiling import BuildProfiler, OperatorProfiler
+
+
+@pytest.mark.parametrize('optimize, n_threads',
+                         [(False, 1), (True, 1), (True, 2)])
+def test_profile(RefSimulator, optimize, n_threads, tmpdir):
+    with nengo.Network(seed=0) as net:
+        u = nengo.Node(np.sin)
+        a = nengo.Ensemble(40, 1)
+        b = nengo.Ensemble(40, 1)
+        nengo.Connection(u, a)
+        conn = nengo.Connection(a, b, learning_rule_type=nengo.PES())
+        nengo.Connection(b, conn.learning_rule)
+
+    profiler = OperatorProfiler(trace_steps=(2, 5))
+    with RefSimulator(net, optimize=optimize, profiling=profiler,
+                      n_threads=n_threads) as sim:
+        sim.run_steps(9)
+        sim.step()
+        report = sim.profile()
+        assert sim.model.build_profile()['total'] > 0
+
+        n_ops = len(sim._steps)
+        assert report['n_steps'] == 10
+        assert len(report['operators']) == n_ops
+        assert all(op['calls'] == 10 for op in report['operators'])
+        assert report['total'] > 0
+        times = [op['time'] for op in report['operators']]
+        assert times == sorted(times, reverse=True)
+
+        assert 'SimNeurons' in report['by_type']
+        for obj in (u, a, b, conn, conn.learning_rule):
+            assert report['by_object'][obj] > 0
+        for group in ('by_type', 'by_tag', 'by_object'):
+            assert np.allclose(sum(report[group].values()), report['total'])
+
+        fname = str(tmpdir.join("trace.json"))
+        profiler.write_chrome_trace(fname)
+        with open(fname) as f:
+            events = json.load(f)['traceEvents']
+        assert len(events) == 3 * n_ops
+        assert set(e['args']['step'] for e in events) == {2, 3, 4}
+        assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+
+        sim.reset()
+        assert sim.profile()['n_steps'] == 0
+
+    with RefSimulator(net) as sim:
+        with pytest.raises(SimulationError):
+            sim.profile()
+
+
+def test_profile_fork(RefSimulator):
+    with nengo.Network(seed=0) as net:
+        a = nengo.Ensemble(10, 1)
+        nengo.Probe(a)
+
+    with RefSimulator(net, profiling=True) as sim:
+        sim.run_steps(5)
+        fork, = sim.fork()
+        assert fork.profiler is not sim.profiler
+        assert fork.profile()['n_steps'] == 0
+        fork.run_steps(3)
+        assert fork.profile()['n_steps'] == 3
+        assert sim.profile()['n_steps'] == 5
+        fork.close()
+
+
+def test_build_profile(RefSimulator, tmpdir):
+    with nengo.Network(seed=0) as net:
+        u = nengo.Node(np.sin)
+        a = nengo.Ensemble(40, 1)
+        with nengo.Network() as subnet:
+            b = nengo.Ensemble(30, 1)
+        nengo.Connection(u, a)
+        conn = nengo.Connection(a, b)
+
+    model = Model(build_profiler=BuildProfiler(),
+                  decoder_cache=DecoderCache(cache_dir=str(tmpdir)))
+    with RefSimulator(net, model=model):
+        report = model.build_profile()
+
+    records = {(r['object'], r['type']): r for r in report['objects']}
+    assert set(obj for obj, _ in records) >= {net, subnet, u, a, b, conn}
+    assert records[conn, 'Connection']['builder'] == (
+        "nengo.builder.connection.build_connection")
+    assert records[conn.solver, 'LstsqL2']['cache_misses'] == 1
+    assert records[a, 'Ensemble']['n_ops'] > 0
+    assert records[a, 'Ensemble']['signal_bytes'] >= 3 * 40 * 8
+    unoptimized = Model()
+    unoptimized.build(net)
+    # all operators but the TimeUpdate, which is added outside of builds
+    assert sum(r['n_ops'] for r in report['objects']) == (
+        len(unoptimized.operators) - 1)
+
+    self_times = [r['self_time'] for r in report['objects']]
+    assert self_times == sorted(self_times, reverse=True)
+    assert np.allclose(report['total'], records[net, 'Network']['time'])
+    assert records[subnet, 'Network']['time'] >= (
+        records[b, 'Ensemble']['time'])
+    assert report['by_builder'][
+        "nengo.builder.ensemble.build_ensemble"]['calls'] == 2
+
+    assert len(report['optimizer']['passes']) > 0
+    assert report['optimizer']['time'] >= sum(
+        p['time'] for p in report['optimizer']['passes'])
+
+    by_bytes = model.build_profile(sort='signal_bytes')['objects']
+    assert by_bytes[0]['signal_bytes'] == max(
+        r['signal_bytes'] for r in report['objects'])
+    with pytest.raises(ValidationError):
+        model.build_profile(sort='object')
+
+    # the same network loads the decoders from the cache
+    model = Model(build_profiler=BuildProfiler(),
+                  decoder_cache=DecoderCache(cache_dir=str(tmpdir)))
+    model.build(net)
+    solver = [r for r in model.build_profile()['objects']
+              if r['object'] is conn.solver]
+    assert solver[0]['cache_hits'] == 1 and solver[0]['cache_misses'] == 0
+
+    with RefSimulator(net, model=Model()) as sim:
+        with pytest.raises(BuildError):
+            sim.model.build_profile()
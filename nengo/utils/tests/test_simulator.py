@@ -0,0 +1,38 @@
+import numpy as np
+
+from nengo.builder.operator import Copy, DotInc, ElementwiseInc, Reset
+from nengo.builder.signal import Signal
+from nengo.utils.simulator import (
+    operator_dependency_graph, operator_levels, write_groups)
+
+
+def test_operator_levels():
+    x = Signal(np.zeros(4), name='x')
+    y = Signal(np.zeros(4), name='y')
+    z = Signal(np.zeros(4), name='z')
+    w = Signal(np.zeros(4), name='w')
+    A = Signal(np.ones((4, 4)), name='A')
+    reset_y = Reset(y)
+    reset_z = Reset(z)
+    dot_y = DotInc(A, x, y)
+    dot_z = DotInc(A, x, z)
+    copy = Copy(y, w)
+    ops = [copy, dot_z, reset_y, dot_y, reset_z]
+
+    levels = operator_levels(operator_dependency_graph(ops))
+    assert [set(level) for level in levels] == [
+        {reset_y, reset_z}, {dot_y, dot_z}, {copy}]
+
+
+def test_write_groups():
+    x = Signal(np.zeros(4), name='x')
+    y = Signal(np.zeros(6), name='y')
+    ones = Signal(np.ones(2), name='ones')
+    a = ElementwiseInc(ones, ones, y[:2])
+    b = ElementwiseInc(ones, ones, y[2:4])
+    c = ElementwiseInc(ones, ones, y[1:3])
+    d = Copy(ones, x[:2])
+
+    groups = write_groups([a, b, c, d])
+    assert groups == [[a, b, c], [d]]
+    assert write_groups([d, a, b]) == [[d], [a], [b]]
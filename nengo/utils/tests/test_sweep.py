@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import nengo
+from nengo.exceptions import ValidationError
+from nengo.utils.sweep import sweep
+
+
+def make_network(n_neurons, tau):
+    with nengo.Network() as net:
+        u = nengo.Node(nengo.processes.WhiteSignal(1., high=5))
+        a = nengo.Ensemble(n_neurons, 1)
+        nengo.Connection(u, a)
+        net.p = nengo.Probe(a, synapse=tau)
+        net.p_spikes = nengo.Probe(a.neurons, sample_every=0.01)
+    return net
+
+
+def test_sweep(tmpdir):
+    grid = {'n_neurons': [10, 20], 'tau': [0.005, 0.01]}
+    results = sweep(make_network, grid, 0.1, seeds=(1, 2), processes=2,
+                    path=str(tmpdir))
+    assert len(results) == 8
+    assert [(r.params['n_neurons'], r.params['tau'], r.seed)
+            for r in results[:3]] == [(10, 0.005, 1), (10, 0.005, 2),
+                                      (10, 0.01, 1)]
+    for r in results:
+        assert r.data[0].shape == (100, 1)
+        assert r.data[1].shape == (10, r.params['n_neurons'])
+    assert tmpdir.listdir() == []
+
+    # results only depend on the parameters and the seed
+    again = sweep(make_network, {'n_neurons': [20], 'tau': [0.01]}, 0.1,
+                  seeds=(2,), processes=1)
+    assert again[0].params == results[-1].params
+    for x, y in zip(again[0].data, results[-1].data):
+        assert np.array_equal(x, y)
+    assert not np.array_equal(results[-2].data[0], results[-1].data[0])
+
+    net = make_network(20, 0.01)
+    net.seed = 2
+    with nengo.Simulator(net, seed=2) as sim:
+        sim.run(0.1)
+    assert np.allclose(sim.data[net.p], results[-1].data[0])
+
+
+def test_sweep_processes():
+    with pytest.raises(ValidationError):
+        sweep(make_network, {'n_neurons': [10], 'tau': [0.01]}, 0.1,
+              processes=0)